@@ -1,21 +1,33 @@
 from celery import Celery
+from celery.schedules import crontab
 from celery.signals import worker_process_init
 from sqlalchemy.orm import Session
+from utils.config_loader import CONFIG
 from utils.database import SessionLocal, init_db
 
+CELERY_CONFIG = CONFIG.get("celery", {})
+
 # Celery 애플리케이션 설정
+# 워커 노드를 추가하면 심볼 청크 태스크가 노드들에 분산됩니다. (screener.tasks 참고)
 celery_app = Celery(
     "screener_tasks",
-    broker="redis://localhost:6379/0",  # Redis 브로커 URL
-    backend="redis://localhost:6379/1"   # Redis 백엔드 URL (결과 저장)
+    broker=CELERY_CONFIG.get("broker_url", "redis://localhost:6379/0"),  # Redis 브로커 URL
+    backend=CELERY_CONFIG.get("result_backend", "redis://localhost:6379/1"),  # Redis 백엔드 URL (결과 저장)
+    include=["screener.tasks"]
+)
+celery_app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    worker_prefetch_multiplier=1,  # 청크 태스크는 오래 걸리므로 워커가 미리 쌓아 두지 않도록 함
+    beat_schedule={
+        # 매일 새벽 보존 기간이 지난 결과 정리 (celery -A celery_app beat 실행 필요)
+        "prune-screener-results": {"task": "screener.prune_results", "schedule": crontab(hour=4, minute=0)},
+    },
 )
 
 # Celery 태스크가 실행될 때마다 DB 세션을 초기화
 def configure_worker_for_sqlalchemy(*args, **kwargs):
     init_db() # DB 테이블이 없으면 생성
 
-worker_process_init.connect(configure_worker_for_sqlalchemy)
-
-# 스크리너 함수들을 Celery 태스크로 임포트 (나중에 추가)
-# from screener.daily_screener import daily_screener
-# from screener.altcoin_screener import altcoin_screener
\ No newline at end of file
+worker_process_init.connect(configure_worker_for_sqlalchemy)
\ No newline at end of file
@@ -1,7 +1,7 @@
 import argparse
 import sys
 import uvicorn
-from screener import daily_screener, altcoin_screener
+from screener import daily_screener, altcoin_screener, binance_futures_screener
 
 # --- 메인 실행 로직 ---
 def main():
@@ -31,6 +31,7 @@ def main():
     daily_parser.add_argument('--min-cci', type=float, default=-40.0, help='최소 CCI 값')
     daily_parser.add_argument('--max-cci', type=float, default=40.0, help='최대 CCI 값')
     daily_parser.add_argument('--cci-period', type=int, default=20, help='CCI 계산 기간')
+    daily_parser.add_argument('--distributed', action='store_true', help='Celery 워커들에 심볼 청크를 분산하여 실행')
 
     # Altcoin Screener Subparser
     altcoin_parser = screener_subparsers.add_parser('altcoin', help='신규 상장 후 하락한 알트코인 탐색')
@@ -42,6 +43,21 @@ def main():
     altcoin_parser.add_argument('--min-cci', type=float, default=-50.0, help='최소 CCI 값')
     altcoin_parser.add_argument('--max-cci', type=float, default=50.0, help='최대 CCI 값')
     altcoin_parser.add_argument('--cci-period', type=int, default=20, help='CCI 계산 기간')
+    altcoin_parser.add_argument('--distributed', action='store_true', help='Celery 워커들에 심볼 청크를 분산하여 실행')
+
+    # Futures Screener Subparser
+    futures_parser = screener_subparsers.add_parser('futures', help='바이낸스 선물 OI 기반 스크리너')
+    futures_parser.add_argument('--mode', choices=['scan', 'monitor'], default='scan', help='1회 스캔 또는 상시 모니터')
+    futures_parser.add_argument('--distributed', action='store_true', help='Celery 워커들에 심볼 청크를 분산하여 실행 (scan 모드)')
+
+    # 'migrate' 커맨드 파서
+    subparsers.add_parser('migrate', help='기존 결과의 표 행을 코인별 결과 테이블(screener_hits)로 옮깁니다.')
+
+    # 'prune' 커맨드 파서
+    parser_prune = subparsers.add_parser('prune', help='보존 기간이 지난 결과의 출력 텍스트를 보관 파일로 옮기고 DB를 정리합니다.')
+    parser_prune.add_argument('--days', type=int, default=None, help='보존 기간 (일, 기본값: config.json의 database.retention_days)')
+    parser_prune.add_argument('--no-archive', action='store_true', help='보관 파일을 남기지 않고 삭제')
+    parser_prune.add_argument('--vacuum', action='store_true', help='정리 후 VACUUM으로 파일 크기 축소')
 
     args = parser.parse_args()
 
@@ -49,6 +65,42 @@ def main():
         print(f"웹 서버를 시작합니다. http://{args.host}:{args.port} 에서 접속하세요.")
         uvicorn.run("webapp:app", host=args.host, port=args.port, reload=True)
     
+    elif args.command == 'migrate':
+        from utils.database import SessionLocal, init_db, migrate_screener_hits
+        init_db()
+        db = SessionLocal()
+        try:
+            migrated = migrate_screener_hits(db)
+        finally:
+            db.close()
+        print(f"{migrated}개의 기존 결과를 screener_hits 테이블로 옮겼습니다.")
+
+    elif args.command == 'prune':
+        from utils.database import SessionLocal, init_db, prune_results, compact_database, RETENTION_DAYS, ARCHIVE_DIR
+        init_db()
+        db = SessionLocal()
+        try:
+            pruned = prune_results(
+                db,
+                retention_days=args.days if args.days is not None else RETENTION_DAYS,
+                archive_dir=None if args.no_archive else ARCHIVE_DIR
+            )
+        finally:
+            db.close()
+        if args.vacuum:
+            compact_database()
+        print(f"{pruned}개 결과의 출력 텍스트를 정리했습니다.")
+
+    elif args.command == 'run' and getattr(args, 'distributed', False):
+        # 스캔을 Celery 태스크로 제출하고, 청크 결과가 병합될 때까지 기다립니다.
+        from screener.tasks import run_distributed_scan
+        params = {
+            key: value for key, value in vars(args).items()
+            if key not in ('command', 'screener_name', 'distributed', 'mode')
+        }
+        result = run_distributed_scan(args.screener_name, params)
+        print(result["output"])
+
     elif args.command == 'run':
         if args.screener_name == 'daily':
             daily_screener.daily_screener(
@@ -71,6 +123,8 @@ def main():
                 max_cci=args.max_cci,
                 cci_period=args.cci_period
             )
+        elif args.screener_name == 'futures':
+            binance_futures_screener.futures_screener(mode=args.mode)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -1,4 +1,5 @@
 import logging
+import numpy as np
 import pandas as pd
 import os
 import sys
@@ -7,40 +8,69 @@ from sqlalchemy.orm import Session # Session 임포트
 
 # Add parent directory to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.market_data import get_active_symbols, get_ohlcv, calculate_indicators
+from utils.market_data import (
+    fetch_ohlcv_batch, streaming_indicator_provider, calculate_indicators
+)
 from utils.config_loader import CONFIG
-from utils.database import ScreenerResult # ScreenerResult 모델 임포트
+from utils.database import ScreenerResult, attach_hits # ScreenerResult 모델 임포트
+from utils.result_writer import save_result
 import json # json 임포트
-from .daily_screener import EXCHANGE, BASE_CURRENCY
+from utils.filter_chain import (
+    FilterChain, COST_INDICATOR, history_filter, listing_days_filter, daily_volume_filter,
+    ath_drawdown_filter, volatility_filter, cci_filter, rsi_filter, volume_increase_filter
+)
+from utils.panel import build_panel
+from .daily_screener import EXCHANGE, BASE_CURRENCY, select_symbols, market_error_result
+
+logger = logging.getLogger(__name__)
+
+# --- 선택 조건 ---
+USE_RSI_FILTER = False
+RSI_PERIOD = 14
+MIN_RSI = 50.0
+
+USE_VOLUME_INCREASE_FILTER = False
+VOLUME_INCREASE_PERIOD = 7    # 최근 평균 거래량 구간 (일)
+VOLUME_COMPARE_PERIOD = 30    # 비교 평균 거래량 구간 (일)
+MIN_VOLUME_INCREASE_PERCENTAGE = 50.0
+# ----------------------------------------------------
+
+def build_altcoin_filters(
+    min_daily_volume_usd, max_listing_days, min_downtrend_from_ath, min_volatility,
+    max_volatility, min_cci, max_cci, cci_period, max_indicator_period
+):
+    """알트코인 스크리너 조건을 필터 체인으로 구성합니다. (지표는 가격 조건을 통과한 코인만 계산)"""
+    filters = [
+        history_filter(max_indicator_period),
+        listing_days_filter(max_listing_days),
+        daily_volume_filter(min_daily_volume_usd, 'USD'),
+        ath_drawdown_filter(min_downtrend_from_ath),
+        volatility_filter(min_volatility, max_volatility, label='변동성'),
+        cci_filter(min_cci, max_cci, cci_period),
+    ]
+    if USE_RSI_FILTER:
+        filters.append(rsi_filter(MIN_RSI, RSI_PERIOD))
+    if USE_VOLUME_INCREASE_FILTER:
+        filters.append(volume_increase_filter(
+            MIN_VOLUME_INCREASE_PERCENTAGE, VOLUME_COMPARE_PERIOD, VOLUME_INCREASE_PERIOD
+        ))
+
+    return FilterChain(
+        filters,
+        providers={
+            'indicators': (COST_INDICATOR, lambda df: calculate_indicators(df, cci_period=cci_period, rsi_period=RSI_PERIOD)),
+        }
+    )
 
-def altcoin_screener(
-    db: Session, # db 세션 인자 추가
-    min_daily_volume_usd: float = CONFIG.get("altcoin_screener", {}).get("min_daily_volume_usd", 500_000_000),
-    max_listing_days: int = CONFIG.get("altcoin_screener", {}).get("max_listing_days", 1648),
-    min_downtrend_from_ath: float = CONFIG.get("altcoin_screener", {}).get("min_downtrend_from_ath", 0.70),
-    min_volatility: float = CONFIG.get("altcoin_screener", {}).get("min_volatility", 40.0),
-    max_volatility: float = CONFIG.get("altcoin_screener", {}).get("max_volatility", 70.0),
-    min_cci: float = CONFIG.get("altcoin_screener", {}).get("min_cci", -50.0),
-    max_cci: float = CONFIG.get("altcoin_screener", {}).get("max_cci", 50.0),
-    cci_period: int = CONFIG.get("altcoin_screener", {}).get("cci_period", 20)
+def screen_altcoin_symbols(
+    symbols, min_daily_volume_usd, max_listing_days, min_downtrend_from_ath, min_volatility,
+    max_volatility, min_cci, max_cci, cci_period
 ):
     """
-    MOVE/KRW, IMX/KRW와 유사한 특징을 가진 알트코인을 탐색합니다.
+    주어진 심볼들에 알트코인 조건을 적용하고 발견한 코인 목록을 반환합니다.
+    심볼 청크 단위로 나누어 여러 워커에서 실행할 수 있도록 코인 정보는 JSON 직렬화 가능한 값만 담습니다.
     """
-    header = "=== MOVE/IMX 유사 코인 탐색 스크립트 ===\n"
-    header += f"거래소: {EXCHANGE.upper()}, 기준 통화: {BASE_CURRENCY}\n"
-    header += "-" * 40 + "\n"
-    logger.info(f"알트코인 스크리너 시작. 파라미터: {{min_daily_volume_usd=min_daily_volume_usd, max_listing_days=max_listing_days, min_downtrend_from_ath=min_downtrend_from_ath, min_volatility=min_volatility, max_volatility=max_volatility, min_cci=min_cci, max_cci=max_cci, cci_period=cci_period}}")
-
-    symbols = get_active_symbols(EXCHANGE, BASE_CURRENCY)
-    if not symbols:
-        logger.error(f"{EXCHANGE}에서 {BASE_CURRENCY} 마켓 정보를 가져오는 데 실패했습니다.")
-        return {"output": f"{EXCHANGE}에서 {BASE_CURRENCY} 마켓 정보를 가져오는 데 실패했습니다.", "charts": [], "table_data": {"headers": [], "rows": []}}
-
-    logger.info(f"총 {len(symbols)}개의 {BASE_CURRENCY} 마켓 코인을 대상으로 분석을 시작합니다.")
-
     found_coins = []
-    chart_paths = [] # altcoin 스크리너는 현재 차트를 생성하지 않지만, 구조를 맞춤
     
     max_indicator_period = cci_period
     if USE_RSI_FILTER:
@@ -50,86 +80,54 @@ def altcoin_screener(
 
     required_days = max_listing_days + max_indicator_period + 5
 
-    for i, symbol in enumerate(symbols):
-        logger.debug(f"[{i+1}/{len(symbols)}] 분석 중: {symbol}...")
-        
-        try:
-            df = get_ohlcv(EXCHANGE, symbol, '1d', limit=required_days)
-            if df is None or len(df) < max_indicator_period:
-                logger.debug(f"{symbol}: OHLCV 데이터 부족 또는 로드 실패.")
-                continue
-
-            if len(df) > max_listing_days:
-                logger.debug(f"{symbol}: 상장일 ({len(df)}일) 기준 미달.")
-                continue
-
-            df = calculate_indicators(df, cci_period=cci_period, rsi_period=RSI_PERIOD)
-            
-            ath = df['high'].max()
-            latest = df.iloc[-1]
-            
-            recent_high = df['high'].tail(30).max()
-            recent_low = df['low'].tail(30).min()
-            volatility_metric = ((recent_high - recent_low) / latest['close']) * 100 if latest['close'] > 0 else 0
-
-            daily_volume_usd = latest['close'] * latest['volume']
-            if daily_volume_usd < min_daily_volume_usd:
-                logger.debug(f"{symbol}: 일일 거래량 ({daily_volume_usd:.0f} USD) 기준 미달.")
-                continue
-
-            downtrend_from_ath = (1 - latest['close'] / ath)
-            if downtrend_from_ath < min_downtrend_from_ath:
-                logger.debug(f"{symbol}: ATH 대비 하락률 ({downtrend_from_ath:.2f}) 기준 미달.")
-                continue
-
-            if not (min_volatility <= volatility_metric <= max_volatility):
-                logger.debug(f"{symbol}: 변동성 ({volatility_metric:.2f}%) 기준 미달.")
-                continue
-            
-            current_cci = latest[f'CCI_{cci_period}_0.015']
-            if not (min_cci <= current_cci <= max_cci):
-                logger.debug(f"{symbol}: CCI ({current_cci:.2f}) 기준 미달.")
-                continue
-
-            if USE_RSI_FILTER:
-                current_rsi = latest[f'RSI_{RSI_PERIOD}']
-                if current_rsi < MIN_RSI:
-                    logger.debug(f"{symbol}: RSI ({current_rsi:.2f}) 기준 미달.")
-                    continue
+    screen_filters = build_altcoin_filters(
+        min_daily_volume_usd, max_listing_days, min_downtrend_from_ath, min_volatility,
+        max_volatility, min_cci, max_cci, cci_period, max_indicator_period
+    )
 
-            if USE_VOLUME_INCREASE_FILTER:
-                if len(df) < VOLUME_COMPARE_PERIOD + VOLUME_INCREASE_PERIOD:
-                    logger.debug(f"{symbol}: 거래량 증가 분석을 위한 데이터 부족.")
-                    continue
-                recent_avg_volume = df['volume'].tail(VOLUME_INCREASE_PERIOD).mean()
-                compare_avg_volume = df['volume'].iloc[-(VOLUME_COMPARE_PERIOD + VOLUME_INCREASE_PERIOD):-VOLUME_INCREASE_PERIOD].mean()
-                
-                if compare_avg_volume > 0:
-                    volume_increase_percentage = ((recent_avg_volume - compare_avg_volume) / compare_avg_volume) * 100
-                    if volume_increase_percentage < MIN_VOLUME_INCREASE_PERCENTAGE:
-                        logger.debug(f"{symbol}: 거래량 증가율 ({volume_increase_percentage:.2f}%) 기준 미달.")
-                        continue
-                else:
-                    logger.debug(f"{symbol}: 비교 거래량 0으로 거래량 증가 분석 불가.")
-                    continue
+    # 모든 심볼의 일봉을 제한된 동시성으로 한 번에 수집
+    ohlcv_by_symbol = fetch_ohlcv_batch(EXCHANGE, symbols, '1d', limit=required_days)
 
+    # 모든 심볼을 (심볼 × 일) 패널로 정렬하여 조건을 불리언 마스크로 한 번에 적용
+    # CCI/RSI 최신 값은 앞선 조건을 통과한 심볼만 저장된 스트리밍 상태를 새 캔들만큼 갱신하여 사용
+    indicator_specs = {f'CCI_{cci_period}_0.015': ('cci', cci_period)}
+    if USE_RSI_FILTER:
+        indicator_specs[f'RSI_{RSI_PERIOD}'] = ('rsi', RSI_PERIOD)
+    panel = build_panel(ohlcv_by_symbol)
+    passed, metrics = screen_filters.evaluate_panel(panel, panel_providers={
+        'indicators': streaming_indicator_provider(EXCHANGE, '1d', ohlcv_by_symbol, indicator_specs)
+    })
+    logger.info(f"조건 통과: {int(passed.sum())}/{len(panel)}개")
+
+    for row in np.flatnonzero(passed):
+        symbol = panel.symbols[row]
+        try:
             coin_data = {
                 "symbol": symbol,
-                "downtrend": downtrend_from_ath * 100,
-                "volatility": volatility_metric,
-                "cci": current_cci,
+                "downtrend": float(metrics['downtrend'][row] * 100),
+                "volatility": float(metrics['volatility'][row]),
+                "cci": float(metrics['cci'][row]),
             }
             if USE_RSI_FILTER:
-                coin_data["rsi"] = latest.get(f'RSI_{RSI_PERIOD}')
+                coin_data["rsi"] = float(metrics['rsi'][row])
             if USE_VOLUME_INCREASE_FILTER:
-                coin_data["volume_increase_percentage"] = volume_increase_percentage
+                coin_data["volume_increase_percentage"] = float(metrics['volume_increase_percentage'][row])
             found_coins.append(coin_data)
             logger.info(f"[발견!] {symbol} 이(가) 알트코인 스크리너 기준에 부합합니다.")
 
         except Exception as e:
             logger.error(f"코인 {symbol} 분석 중 오류 발생: {e}")
             continue
-            
+
+    return found_coins
+
+def finalize_altcoin_result(db: Session, found_coins):
+    """발견한 코인 목록으로 결과 표를 만들어 DB에 저장하고 결과 dict를 반환합니다."""
+    header = "=== MOVE/IMX 유사 코인 탐색 스크립트 ===\n"
+    header += f"거래소: {EXCHANGE.upper()}, 기준 통화: {BASE_CURRENCY}\n"
+    header += "-" * 40 + "\n"
+    chart_paths = [] # altcoin 스크리너는 현재 차트를 생성하지 않지만, 구조를 맞춤
+
     output_content = header
     table_headers = ['종목명', 'ATH대비', '변동성(30일)', '현재CCI']
     if USE_RSI_FILTER: table_headers.append('현재RSI')
@@ -171,9 +169,8 @@ def altcoin_screener(
         table_headers=json.dumps(table_headers),
         table_rows=json.dumps(table_rows)
     )
-    db.add(screener_result_db)
-    db.commit()
-    db.refresh(screener_result_db)
+    attach_hits(screener_result_db, found_coins) # 코인별 지표는 screener_hits 테이블에 저장
+    save_result(db, screener_result_db) # 단일 작성자 큐를 거쳐 다른 결과들과 묶어서 커밋
     logger.info(f"알트코인 스크리너 결과 DB에 저장됨: ID {screener_result_db.id}")
 
     return {
@@ -183,4 +180,31 @@ def altcoin_screener(
             "headers": table_headers,
             "rows": table_rows
         }
-    }
\ No newline at end of file
+    }
+
+def altcoin_screener(
+    db: Session, # db 세션 인자 추가
+    min_daily_volume_usd: float = CONFIG.get("altcoin_screener", {}).get("min_daily_volume_usd", 500_000_000),
+    max_listing_days: int = CONFIG.get("altcoin_screener", {}).get("max_listing_days", 1648),
+    min_downtrend_from_ath: float = CONFIG.get("altcoin_screener", {}).get("min_downtrend_from_ath", 0.70),
+    min_volatility: float = CONFIG.get("altcoin_screener", {}).get("min_volatility", 40.0),
+    max_volatility: float = CONFIG.get("altcoin_screener", {}).get("max_volatility", 70.0),
+    min_cci: float = CONFIG.get("altcoin_screener", {}).get("min_cci", -50.0),
+    max_cci: float = CONFIG.get("altcoin_screener", {}).get("max_cci", 50.0),
+    cci_period: int = CONFIG.get("altcoin_screener", {}).get("cci_period", 20)
+):
+    """
+    MOVE/KRW, IMX/KRW와 유사한 특징을 가진 알트코인을 탐색합니다.
+    """
+    logger.info(f"알트코인 스크리너 시작. 파라미터: {{min_daily_volume_usd=min_daily_volume_usd, max_listing_days=max_listing_days, min_downtrend_from_ath=min_downtrend_from_ath, min_volatility=min_volatility, max_volatility=max_volatility, min_cci=min_cci, max_cci=max_cci, cci_period=cci_period}}")
+
+    symbols = select_symbols(min_daily_volume_usd)
+    if symbols is None:
+        return market_error_result()
+    logger.info(f"총 {len(symbols)}개의 {BASE_CURRENCY} 마켓 코인을 대상으로 분석을 시작합니다.")
+
+    found_coins = screen_altcoin_symbols(
+        symbols, min_daily_volume_usd, max_listing_days, min_downtrend_from_ath, min_volatility,
+        max_volatility, min_cci, max_cci, cci_period
+    )
+    return finalize_altcoin_result(db, found_coins)
\ No newline at end of file
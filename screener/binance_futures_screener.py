@@ -1,7 +1,20 @@
 import asyncio
+import json
+import os
+import sys
+import time
 from datetime import datetime
 import ccxt.async_support as ccxt
 import pandas as pd
+from sqlalchemy.orm import Session
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import oi_store
+from utils.config_loader import CONFIG
+from utils.database import ScreenerResult, attach_hits
+from utils.result_writer import save_result
+from utils.oi_buffer import OpenInterestBuffer
+from utils.rate_limiter import WeightedRateLimiter, rate_share
 
 # --- 설정 ---
 # 스크리닝 기준
@@ -11,45 +24,181 @@ MAX_PRICE_CHANGE_24H = 1000.0  # 24시간 가격 상승률 제한 (%)
 MIN_OI_USD_24H = 0 # 최소 24시간 미결제약정 (1천만 USD)
 MIN_VOLUME_USD_24H = 0 # 최소 24시간 거래량 (5천만 USD)
 
-async def fetch_symbol_data(exchange, symbol):
-    """단일 심볼에 대한 모든 필요 데이터를 비동기적으로 가져옵니다."""
+# 요청 가중치 기반 스케줄링 (바이낸스 선물 기본 한도: 분당 2400)
+FUTURES_CONFIG = CONFIG.get("binance_futures", {})
+MAX_WEIGHT_PER_MINUTE = FUTURES_CONFIG.get("max_weight_per_minute", 2400)
+MAX_CONCURRENCY = FUTURES_CONFIG.get("max_concurrency", 20)
+TICKERS_WEIGHT = 40  # 전체 심볼 24시간 티커
+OI_HISTORY_WEIGHT = 1
+FUNDING_RATES_WEIGHT = 10  # 전체 심볼 펀딩비 (premiumIndex)
+LONG_SHORT_WEIGHT = 1
+
+# 펀딩비/롱숏 비율 보강: 펀딩비는 전체 심볼을 한 번에 받아 다음 펀딩 시각까지 캐시하고,
+# 일괄 조회가 없는 롱숏 비율은 최종 스크리닝 결과 심볼만 조회해 기간(1시간)이 바뀔 때까지 캐시합니다.
+# (롱숏 비율 요청은 OI 히스토리와 같은 IP당 5분 요청 수 한도에 포함되므로 전체 심볼에 대해 조회하지 않습니다.)
+LONG_SHORT_TIMEFRAME = FUTURES_CONFIG.get("long_short_timeframe", "1h")
+MAX_FUNDING_RATE = FUTURES_CONFIG.get("max_funding_rate")  # 펀딩비 상한 (%), null이면 필터링하지 않음
+_funding_cache = {'expires_at': 0, 'rates': {}}
+_long_short_cache = {}  # 심볼 -> (만료 시각, 롱숏 정보)
+
+# 상시 모니터 모드: 심볼별 OI 링 버퍼를 유지하며 주기마다 최신 샘플만 받아 갱신
+MONITOR_INTERVAL_SECONDS = FUTURES_CONFIG.get("monitor_interval_seconds", 300)
+MONITOR_TIMEFRAME = FUTURES_CONFIG.get("monitor_timeframe", "5m")
+HOUR_MS = 60 * 60 * 1000
+OI_HISTORY_LIMIT = 500  # fetch_open_interest_history 최대 조회 개수
+
+# 로컬 OI 아카이브: 스캔 때마다 마지막 샘플 이후분만 받아 누적하고, 며칠 단위 변화율을 아카이브에서 계산
+ARCHIVE_EXCHANGE = 'binanceusdm'
+OI_ARCHIVE_TIMEFRAME = FUTURES_CONFIG.get("oi_archive_timeframe", "1h")
+OI_ARCHIVE_DAYS = FUTURES_CONFIG.get("oi_archive_days", 30)  # 아카이브가 비어 있을 때 받을 기간 (거래소 제공 한도)
+# {기간: 최소 OI 증가율(%)}. 값이 null이면 필터링 없이 결과에 변화율만 표시합니다.
+OI_LOOKBACK_WINDOWS = FUTURES_CONFIG.get("oi_lookback_windows", {"3d": None, "7d": None})
+
+async def fetch_funding_rates(exchange, limiter):
+    """
+    전체 심볼의 펀딩비를 한 번의 요청으로 받아 {심볼: 펀딩비 정보}로 반환합니다.
+    다음 펀딩 시각까지는 캐시된 값을 사용합니다.
+    """
+    now = exchange.milliseconds()
+    if now < _funding_cache['expires_at']:
+        return _funding_cache['rates']
+    try:
+        rates = await limiter.run(exchange, 'fetch_funding_rates', weight=FUNDING_RATES_WEIGHT)
+    except Exception as e:
+        print(f"펀딩비 일괄 조회 실패: {e}")
+        return _funding_cache['rates']
+    next_funding = [rate.get('nextFundingTimestamp') for rate in rates.values() if rate.get('nextFundingTimestamp')]
+    _funding_cache['rates'] = rates
+    _funding_cache['expires_at'] = min(next_funding) if next_funding else now + HOUR_MS
+    return rates
+
+async def fetch_long_short_ratio(exchange, symbol, limiter, timeframe=LONG_SHORT_TIMEFRAME):
+    """심볼의 최근 계정 기준 롱숏 비율을 반환합니다. 같은 기간(timeframe) 안에서는 캐시된 값을 사용합니다."""
+    now = exchange.milliseconds()
+    cached = _long_short_cache.get(symbol)
+    if cached and now < cached[0]:
+        return cached[1]
+    history = await limiter.run(exchange, 'fetch_long_short_ratio_history', symbol, timeframe,
+                                limit=1, weight=LONG_SHORT_WEIGHT)
+    ratio = history[-1] if history else None
+    timeframe_ms = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+    _long_short_cache[symbol] = (now // timeframe_ms * timeframe_ms + timeframe_ms, ratio)
+    return ratio
+
+def apply_funding_rate(record, funding):
+    """레코드에 펀딩비(%)를 합칩니다. 펀딩비 상한을 넘으면 None을 반환합니다."""
+    funding_rate = funding.get('fundingRate') if funding else None
+    record['funding_rate'] = funding_rate * 100 if funding_rate is not None else None
+    record['next_funding_time'] = funding.get('nextFundingTimestamp') if funding else None
+    record['long_short_ratio'] = record['long_accounts_1h'] = None  # add_long_short_ratios에서 채움
+    if MAX_FUNDING_RATE is not None and record['funding_rate'] is not None and record['funding_rate'] > MAX_FUNDING_RATE:
+        print(f"  - {record['symbol']}: 펀딩비 초과 ({record['funding_rate']:.4f}% > {MAX_FUNDING_RATE}%)")
+        return None
+    return record
+
+async def _add_long_short_ratio(exchange, record, limiter):
+    try:
+        ratio = await fetch_long_short_ratio(exchange, record['symbol'], limiter)
+    except Exception as e:
+        print(f"  - {record['symbol']}: 롱숏 비율 조회 실패: {e}")
+        ratio = None
+    if ratio:
+        long_account = (ratio.get('info') or {}).get('longAccount')
+        record['long_short_ratio'] = ratio.get('longShortRatio')
+        record['long_accounts_1h'] = float(long_account) * 100 if long_account is not None else None
+
+async def add_long_short_ratios(coins, exchange=None, limiter=None):
+    """
+    스크리닝을 통과한 코인에만 롱숏 비율을 붙입니다. 조회에 실패한 값은 None으로 둡니다.
+    exchange를 주지 않으면 조회용 클라이언트를 만들어 사용 후 닫습니다.
+    """
+    if not coins:
+        return coins
+    own_exchange = exchange is None
+    if own_exchange:
+        exchange = ccxt.binanceusdm({'enableRateLimit': True})
+    limiter = limiter or WeightedRateLimiter(MAX_WEIGHT_PER_MINUTE * rate_share(), max_concurrency=MAX_CONCURRENCY)
+    try:
+        await asyncio.gather(*(_add_long_short_ratio(exchange, coin, limiter) for coin in coins))
+    finally:
+        if own_exchange:
+            await exchange.close()
+    return coins
+
+async def sync_open_interest_archive(exchange, symbol, limiter, timeframe=OI_ARCHIVE_TIMEFRAME):
+    """로컬 아카이브의 마지막 샘플 이후 OI 히스토리만 받아 병합하고, 아카이브 전체 배열을 반환합니다."""
+    stored = oi_store.load_open_interest(ARCHIVE_EXCHANGE, symbol, timeframe)
+    now = exchange.milliseconds()
+    if stored is not None and len(stored):
+        since = int(stored[-1, 0]) + 1
+    else:
+        since = now - OI_ARCHIVE_DAYS * 24 * HOUR_MS
+
+    history = []
+    while since <= now:
+        page = await limiter.run(exchange, 'fetch_open_interest_history', symbol, timeframe,
+                                 since=since, limit=OI_HISTORY_LIMIT, weight=OI_HISTORY_WEIGHT)
+        if not page:
+            break
+        history.extend(page)
+        since = page[-1]['timestamp'] + 1
+        if len(page) < OI_HISTORY_LIMIT:
+            break
+
+    if not history:
+        return stored
+    return await asyncio.to_thread(oi_store.sync_open_interest, ARCHIVE_EXCHANGE, symbol, timeframe, history)
+
+async def fetch_symbol_data(exchange, symbol, ticker, limiter, funding=None):
+    """단일 심볼의 미결제약정 히스토리를 가져와 일괄 조회한 티커/펀딩비 정보와 합칩니다."""
     try:
         now = exchange.milliseconds()
         since_24h = now - 24 * 60 * 60 * 1000
         
-        # 1. Ticker 정보 (가격 변동, 거래량)
-        ticker = await exchange.fetch_ticker(symbol)
-        price_change_24h = ticker.get('percentage')
-        volume_24h_usd = ticker.get('quoteVolume')
+        # 1. Ticker 정보 (가격 변동, 거래량) - fetch_tickers 한 번으로 받은 값 사용
+        price_change_24h = ticker.get('percentage') if ticker else None
+        volume_24h_usd = ticker.get('quoteVolume') if ticker else None
 
         if price_change_24h is None or volume_24h_usd is None:
             print(f"  - {symbol}: Ticker 데이터 부족 (price_change_24h: {price_change_24h}, volume_24h_usd: {volume_24h_usd})")
             return None
+        # OI 조회 전에 거래량 기준부터 확인해 불필요한 요청을 줄입니다.
+        if volume_24h_usd < MIN_VOLUME_USD_24H:
+            print(f"  - {symbol}: Volume 부족 ({volume_24h_usd:.0f} < {MIN_VOLUME_USD_24H})")
+            return None
 
         # 2. 미결제 약정 (Open Interest)
-        oi_history = await exchange.fetch_open_interest_history(symbol, '1h', since=since_24h, limit=25)
-        if len(oi_history) < 24:
-            print(f"  - {symbol}: OI 히스토리 부족 ({len(oi_history)}개)")
-            return None
+        if oi_store.STORE_ENABLED:
+            # 아카이브에 없는 최신 구간만 받고 변화율은 아카이브에서 계산
+            samples = await sync_open_interest_archive(exchange, symbol, limiter)
+            oi_change_24h = oi_store.change(samples, 24 * HOUR_MS)
+            oi_change_4h = oi_store.change(samples, 4 * HOUR_MS)
+            if oi_change_24h is None or oi_change_4h is None:
+                print(f"  - {symbol}: OI 히스토리 부족 ({0 if samples is None else len(samples)}개)")
+                return None
+            current_oi_usd = float(samples[-1, oi_store.VALUE_COLUMN])
+        else:
+            oi_history = await limiter.run(exchange, 'fetch_open_interest_history', symbol, '1h',
+                                           since=since_24h, limit=25, weight=OI_HISTORY_WEIGHT)
+            if len(oi_history) < 24:
+                print(f"  - {symbol}: OI 히스토리 부족 ({len(oi_history)}개)")
+                return None
 
-        current_oi_usd = oi_history[-1]['openInterestValue']
-        oi_24h_ago = oi_history[0]['openInterestValue']
-        # oi_4h_ago 계산 시 인덱스 오류 방지
-        oi_4h_ago_index = -4 if len(oi_history) >= 4 else 0
-        oi_4h_ago = oi_history[oi_4h_ago_index]['openInterestValue']
+            current_oi_usd = oi_history[-1]['openInterestValue']
+            oi_24h_ago = oi_history[0]['openInterestValue']
+            # oi_4h_ago 계산 시 인덱스 오류 방지
+            oi_4h_ago_index = -4 if len(oi_history) >= 4 else 0
+            oi_4h_ago = oi_history[oi_4h_ago_index]['openInterestValue']
 
-        oi_change_24h = ((current_oi_usd - oi_24h_ago) / oi_24h_ago) * 100 if oi_24h_ago else 0
-        oi_change_4h = ((current_oi_usd - oi_4h_ago) / oi_4h_ago) * 100 if oi_4h_ago else 0
+            oi_change_24h = ((current_oi_usd - oi_24h_ago) / oi_24h_ago) * 100 if oi_24h_ago else 0
+            oi_change_4h = ((current_oi_usd - oi_4h_ago) / oi_4h_ago) * 100 if oi_4h_ago else 0
 
         # 기본 필터링: 거래량 및 OI 최소 기준
         if current_oi_usd < MIN_OI_USD_24H:
             print(f"  - {symbol}: OI 부족 ({current_oi_usd:.0f} < {MIN_OI_USD_24H})")
             return None
-        if volume_24h_usd < MIN_VOLUME_USD_24H:
-            print(f"  - {symbol}: Volume 부족 ({volume_24h_usd:.0f} < {MIN_VOLUME_USD_24H})")
-            return None
 
-        return {
+        record = {
             'symbol': symbol,
             'price_change_24h': price_change_24h,
             'volume_24h_usd': volume_24h_usd,
@@ -57,23 +206,60 @@ async def fetch_symbol_data(exchange, symbol):
             'oi_change_24h': oi_change_24h,
             'oi_change_4h': oi_change_4h,
         }
+        return apply_funding_rate(record, funding)
     except Exception as e:
         print(f"  - {symbol}: 데이터 수집 중 예외 발생: {e}")
         return None
 
-async def get_binance_futures_data():
-    """모든 선물 시장의 데이터를 병렬로 가져옵니다."""
+def usdt_futures_symbols(markets):
+    return [m['symbol'] for m in markets.values() if m.get('type') == 'future' and m.get('active') and m['symbol'].endswith(':USDT')]
+
+async def load_futures_universe():
+    """
+    USDT 기반 선물 심볼 목록과 심볼별 티커/펀딩비(필요한 필드만)를 일괄 조회해 반환합니다.
+    분산 스캔에서 심볼 청크와 함께 워커에 넘겨, 워커마다 일괄 조회를 반복하지 않게 합니다.
+    """
+    exchange = ccxt.binanceusdm({'enableRateLimit': True})
+    try:
+        limiter = WeightedRateLimiter(MAX_WEIGHT_PER_MINUTE * rate_share(), max_concurrency=MAX_CONCURRENCY)
+        symbols = usdt_futures_symbols(await exchange.load_markets())
+        tickers = await limiter.run(exchange, 'fetch_tickers', weight=TICKERS_WEIGHT)
+        funding_rates = await fetch_funding_rates(exchange, limiter)
+    finally:
+        await exchange.close()
+    tickers = {symbol: {key: tickers[symbol].get(key) for key in ('percentage', 'quoteVolume', 'last')}
+               for symbol in symbols if symbol in tickers}
+    funding_rates = {symbol: {key: funding_rates[symbol].get(key) for key in ('fundingRate', 'nextFundingTimestamp')}
+                     for symbol in symbols if symbol in funding_rates}
+    return symbols, tickers, funding_rates
+
+async def get_binance_futures_data(symbols=None, tickers=None, funding_rates=None):
+    """
+    선물 시장의 데이터를 병렬로 가져옵니다.
+    symbols를 주면 해당 심볼만, tickers/funding_rates를 주면 일괄 조회 없이 그 값을 사용합니다.
+    """
     exchange = ccxt.binanceusdm({'enableRateLimit': True})
     all_coin_data = []
     try:
-        markets = await exchange.load_markets()
-        symbols = [m['symbol'] for m in markets.values() if m.get('type') == 'future' and m.get('active') and m['symbol'].endswith(':USDT')]
+        if symbols is None:
+            symbols = usdt_futures_symbols(await exchange.load_markets())
+        else:
+            await exchange.load_markets()
         print(f"총 {len(symbols)}개의 USDT 기반 선물 심볼 분석 시작...")
 
-        tasks = [fetch_symbol_data(exchange, symbol) for symbol in symbols]
+        limiter = WeightedRateLimiter(MAX_WEIGHT_PER_MINUTE * rate_share(), max_concurrency=MAX_CONCURRENCY)
+        if tickers is None:
+            tickers = await limiter.run(exchange, 'fetch_tickers', weight=TICKERS_WEIGHT)
+        if funding_rates is None:
+            funding_rates = await fetch_funding_rates(exchange, limiter)
+
+        tasks = [fetch_symbol_data(exchange, symbol, tickers.get(symbol), limiter, funding_rates.get(symbol))
+                 for symbol in symbols]
         results = await asyncio.gather(*tasks)
         
         all_coin_data = [res for res in results if res is not None]
+        if limiter.throttled:
+            print(f"레이트리밋 응답 {limiter.throttled}회 발생 (요청 예산을 자동으로 낮춰 재시도했습니다)")
 
     except Exception as e:
         print(f"데이터 수집 중 오류 발생: {e}")
@@ -82,8 +268,96 @@ async def get_binance_futures_data():
         print(f"\n총 {len(all_coin_data)}개의 유효한 심볼 데이터 수집 완료.")
         return all_coin_data
 
-def screen_coins(data):
-    """수집된 데이터를 기준으로 코인을 스크리닝합니다."""
+async def monitor_symbol(exchange, symbol, ticker, buffers, limiter, timeframe=MONITOR_TIMEFRAME, funding=None):
+    """
+    심볼의 OI 링 버퍼를 갱신하고 버퍼에서 4시간/24시간 OI 변화율을 계산합니다.
+    버퍼가 비어 있으면 24시간치를 채우고, 이후에는 마지막 샘플 이후분만 받습니다.
+    """
+    try:
+        price_change_24h = ticker.get('percentage') if ticker else None
+        volume_24h_usd = ticker.get('quoteVolume') if ticker else None
+        if price_change_24h is None or volume_24h_usd is None or volume_24h_usd < MIN_VOLUME_USD_24H:
+            return None
+
+        timeframe_ms = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+        buffer = buffers.get(symbol)
+        if buffer is None:
+            # 최신 샘플이 직전 구간일 수 있으므로 24시간 전 샘플이 버퍼에 남도록 두 구간의 여유를 둠
+            buffer = buffers[symbol] = OpenInterestBuffer(24 * HOUR_MS // timeframe_ms + 3)
+        since = buffer.last_timestamp
+        if since is None:
+            since = exchange.milliseconds() - 24 * HOUR_MS - 2 * timeframe_ms
+
+        oi_history = await limiter.run(exchange, 'fetch_open_interest_history', symbol, timeframe,
+                                       since=since, limit=min(buffer.capacity, OI_HISTORY_LIMIT),
+                                       weight=OI_HISTORY_WEIGHT)
+        for i, entry in enumerate(oi_history):
+            # 가격은 폴링 시점의 티커 값이므로 가장 최근 샘플에만 기록합니다.
+            price = ticker.get('last') if i == len(oi_history) - 1 else float('nan')
+            buffer.append(entry['timestamp'], entry['openInterestValue'], price)
+
+        oi_change_24h = buffer.change(24 * HOUR_MS)
+        oi_change_4h = buffer.change(4 * HOUR_MS)
+        if oi_change_24h is None or oi_change_4h is None:
+            return None  # 아직 24시간치 샘플이 쌓이지 않음
+        current_oi_usd = float(buffer.latest()[1])
+        if current_oi_usd < MIN_OI_USD_24H:
+            return None
+
+        record = {
+            'symbol': symbol,
+            'price_change_24h': price_change_24h,
+            'volume_24h_usd': volume_24h_usd,
+            'current_oi_usd': current_oi_usd,
+            'oi_change_24h': oi_change_24h,
+            'oi_change_4h': oi_change_4h,
+        }
+        return apply_funding_rate(record, funding)
+    except Exception as e:
+        print(f"  - {symbol}: 모니터 갱신 중 예외 발생: {e}")
+        return None
+
+async def futures_monitor_async(interval_seconds=MONITOR_INTERVAL_SECONDS, cycles=None, publish=None):
+    """
+    상시 실행되는 OI 모니터입니다. 주기마다 티커 일괄 조회 1회와 심볼별 최신 OI 조회만 수행하고,
+    스크리닝 결과를 publish(결과 목록)로 전달합니다. (기본값은 표 출력, cycles가 None이면 무한 반복)
+    """
+    publish = publish or print_results
+    exchange = ccxt.binanceusdm({'enableRateLimit': True})
+    limiter = WeightedRateLimiter(MAX_WEIGHT_PER_MINUTE * rate_share(), max_concurrency=MAX_CONCURRENCY)
+    buffers = {}
+    try:
+        symbols = usdt_futures_symbols(await exchange.load_markets())
+        print(f"총 {len(symbols)}개의 USDT 기반 선물 심볼 모니터링 시작 ({MONITOR_TIMEFRAME}, {interval_seconds}초 주기)...")
+
+        cycle = 0
+        while cycles is None or cycle < cycles:
+            started = time.monotonic()
+            try:
+                tickers = await limiter.run(exchange, 'fetch_tickers', weight=TICKERS_WEIGHT)
+                funding_rates = await fetch_funding_rates(exchange, limiter)
+                results = await asyncio.gather(*[
+                    monitor_symbol(exchange, symbol, tickers.get(symbol), buffers, limiter,
+                                   funding=funding_rates.get(symbol))
+                    for symbol in symbols
+                ])
+                print(f"\n--- 모니터 갱신 ({datetime.now().strftime('%Y-%m-%d %H:%M:%S')}) ---")
+                found_coins = screen_coins([res for res in results if res is not None])
+                publish(await add_long_short_ratios(found_coins, exchange, limiter))
+            except Exception as e:
+                print(f"모니터 갱신 중 오류 발생: {e}")
+            cycle += 1
+            if cycles is None or cycle < cycles:
+                await asyncio.sleep(max(0.0, interval_seconds - (time.monotonic() - started)))
+    finally:
+        await exchange.close()
+
+def screen_coins(data, lookback_windows=None):
+    """
+    수집된 데이터를 기준으로 코인을 스크리닝합니다.
+    lookback_windows({'3d': 최소 증가율 또는 None, ...})를 주면 로컬 OI 아카이브에서 해당 기간의
+    OI 변화율(oi_change_<기간>)을 계산해 추가하고, 최소 증가율이 지정된 기간은 필터로 사용합니다.
+    """
     print(f"\n=== 코인 스크리닝 시작 (총 {len(data)}개 심볼) ===")
     
     # 1차 필터링: OI 및 Volume 최소 기준 (fetch_symbol_data에서 이미 처리됨)
@@ -101,23 +375,75 @@ def screen_coins(data):
     final_filtered_coins = [coin for coin in filtered_by_oi_4h if coin['price_change_24h'] < MAX_PRICE_CHANGE_24H]
     print(f"  - 24H Price Change (< {MAX_PRICE_CHANGE_24H}%) 통과: {len(final_filtered_coins)}개")
 
+    # 5차 필터링: 아카이브 기반 장기 OI Change
+    for label, min_change in (lookback_windows or {}).items():
+        window_ms = ccxt.Exchange.parse_timeframe(label) * 1000
+        for coin in final_filtered_coins:
+            samples = oi_store.load_open_interest(ARCHIVE_EXCHANGE, coin['symbol'], OI_ARCHIVE_TIMEFRAME)
+            coin[f'oi_change_{label}'] = oi_store.change(samples, window_ms)
+        if min_change is not None:
+            final_filtered_coins = [coin for coin in final_filtered_coins
+                                    if coin[f'oi_change_{label}'] is not None and coin[f'oi_change_{label}'] > min_change]
+            print(f"  - {label.upper()} OI Change ({min_change}%) 통과: {len(final_filtered_coins)}개")
+
     return final_filtered_coins
 
-def print_results(found_coins):
-    """스크리닝 결과를 표 형식으로 출력합니다."""
-    print("\n--- 스크리닝 결과 ---")
+def format_results(found_coins):
+    """스크리닝 결과를 (출력 줄 목록, 표 헤더, 표 행) 튜플로 만듭니다."""
+    lines = ["\n--- 스크리닝 결과 ---"]
+    table_headers, table_rows = [], []
     if found_coins:
         sorted_coins = sorted(found_coins, key=lambda x: x['oi_change_24h'], reverse=True)
-        print(f"총 {len(sorted_coins)}개의 코인이 기준을 만족합니다:")
-        print(f"{'Symbol':<15} | {'Price Chg 24H':>15} | {'OI Chg 24H':>13} | {'OI Chg 4H':>12} | {'OI (USD)':>15} | {'Volume 24H (USD)':>20}")
-        print("-" * 105)
+        lines.append(f"총 {len(sorted_coins)}개의 코인이 기준을 만족합니다:")
+        # 아카이브 기반 장기 OI 변화율 컬럼 (screen_coins의 lookback_windows)
+        extra_keys = [key for key in sorted_coins[0] if key.startswith('oi_change_') and key not in ('oi_change_24h', 'oi_change_4h')]
+        table_headers = ['Symbol', 'Price Chg 24H', 'OI Chg 24H', 'OI Chg 4H', 'OI (USD)', 'Volume 24H (USD)', 'Funding', 'Long %']
+        table_headers += ['OI Chg ' + key[len('oi_change_'):].upper() for key in extra_keys]
+        extra_header = "".join(f" | {header:>13}" for header in table_headers[8:])
+        lines.append(f"{'Symbol':<15} | {'Price Chg 24H':>15} | {'OI Chg 24H':>13} | {'OI Chg 4H':>12} | {'OI (USD)':>15} | {'Volume 24H (USD)':>20} | {'Funding':>10} | {'Long %':>8}{extra_header}")
+        lines.append("-" * (129 + 16 * len(extra_keys)))
         for coin in sorted_coins:
             oi_usd_str = f"{coin['current_oi_usd']/1_000_000:.1f}M"
             vol_usd_str = f"{coin['volume_24h_usd']/1_000_000:.1f}M"
-            print(f"{coin['symbol']:<15} | {coin['price_change_24h']:>14.2f}% | {coin['oi_change_24h']:>12.2f}% | {coin['oi_change_4h']:>11.2f}% | {oi_usd_str:>15} | {vol_usd_str:>20}")
+            funding_str = f"{coin['funding_rate']:.4f}%" if coin.get('funding_rate') is not None else '-'
+            long_str = f"{coin['long_accounts_1h']:.1f}%" if coin.get('long_accounts_1h') is not None else '-'
+            extra_values = [f"{coin[key]:.2f}%" if coin.get(key) is not None else '-' for key in extra_keys]
+            extra = "".join(f" | {value:>13}" for value in extra_values)
+            lines.append(f"{coin['symbol']:<15} | {coin['price_change_24h']:>14.2f}% | {coin['oi_change_24h']:>12.2f}% | {coin['oi_change_4h']:>11.2f}% | {oi_usd_str:>15} | {vol_usd_str:>20} | {funding_str:>10} | {long_str:>8}{extra}")
+            table_rows.append([coin['symbol'], f"{coin['price_change_24h']:.2f}%", f"{coin['oi_change_24h']:.2f}%",
+                               f"{coin['oi_change_4h']:.2f}%", oi_usd_str, vol_usd_str, funding_str, long_str] + extra_values)
     else:
-        print("기준에 맞는 코인을 찾지 못했습니다.")
-    print("\n스크리닝 완료.")
+        lines.append("기준에 맞는 코인을 찾지 못했습니다.")
+    lines.append("\n스크리닝 완료.")
+    return lines, table_headers, table_rows
+
+def print_results(found_coins):
+    """스크리닝 결과를 표 형식으로 출력합니다."""
+    lines, _, _ = format_results(found_coins)
+    print("\n".join(lines))
+
+def finalize_futures_result(db: Session, found_coins):
+    """스크리닝 결과를 DB에 저장하고 웹 스크리너와 같은 형태의 결과 dict를 반환합니다."""
+    lines, table_headers, table_rows = format_results(found_coins)
+    output_content = f"--- 바이낸스 선물 OI 기반 스크리너 ({datetime.now().strftime('%Y-%m-%d %H:%M:%S')}) ---\n" + "\n".join(lines) + "\n"
+    screener_result_db = ScreenerResult(
+        screener_name="futures",
+        output_text=output_content,
+        chart_paths=json.dumps([]),
+        table_headers=json.dumps(table_headers),
+        table_rows=json.dumps(table_rows)
+    )
+    attach_hits(screener_result_db, found_coins) # 코인별 지표는 screener_hits 테이블에 저장
+    save_result(db, screener_result_db) # 단일 작성자 큐를 거쳐 다른 결과들과 묶어서 커밋
+    print(f"선물 스크리너 결과 DB에 저장됨: ID {screener_result_db.id}")
+    return {
+        "output": output_content,
+        "charts": [],
+        "table_data": {
+            "headers": table_headers,
+            "rows": table_rows
+        }
+    }
 
 async def futures_screener_async():
     """비동기 로직을 실행하는 메인 함수"""
@@ -128,18 +454,29 @@ async def futures_screener_async():
     print(f"  - 24H Price Change < {MAX_PRICE_CHANGE_24H}%")
     print(f"  - 24H Min OI > ${MIN_OI_USD_24H/1_000_000:.0f}M")
     print(f"  - 24H Min Volume > ${MIN_VOLUME_USD_24H/1_000_000:.0f}M")
+    if MAX_FUNDING_RATE is not None:
+        print(f"  - Funding Rate <= {MAX_FUNDING_RATE}%")
+    lookback_windows = OI_LOOKBACK_WINDOWS if oi_store.STORE_ENABLED else None
+    for label, min_change in (lookback_windows or {}).items():
+        if min_change is not None:
+            print(f"  - {label.upper()} OI Change > {min_change}% (로컬 아카이브)")
     print("-" * 70)
 
     data = await get_binance_futures_data()
     if data:
-        filtered_coins = screen_coins(data)
-        print_results(filtered_coins)
+        filtered_coins = screen_coins(data, lookback_windows)
+        print_results(await add_long_short_ratios(filtered_coins))
     else:
         print("데이터를 가져오는 데 실패하여 스크리닝을 진행할 수 없습니다.")
 
-def futures_screener():
-    """스크리너를 동기적으로 실행하기 위한 래퍼 함수"""
-    asyncio.run(futures_screener_async())
+def futures_screener(mode='scan'):
+    """스크리너를 동기적으로 실행하기 위한 래퍼 함수 ('scan': 1회 스캔, 'monitor': 상시 모니터)"""
+    if mode == 'scan':
+        asyncio.run(futures_screener_async())
+    elif mode == 'monitor':
+        asyncio.run(futures_monitor_async())
+    else:
+        print(f"오류: 유효하지 않은 모드 '{mode}' 입니다. 'scan' 또는 'monitor'를 사용하세요.", file=sys.stderr)
 
 if __name__ == '__main__':
-    futures_screener()
+    futures_screener(mode=sys.argv[1] if len(sys.argv) > 1 else 'scan')
@@ -1,4 +1,5 @@
 import logging
+import numpy as np
 import pandas as pd
 from datetime import datetime
 import os
@@ -8,10 +9,18 @@ from sqlalchemy.orm import Session # Session 임포트
 
 # Add parent directory to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.market_data import get_active_symbols, get_ohlcv, calculate_indicators
+from utils.market_data import (
+    get_active_symbols, prescreen_by_volume, fetch_ohlcv_batch, streaming_indicator_provider, calculate_indicators
+)
 from utils.charting import save_chart
+from utils.panel import build_panel, max_volume_spike
+from utils.filter_chain import (
+    FilterChain, COST_INDICATOR, history_filter, ath_drawdown_filter, volatility_filter,
+    cci_filter, daily_volume_filter
+)
 from utils.config_loader import CONFIG
-from utils.database import ScreenerResult, get_db # ScreenerResult 모델 및 get_db 임포트
+from utils.database import ScreenerResult, attach_hits, get_db # ScreenerResult 모델 및 get_db 임포트
+from utils.result_writer import save_result
 import json # json 임포트
 
 from celery_app import celery_app # celery_app 임포트
@@ -28,86 +37,97 @@ VOLUME_LOOKBACK_DAYS = 30
 CHART_DAYS = 120
 # ----------------------------------------------------
 
-def daily_screener(
-    db: Session, # db 세션 인자 추가
-    min_daily_volume_krw: float = CONFIG.get("daily_screener", {}).get("min_daily_volume_krw", 500_000_000),
-    min_downtrend_from_ath: float = CONFIG.get("daily_screener", {}).get("min_downtrend_from_ath", 0.70),
-    min_volatility_30d: float = CONFIG.get("daily_screener", {}).get("min_volatility_30d", 45.0),
-    max_volatility_30d: float = CONFIG.get("daily_screener", {}).get("max_volatility_30d", 75.0),
-    min_cci: float = CONFIG.get("daily_screener", {}).get("min_cci", -40.0),
-    max_cci: float = CONFIG.get("daily_screener", {}).get("max_cci", 40.0),
-    cci_period: int = CONFIG.get("daily_screener", {}).get("cci_period", 20)
+def build_daily_filters(
+    min_daily_volume_krw, min_downtrend_from_ath, min_volatility_30d,
+    max_volatility_30d, min_cci, max_cci, cci_period
 ):
+    """데일리 스크리너 조건을 필터 체인으로 구성합니다. (CCI는 앞선 조건을 모두 통과한 코인만 계산)"""
+    return FilterChain(
+        [
+            history_filter(cci_period + 30),
+            ath_drawdown_filter(min_downtrend_from_ath),
+            volatility_filter(min_volatility_30d, max_volatility_30d),
+            cci_filter(min_cci, max_cci, cci_period),
+            daily_volume_filter(min_daily_volume_krw, 'KRW'),
+        ],
+        providers={
+            'indicators': (COST_INDICATOR, lambda df: calculate_indicators(df, cci_period=cci_period)),
+        }
+    )
+
+def select_symbols(min_daily_volume):
     """
-    매일 실행하여 관심 코인을 찾아내고, 결과를 watchlist.txt와 차트 이미지로 저장합니다.
+    활성 마켓 심볼을 가져와 24시간 거래대금 기준으로 사전 필터링합니다.
+    마켓 정보를 가져오지 못하면 None을 반환합니다.
     """
-    header = f"--- {datetime.now().strftime('%Y-%m-%d')} 데일리 관심 코인 스크리너 ---\n"
-    logger.info(f"데일리 스크리너 시작. 파라미터: {{min_daily_volume_krw=min_daily_volume_krw, min_downtrend_from_ath=min_downtrend_from_ath, min_volatility_30d=min_volatility_30d, max_volatility_30d=max_volatility_30d, min_cci=min_cci, max_cci=max_cci, cci_period=cci_period}}")
-
     symbols = get_active_symbols(EXCHANGE, BASE_CURRENCY)
     if not symbols:
         logger.error(f"{EXCHANGE}에서 {BASE_CURRENCY} 마켓 정보를 가져오는 데 실패했습니다.")
-        return {"output": f"{EXCHANGE}에서 {BASE_CURRENCY} 마켓 정보를 가져오는 데 실패했습니다.", "charts": [], "table_data": {"headers": [], "rows": []}}
-        
-    logger.info(f"총 {len(symbols)}개의 {BASE_CURRENCY} 마켓 코인 분석 시작...")
+        return None
 
+    # 티커 일괄 조회로 거래대금 미달 심볼을 캔들 수집 전에 제외
+    total_symbols = len(symbols)
+    symbols = prescreen_by_volume(EXCHANGE, symbols, min_daily_volume)
+    logger.info(f"거래대금 사전 필터 통과: {len(symbols)}/{total_symbols}개")
+    return symbols
+
+def market_error_result():
+    return {"output": f"{EXCHANGE}에서 {BASE_CURRENCY} 마켓 정보를 가져오는 데 실패했습니다.", "charts": [], "table_data": {"headers": [], "rows": []}}
+
+def screen_daily_symbols(
+    symbols, min_daily_volume_krw, min_downtrend_from_ath, min_volatility_30d,
+    max_volatility_30d, min_cci, max_cci, cci_period
+):
+    """
+    주어진 심볼들에 데일리 조건을 적용하고 (발견한 코인 목록, 차트 경로 목록)을 반환합니다.
+    심볼 청크 단위로 나누어 여러 워커에서 실행할 수 있도록 코인 정보는 JSON 직렬화 가능한 값만 담습니다.
+    """
     found_coins = []
     chart_paths = []
     
-    for i, symbol in enumerate(symbols):
-        logger.debug(f"[{i+1}/{len(symbols)}] 분석 중: {symbol}...")
-        
-        try:
-            df = get_ohlcv(EXCHANGE, symbol, '1d', limit=2000)
-            if df is None or len(df) < cci_period + 30:
-                logger.debug(f"{symbol}: OHLCV 데이터 부족 또는 로드 실패.")
-                continue
+    screen_filters = build_daily_filters(
+        min_daily_volume_krw, min_downtrend_from_ath, min_volatility_30d,
+        max_volatility_30d, min_cci, max_cci, cci_period
+    )
 
-            df = calculate_indicators(df, cci_period=cci_period)
-            ath = df['high'].max()
-            latest = df.iloc[-1]
-            
-            downtrend_from_ath = (1 - latest['close'] / ath)
-            if downtrend_from_ath < min_downtrend_from_ath:
-                logger.debug(f"{symbol}: ATH 대비 하락률 ({downtrend_from_ath:.2f}) 기준 미달.")
-                continue
-            
-            recent_high = df['high'].tail(30).max()
-            recent_low = df['low'].tail(30).min()
-            volatility_metric = ((recent_high - recent_low) / latest['close']) * 100 if latest['close'] > 0 else 0
-            if not (min_volatility_30d <= volatility_metric <= max_volatility_30d):
-                logger.debug(f"{symbol}: 30일 변동성 ({volatility_metric:.2f}%) 기준 미달.")
-                continue
-            
-            current_cci = latest[f'CCI_{cci_period}_0.015']
-            if not (min_cci <= current_cci <= max_cci):
-                logger.debug(f"{symbol}: CCI ({current_cci:.2f}) 기준 미달.")
+    # 모든 심볼의 일봉을 제한된 동시성으로 한 번에 수집
+    ohlcv_by_symbol = fetch_ohlcv_batch(EXCHANGE, symbols, '1d', limit=2000)
+
+    # 모든 심볼을 (심볼 × 일) 패널로 정렬하여 조건을 불리언 마스크로 한 번에 적용
+    # CCI 최신 값은 앞선 조건을 통과한 심볼만 저장된 스트리밍 상태를 새 캔들만큼 갱신하여 사용
+    panel = build_panel(ohlcv_by_symbol)
+    indicator_specs = {f'CCI_{cci_period}_0.015': ('cci', cci_period)}
+    passed, metrics = screen_filters.evaluate_panel(panel, panel_providers={
+        'indicators': streaming_indicator_provider(EXCHANGE, '1d', ohlcv_by_symbol, indicator_specs)
+    })
+    hits = np.flatnonzero(passed)
+    spike_ratios, spike_timestamps = max_volume_spike(panel.take(hits), VOLUME_LOOKBACK_DAYS)
+    logger.info(f"조건 통과: {len(hits)}/{len(panel)}개")
+
+    for i, row in enumerate(hits):
+        symbol = panel.symbols[row]
+        try:
+            if np.isnan(spike_ratios[i]):
+                logger.debug(f"{symbol}: 거래량 급증 분석을 위한 데이터 부족.")
                 continue
 
-            if (latest['close'] * latest['volume']) < min_daily_volume_krw:
-                logger.debug(f"{symbol}: 일일 거래량 ({latest['close'] * latest['volume']:.0f} KRW) 기준 미달.")
-                continue
+            # 차트용 CCI 시계열은 조건을 통과한 코인에 대해서만 계산
+            df = calculate_indicators(ohlcv_by_symbol[symbol], cci_period=cci_period, cache_key=(EXCHANGE, symbol, '1d'))
+            max_spike_date = pd.to_datetime(spike_timestamps[i], unit='ms')
 
-            df['volume_sma_30'] = df['volume'].rolling(window=30).mean()
-            recent_volume_df = df.iloc[-VOLUME_LOOKBACK_DAYS:].copy()
-            recent_volume_df['spike_ratio'] = recent_volume_df['volume'] / recent_volume_df['volume_sma_30']
-            max_spike_day = recent_volume_df.loc[recent_volume_df['spike_ratio'].idxmax()]
-            
             coin_data = {
                 "symbol": symbol,
-                "downtrend": downtrend_from_ath * 100,
-                "volatility": volatility_metric,
-                "cci": current_cci,
-                "max_volume_spike": max_spike_day['spike_ratio'],
-                "max_spike_date": max_spike_day['timestamp'].strftime('%m-%d'),
-                "max_spike_date_full": max_spike_day['timestamp']
+                "downtrend": float(metrics['downtrend'][row] * 100),
+                "volatility": float(metrics['volatility'][row]),
+                "cci": float(metrics['cci'][row]),
+                "max_volume_spike": float(spike_ratios[i]),
+                "max_spike_date": max_spike_date.strftime('%m-%d'),
             }
             found_coins.append(coin_data)
             logger.info(f"[발견!] {symbol} 이(가) 데일리 스크리너 기준에 부합합니다.")
             
             # 차트 생성 정보 준비
             cci_panel = mpf.make_addplot(df.tail(CHART_DAYS)[f'CCI_{cci_period}_0.015'], panel=2, color='purple', ylabel='CCI')
-            spike_date = pd.to_datetime(coin_data['max_spike_date_full'])
             
             chart_title = coin_data['symbol']
 
@@ -118,7 +138,7 @@ def daily_screener(
                 output_dir=OUTPUT_DIR,
                 title=chart_title,
                 add_plots=[cci_panel],
-                vlines=[spike_date]
+                vlines=[max_spike_date]
             )
             if chart_path:
                 chart_paths.append(chart_path)
@@ -126,7 +146,13 @@ def daily_screener(
         except Exception as e:
             logger.error(f"코인 {symbol} 분석 중 오류 발생: {e}")
             continue
-            
+
+    return found_coins, chart_paths
+
+def finalize_daily_result(db: Session, found_coins, chart_paths):
+    """발견한 코인 목록으로 결과 표를 만들어 DB에 저장하고 결과 dict를 반환합니다."""
+    header = f"--- {datetime.now().strftime('%Y-%m-%d')} 데일리 관심 코인 스크리너 ---\n"
+
     # 결과 요약
     output_content = header
     table_headers = ['종목명', 'ATH대비', '변동성(30일)', '현재CCI', '과거 거래량 급증']
@@ -166,22 +192,8 @@ def daily_screener(
         table_headers=json.dumps(table_headers),
         table_rows=json.dumps(table_rows)
     )
-    db.add(screener_result_db)
-    db.commit()
-    db.refresh(screener_result_db)
-    logger.info(f"데일리 스크리너 결과 DB에 저장됨: ID {screener_result_db.id}")
-
-    # 데이터베이스에 결과 저장
-    screener_result_db = ScreenerResult(
-        screener_name="daily",
-        output_text=output_content,
-        chart_paths=json.dumps(chart_paths),
-        table_headers=json.dumps(table_headers),
-        table_rows=json.dumps(table_rows)
-    )
-    db.add(screener_result_db)
-    db.commit()
-    db.refresh(screener_result_db)
+    attach_hits(screener_result_db, found_coins) # 코인별 지표는 screener_hits 테이블에 저장
+    save_result(db, screener_result_db) # 단일 작성자 큐를 거쳐 다른 결과들과 묶어서 커밋
     logger.info(f"데일리 스크리너 결과 DB에 저장됨: ID {screener_result_db.id}")
 
     return {
@@ -191,4 +203,30 @@ def daily_screener(
             "headers": table_headers,
             "rows": table_rows
         }
-    }
\ No newline at end of file
+    }
+
+def daily_screener(
+    db: Session, # db 세션 인자 추가
+    min_daily_volume_krw: float = CONFIG.get("daily_screener", {}).get("min_daily_volume_krw", 500_000_000),
+    min_downtrend_from_ath: float = CONFIG.get("daily_screener", {}).get("min_downtrend_from_ath", 0.70),
+    min_volatility_30d: float = CONFIG.get("daily_screener", {}).get("min_volatility_30d", 45.0),
+    max_volatility_30d: float = CONFIG.get("daily_screener", {}).get("max_volatility_30d", 75.0),
+    min_cci: float = CONFIG.get("daily_screener", {}).get("min_cci", -40.0),
+    max_cci: float = CONFIG.get("daily_screener", {}).get("max_cci", 40.0),
+    cci_period: int = CONFIG.get("daily_screener", {}).get("cci_period", 20)
+):
+    """
+    매일 실행하여 관심 코인을 찾아내고, 결과를 watchlist.txt와 차트 이미지로 저장합니다.
+    """
+    logger.info(f"데일리 스크리너 시작. 파라미터: {{min_daily_volume_krw=min_daily_volume_krw, min_downtrend_from_ath=min_downtrend_from_ath, min_volatility_30d=min_volatility_30d, max_volatility_30d=max_volatility_30d, min_cci=min_cci, max_cci=max_cci, cci_period=cci_period}}")
+
+    symbols = select_symbols(min_daily_volume_krw)
+    if symbols is None:
+        return market_error_result()
+    logger.info(f"총 {len(symbols)}개의 {BASE_CURRENCY} 마켓 코인 분석 시작...")
+
+    found_coins, chart_paths = screen_daily_symbols(
+        symbols, min_daily_volume_krw, min_downtrend_from_ath, min_volatility_30d,
+        max_volatility_30d, min_cci, max_cci, cci_period
+    )
+    return finalize_daily_result(db, found_coins, chart_paths)
\ No newline at end of file
@@ -1,12 +1,15 @@
 import asyncio
 import ccxt.async_support as ccxt
 import pandas as pd
-import pandas_ta as ta
 import json
 import os
 import sys
 import mplfinance as mpf
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import (backtest, indicators, market_data, multi_timeframe, ohlcv_store, parameter_sweep,
+                   portfolio_backtest)
+
 # --- 설정 로드 ---
 def load_config():
     # config.json 파일 경로를 스크립트 기준으로 찾습니다.
@@ -23,41 +26,70 @@ SYMBOL = config.get('DAY_TRADING_SYMBOL', 'BTC/USDT')
 PROFIT_TARGET_USD = config.get('PROFIT_TARGET_USD', 100)
 POSITION_SIZE_USD = config.get('POSITION_SIZE_USD', 10000)
 MIN_RR_RATIO = config.get('MIN_RR_RATIO', 2.0)
+# 파라미터 탐색(sweep) 모드의 그리드. 기본값은 기존 전략값(EMA 5/20, RSI>=50, 익절 1%, 손절 0.5%)을 포함합니다.
+SWEEP_GRID = config.get('DAY_TRADING_SWEEP_GRID', {
+    'fast_period': [3, 5, 8, 10],
+    'slow_period': [20, 30, 50],
+    'rsi_period': [14],
+    'rsi_threshold': [40, 50, 60],
+    'take_profit': [0.005, 0.01, 0.02, 0.03],
+    'stop_loss': [0.005, 0.01, 0.02],
+    'position_size_usd': [POSITION_SIZE_USD],
+})
+SWEEP_TOP_N = config.get('DAY_TRADING_SWEEP_TOP_N', 20)
+# 포트폴리오 백테스트 설정. 관심 목록 파일(한 줄에 심볼 하나)이 없으면 Bybit의 모든 USDT 현물 마켓을 사용합니다.
+PORTFOLIO_EXCHANGE = 'bybit'
+PORTFOLIO_WATCHLIST = config.get('DAY_TRADING_WATCHLIST')
+PORTFOLIO_INITIAL_BALANCE = config.get('PORTFOLIO_INITIAL_BALANCE', 100000)
+PORTFOLIO_TOP_N = config.get('PORTFOLIO_TOP_N', 20)
+# 오프라인 재현 백테스트 설정. 로컬 저장소(data/ohlcv)의 캔들을 청크 단위로 읽어 재생합니다.
+REPLAY_CONFIG = config.get('BACKTEST_REPLAY', {})
+REPLAY_EXCHANGE = 'bybit'
+REPLAY_TIMEFRAME = REPLAY_CONFIG.get('timeframe', '1h')
+REPLAY_CHUNK_SIZE = REPLAY_CONFIG.get('chunk_size', 100_000)
+REPLAY_DOWNLOAD = REPLAY_CONFIG.get('download', True)  # 재생 전 구간의 캔들을 저장소에 내려받을지 여부
+# 익절/손절을 1시간봉 종가 대신 하위 타임프레임(1분봉) 고가/저가로 판정할지 여부
+BACKTEST_INTRABAR = config.get('BACKTEST_INTRABAR', False)
+BACKTEST_INTRABAR_TIMEFRAME = config.get('BACKTEST_INTRABAR_TIMEFRAME', '1m')
 
 
 def apply_technical_indicators(df):
+    # NumPy 지표 커널로 계산하며, 컬럼명은 기존 pandas_ta 출력과 동일하게 유지합니다.
+    high = df['high'].to_numpy(dtype=float)
+    low = df['low'].to_numpy(dtype=float)
+    close = df['close'].to_numpy(dtype=float)
+
     # 단타 전략에 필요한 지표 추가
-    if len(df) >= 5: df.ta.ema(length=5, append=True)
-    if len(df) >= 20: df.ta.ema(length=20, append=True)
-    if len(df) >= 14: df.ta.rsi(append=True)
+    if len(df) >= 5: df['EMA_5'] = indicators.ema(close, 5)
+    if len(df) >= 20: df['EMA_20'] = indicators.ema(close, 20)
+    if len(df) >= 14: df['RSI_14'] = indicators.rsi(close, 14)
 
     # 기존 지표 (필요시 유지 또는 제거)
-    if len(df) >= 200: df.ta.ema(length=200, append=True)
-    if len(df) >= 50: df.ta.ema(length=50, append=True)
-    if len(df) >= 26: df.ta.macd(append=True)
-    if len(df) >= 20: df.ta.bbands(append=True)
-    if len(df) >= 20: df.ta.cci(append=True)
-    if len(df) >= 14: df.ta.stoch(append=True)
+    if len(df) >= 200: df['EMA_200'] = indicators.ema(close, 200)
+    if len(df) >= 50: df['EMA_50'] = indicators.ema(close, 50)
+    if len(df) >= 26:
+        df['MACD_12_26_9'], df['MACDh_12_26_9'], df['MACDs_12_26_9'] = indicators.macd(close)
+    if len(df) >= 20:
+        df['BBL_5_2.0'], df['BBM_5_2.0'], df['BBU_5_2.0'], df['BBB_5_2.0'], df['BBP_5_2.0'] = indicators.bbands(close)
+    if len(df) >= 20: df['CCI_14_0.015'] = indicators.cci(high, low, close, 14)
+    if len(df) >= 14:
+        df['STOCHk_14_3_3'], df['STOCHd_14_3_3'] = indicators.stoch(high, low, close)
     return df
 
 async def run_screener_logic():
     print(f"--- {SYMBOL} 단타 트레이딩 기회 분석 ---")
-    exchange = ccxt.bybit({'enableRateLimit': True})
     try:
         timeframes = ['1d', '4h', '1h', '15m', '5m', '1m']
         print(f"데이터 로딩 중 ({', '.join(timeframes)})...")
-        
-        tasks = [exchange.fetch_ohlcv(SYMBOL, tf, limit=200) for tf in timeframes]
-        results = await asyncio.gather(*tasks)
-        
-        data = {tf: res for tf, res in zip(timeframes, results)}
-        dfs = {tf: pd.DataFrame(d, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume']) for tf, d in data.items()}
-
-        for tf, df in dfs.items():
-            if df.empty:
+
+        # 기준 타임프레임(1m, 1h)만 받아 나머지는 리샘플링으로 만듭니다.
+        dfs = await asyncio.to_thread(multi_timeframe.build_multi_timeframe, 'bybit', SYMBOL, timeframes, 200)
+
+        for tf in timeframes:
+            df = dfs.get(tf)
+            if df is None or df.empty:
                 print(f"오류: {tf} 데이터를 불러오지 못했습니다.")
                 return
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
             df.set_index('timestamp', inplace=True)
             dfs[tf] = apply_technical_indicators(df.copy())
 
@@ -68,20 +100,33 @@ async def run_screener_logic():
     except Exception as e:
         print(f"분석 중 오류 발생: {e}")
     finally:
-        await exchange.close()
         print("\n--- 분석 종료 ---\n")
 
+async def fetch_backtest_candles(exchange, limit=1000):
+    ohlcv = await exchange.fetch_ohlcv(SYMBOL, '1h', limit=limit)
+    if not ohlcv:
+        return None
+    if ohlcv_store.STORE_ENABLED:
+        # 받은 캔들을 로컬 아카이브에 기록해 두면 이후 replay 모드로 같은 구간을 재현할 수 있습니다.
+        # 아직 진행 중인 마지막 캔들은 값이 바뀌므로 마감된 캔들만 기록합니다.
+        timeframe_ms = exchange.parse_timeframe('1h') * 1000
+        current_open = exchange.milliseconds() // timeframe_ms * timeframe_ms
+        try:
+            ohlcv_store.sync_candles(REPLAY_EXCHANGE, SYMBOL, '1h', [c for c in ohlcv if c[0] < current_open])
+        except Exception as e:
+            print(f"캔들 아카이브 기록 실패: {e}")
+    return pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+
 async def run_backtest_logic():
     print(f"--- {SYMBOL} 전략 백테스팅 시작 ---")
     exchange = ccxt.bybit({'enableRateLimit': True})
     try:
         print(f"과거 1시간봉 데이터 로딩 중 ({SYMBOL}, 1000 캔들)...")
-        ohlcv = await exchange.fetch_ohlcv(SYMBOL, '1h', limit=1000)
-        if not ohlcv:
+        df = await fetch_backtest_candles(exchange)
+        if df is None:
             print("오류: 데이터를 불러오지 못했습니다.")
             return
 
-        df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
         df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
         df.set_index('timestamp', inplace=True)
         df = apply_technical_indicators(df.copy())
@@ -95,105 +140,51 @@ async def run_backtest_logic():
 
         # 백테스팅 변수 초기화
         initial_balance = 10000  # 초기 자본
-        current_balance = initial_balance
-        in_position = False
-        entry_price = 0
-        trade_history = []
         position_size_usd = POSITION_SIZE_USD # config에서 가져온 포지션 사이즈
 
         print(f"백테스팅 시뮬레이션 시작... (초기 자본: {initial_balance:.2f} USD)")
 
-        # 데이터 순회 (지표 계산을 위해 충분한 데이터가 있는 시점부터 시작)
         # EMA_20이 계산되려면 최소 20개의 데이터가 필요하므로, 그 이후부터 시작
         start_index = max(20, 14) # EMA_20과 RSI_14 중 더 큰 값
 
-        for i in range(start_index, len(df)):
-            current_candle = df.iloc[i]
-            prev_candle = df.iloc[i-1]
-
-            # 현재 캔들의 종가
-            current_close = current_candle['close']
-
-            # 지표 값
-            ema_5 = current_candle['EMA_5']
-            ema_20 = current_candle['EMA_20']
-            rsi_14 = current_candle['RSI_14']
-
-            prev_ema_5 = prev_candle['EMA_5']
-            prev_ema_20 = prev_candle['EMA_20']
-
-            # 진입 조건 (롱 포지션)
-            if not in_position:
-                # 골든 크로스: 이전 캔들에서는 5-EMA < 20-EMA 였고, 현재 캔들에서는 5-EMA > 20-EMA
-                golden_cross = (prev_ema_5 < prev_ema_20) and (ema_5 > ema_20)
-                rsi_condition = rsi_14 >= 50
-
-                if golden_cross and rsi_condition:
-                    entry_price = current_close
-                    in_position = True
-                    # print(f"[{current_candle.name}] 진입 (롱): {entry_price:.2f}")
-
-            # 청산 조건 (롱 포지션)
-            elif in_position:
-                # 익절 목표 (1%)
-                take_profit_price = entry_price * (1 + 0.01)
-                # 손절 목표 (0.5%)
-                stop_loss_price = entry_price * (1 - 0.005)
-
-                # 데드 크로스: 이전 캔들에서는 5-EMA > 20-EMA 였고, 현재 캔들에서는 5-EMA < 20-EMA
-                death_cross = (prev_ema_5 > prev_ema_20) and (ema_5 < ema_20)
-
-                exit_reason = None
-                exit_price = 0
-
-                if current_close >= take_profit_price:
-                    exit_price = take_profit_price # 익절가로 청산
-                    exit_reason = "익절"
-                elif current_close <= stop_loss_price:
-                    exit_price = stop_loss_price # 손절가로 청산
-                    exit_reason = "손절"
-                elif death_cross:
-                    exit_price = current_close # 데드 크로스 발생 시 현재가로 청산
-                    exit_reason = "데드 크로스"
-
-                if exit_reason:
-                    profit_loss_ratio = (exit_price - entry_price) / entry_price
-                    trade_pnl_usd = position_size_usd * profit_loss_ratio
-                    current_balance += trade_pnl_usd
-
-                    trade_history.append({
-                        'entry_time': df.iloc[i-1].name, # 진입은 이전 캔들 종가로 가정
-                        'entry_price': entry_price,
-                        'exit_time': current_candle.name,
-                        'exit_price': exit_price,
-                        'profit_loss_ratio': profit_loss_ratio,
-                        'profit_loss_usd': trade_pnl_usd,
-                        'exit_reason': exit_reason
-                    })
-                    in_position = False
-                    # print(f"[{current_candle.name}] 청산 ({exit_reason}): {exit_price:.2f}, PnL: {trade_pnl_usd:.2f} USD, 잔고: {current_balance:.2f}")
-
-        # 최종 결과 계산
-        total_trades = len(trade_history)
-        winning_trades = sum(1 for trade in trade_history if trade['profit_loss_usd'] > 0)
-        losing_trades = total_trades - winning_trades
-        win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
-        total_pnl = current_balance - initial_balance
+        intrabar = None
+        if BACKTEST_INTRABAR:
+            timestamps = df.index.to_numpy().astype('datetime64[ms]').astype('int64')
+            hour_ms = 60 * 60 * 1000
+            print(f"익절/손절 판정용 {BACKTEST_INTRABAR_TIMEFRAME} 데이터 로딩 중...")
+            lower = await asyncio.to_thread(
+                market_data.load_candle_range, REPLAY_EXCHANGE, SYMBOL, BACKTEST_INTRABAR_TIMEFRAME,
+                int(timestamps[0]), int(timestamps[-1]) + hour_ms
+            )
+            intrabar = backtest.IntrabarPath(timestamps, df['close'].to_numpy(dtype=float), lower, hour_ms)
+
+        ledger, summary = backtest.run_backtest(
+            df['close'].to_numpy(dtype=float),
+            df['EMA_5'].to_numpy(dtype=float),
+            df['EMA_20'].to_numpy(dtype=float),
+            df['RSI_14'].to_numpy(dtype=float),
+            rsi_threshold=50,
+            take_profit=0.01,   # 익절 목표 (1%)
+            stop_loss=0.005,    # 손절 목표 (0.5%)
+            position_size_usd=position_size_usd,
+            initial_balance=initial_balance,
+            start_index=start_index,
+            intrabar=intrabar
+        )
+        total_trades = summary['total_trades']
 
         print("\n--- 백테스팅 결과 ---")
         print(f"초기 자본: {initial_balance:.2f} USD")
-        print(f"최종 자본: {current_balance:.2f} USD")
-        print(f"총 손익: {total_pnl:.2f} USD")
+        print(f"최종 자본: {summary['final_balance']:.2f} USD")
+        print(f"총 손익: {summary['total_pnl']:.2f} USD")
         print(f"총 거래 횟수: {total_trades}")
-        print(f"승리 거래: {winning_trades}")
-        print(f"패배 거래: {losing_trades}")
-        print(f"승률: {win_rate:.2f}%")
+        print(f"승리 거래: {summary['winning_trades']}")
+        print(f"패배 거래: {summary['losing_trades']}")
+        print(f"승률: {summary['win_rate']:.2f}%")
 
         if total_trades > 0:
-            avg_profit_per_trade = sum(trade['profit_loss_usd'] for trade in trade_history if trade['profit_loss_usd'] > 0) / winning_trades if winning_trades > 0 else 0
-            avg_loss_per_trade = sum(trade['profit_loss_usd'] for trade in trade_history if trade['profit_loss_usd'] < 0) / losing_trades if losing_trades > 0 else 0
-            print(f"평균 익절: {avg_profit_per_trade:.2f} USD")
-            print(f"평균 손절: {avg_loss_per_trade:.2f} USD")
+            print(f"평균 익절: {summary['avg_profit']:.2f} USD")
+            print(f"평균 손절: {summary['avg_loss']:.2f} USD")
 
         # --- 차트 생성 로직 추가 ---
         if not df.empty and total_trades > 0:
@@ -204,8 +195,8 @@ async def run_backtest_logic():
             chart_file_path = os.path.join(output_dir, f"backtest_{SYMBOL.replace('/', '_')}.png")
 
             # 진입/청산 지점 시각화를 위한 데이터 준비
-            entry_points = [trade['entry_time'] for trade in trade_history]
-            exit_points = [trade['exit_time'] for trade in trade_history]
+            entry_points = list(df.index[ledger['entry_index']])
+            exit_points = list(df.index[ledger['exit_index']])
             
             entry_markers = [df.loc[time]['low'] * 0.98 for time in entry_points if time in df.index]
             exit_markers = [df.loc[time]['high'] * 1.02 for time in exit_points if time in df.index]
@@ -244,18 +235,126 @@ async def run_backtest_logic():
         await exchange.close()
         print("\n--- 백테스팅 종료 ---\n")
 
+async def run_sweep_logic(grid=None, max_workers=None):
+    grid = grid or SWEEP_GRID
+    print(f"--- {SYMBOL} 전략 파라미터 탐색 시작 ---")
+    exchange = ccxt.bybit({'enableRateLimit': True})
+    try:
+        print(f"과거 1시간봉 데이터 로딩 중 ({SYMBOL}, 1000 캔들)...")
+        df = await fetch_backtest_candles(exchange)
+    except (ccxt.NetworkError, ccxt.ExchangeError) as e:
+        print(f"파라미터 탐색 중 거래소 통신 오류 발생: {type(e).__name__} - {e}")
+        return None
+    finally:
+        await exchange.close()
+
+    if df is None:
+        print("오류: 데이터를 불러오지 못했습니다.")
+        return None
+
+    print(f"조합 탐색 중... (워커 수: {max_workers or os.cpu_count()})")
+    # 프로세스 풀 작업이 이벤트 루프를 막지 않도록 별도 스레드에서 실행합니다.
+    results = await asyncio.to_thread(
+        parameter_sweep.sweep_parameters, df['close'].to_numpy(dtype=float), grid, max_workers
+    )
+    print(f"\n--- 파라미터 탐색 결과 (총 {len(results)}개 조합, 상위 {SWEEP_TOP_N}개) ---")
+    print(results.head(SWEEP_TOP_N).to_string())
+    print("\n--- 파라미터 탐색 종료 ---\n")
+    return results
+
+def load_watchlist(path):
+    """관심 목록 파일에서 심볼 목록을 읽습니다. 빈 줄과 '#' 주석은 무시합니다."""
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), path)
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = (line.split('#', 1)[0].strip() for line in f)
+        return [line for line in lines if line]
+
+async def run_portfolio_logic(symbols=None, max_workers=None):
+    if symbols is None:
+        if PORTFOLIO_WATCHLIST:
+            symbols = load_watchlist(PORTFOLIO_WATCHLIST)
+        else:
+            symbols = await asyncio.to_thread(market_data.get_active_symbols, PORTFOLIO_EXCHANGE, 'USDT', 'spot')
+    print(f"--- 포트폴리오 백테스팅 시작 ({len(symbols)}개 심볼) ---")
+    if not symbols:
+        print("오류: 백테스팅할 심볼이 없습니다.")
+        return None
+
+    print("과거 1시간봉 데이터 로딩 중 (심볼당 1000 캔들)...")
+    frames = await market_data.fetch_ohlcv_batch_async(PORTFOLIO_EXCHANGE, symbols, '1h', limit=1000)
+    print(f"{len(frames)}개 심볼 데이터 로딩 완료. 시뮬레이션 시작... (초기 자본: {PORTFOLIO_INITIAL_BALANCE:.2f} USD)")
+
+    trades, per_symbol, summary = await asyncio.to_thread(
+        portfolio_backtest.run_portfolio_backtest, frames, PORTFOLIO_INITIAL_BALANCE, POSITION_SIZE_USD,
+        None, max_workers
+    )
+
+    print("\n--- 포트폴리오 백테스팅 결과 ---")
+    print(f"초기 자본: {summary['initial_balance']:.2f} USD")
+    print(f"최종 자본: {summary['final_balance']:.2f} USD")
+    print(f"총 손익: {summary['total_pnl']:.2f} USD")
+    print(f"총 거래 횟수: {summary['total_trades']} (자본 부족으로 건너뛴 신호: {summary['skipped_signals']})")
+    print(f"승률: {summary['win_rate']:.2f}%")
+    print(f"최대 동시 보유: {summary['max_open_positions']}")
+    print(f"최대 낙폭(실현 기준): {summary['max_drawdown']:.2f}%")
+    print(f"\n--- 심볼별 결과 (상위 {PORTFOLIO_TOP_N}개) ---")
+    print(per_symbol.head(PORTFOLIO_TOP_N).to_string())
+    print("\n--- 포트폴리오 백테스팅 종료 ---\n")
+    return trades, per_symbol, summary
+
+def _to_milliseconds(value):
+    return None if value is None else int(pd.Timestamp(value).value // 1_000_000)
+
+def run_replay_logic(start=None, end=None, timeframe=REPLAY_TIMEFRAME):
+    """로컬 캔들 아카이브에서 [start, end) 구간을 재생하는 네트워크 없는 백테스트입니다."""
+    start = start or REPLAY_CONFIG.get('start')
+    end = end or REPLAY_CONFIG.get('end')
+    start_ms, end_ms = _to_milliseconds(start), _to_milliseconds(end)
+    print(f"--- {SYMBOL} 오프라인 재현 백테스팅 ({timeframe}, {start or '처음'} ~ {end or '마지막'}) ---")
+
+    if REPLAY_DOWNLOAD and start_ms is not None and not ohlcv_store.STORE_OFFLINE:
+        try:
+            count = market_data.download_candles(REPLAY_EXCHANGE, SYMBOL, timeframe, start_ms, end_ms)
+            print(f"캔들 아카이브 갱신 완료 (저장된 캔들: {count}개)")
+        except Exception as e:
+            print(f"캔들 아카이브 갱신 실패, 저장된 캔들만 사용합니다: {type(e).__name__} - {e}")
+
+    chunks = ohlcv_store.iter_candles(REPLAY_EXCHANGE, SYMBOL, timeframe, start_ms, end_ms, REPLAY_CHUNK_SIZE)
+    ledger, summary = backtest.run_backtest_chunks(chunks, position_size_usd=POSITION_SIZE_USD)
+
+    print("\n--- 재현 백테스팅 결과 ---")
+    print(f"초기 자본: {summary['initial_balance']:.2f} USD")
+    print(f"최종 자본: {summary['final_balance']:.2f} USD")
+    print(f"총 손익: {summary['total_pnl']:.2f} USD")
+    print(f"총 거래 횟수: {summary['total_trades']}")
+    print(f"승리 거래: {summary['winning_trades']}")
+    print(f"패배 거래: {summary['losing_trades']}")
+    print(f"승률: {summary['win_rate']:.2f}%")
+    if summary['total_trades'] > 0:
+        print(f"평균 익절: {summary['avg_profit']:.2f} USD")
+        print(f"평균 손절: {summary['avg_loss']:.2f} USD")
+    print("\n--- 재현 백테스팅 종료 ---\n")
+    return ledger, summary
+
 def day_trading_screener(mode='screener'):
     """
     일봉, 4시간봉, 1시간봉을 종합적으로 분석하여 손익비 좋은 단타 타점을 찾습니다.
-    'screener' 또는 'backtest' 모드로 실행할 수 있습니다.
+    'screener', 'backtest', 'sweep'(파라미터 탐색), 'portfolio'(다중 심볼) 또는 'replay'(오프라인 재현) 모드로 실행할 수 있습니다.
     """
     if mode == 'screener':
         asyncio.run(run_screener_logic())
     elif mode == 'backtest':
         asyncio.run(run_backtest_logic())
+    elif mode == 'sweep':
+        asyncio.run(run_sweep_logic())
+    elif mode == 'portfolio':
+        asyncio.run(run_portfolio_logic())
+    elif mode == 'replay':
+        run_replay_logic()
     else:
-        print(f"오류: 유효하지 않은 모드 '{mode}' 입니다. 'screener' 또는 'backtest'를 사용하세요.", file=sys.stderr)
+        print(f"오류: 유효하지 않은 모드 '{mode}' 입니다. 'screener', 'backtest', 'sweep', 'portfolio' 또는 'replay'를 사용하세요.", file=sys.stderr)
 
 if __name__ == "__main__":
-    # 이 파일을 직접 실행할 경우 기본 백테스팅 모드로 실행
-    day_trading_screener(mode='backtest')
+    # 이 파일을 직접 실행할 경우 기본 백테스팅 모드로 실행 (인자로 모드 지정 가능)
+    day_trading_screener(mode=sys.argv[1] if len(sys.argv) > 1 else 'backtest')
@@ -0,0 +1,174 @@
+import asyncio
+import inspect
+import logging
+import os
+import sys
+
+from celery import chord, group
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from celery_app import celery_app
+from screener import altcoin_screener, binance_futures_screener, daily_screener
+from utils import oi_store
+from utils.config_loader import CONFIG
+from utils.database import SessionLocal, compact_database, prune_results
+from utils.rate_limiter import set_rate_share
+
+logger = logging.getLogger(__name__)
+
+# 스크리너 스캔을 심볼 청크 단위 Celery 태스크로 분산 실행합니다.
+# run_distributed_scan이 심볼 목록을 준비해 청크로 나누고(scan_chunk), 모든 청크가 끝나면
+# 코드(chord) 콜백(merge_scan_results)이 결과를 합쳐 ScreenerResult 하나로 저장합니다.
+# 거래소 요청 한도는 IP 단위이므로, 동시에 실행되는 청크들은 거래소 요청 예산을 나눠 씁니다. (rate_share)
+# daily 청크가 만드는 차트 PNG는 청크를 처리한 워커의 charts/ 디렉터리에 저장됩니다.
+# 웹 서버의 /charts에서 보이려면 워커와 웹 서버가 charts/를 공유 볼륨으로 마운트해야 합니다.
+
+CELERY_CONFIG = CONFIG.get("celery", {})
+SCAN_CHUNK_SIZE = CELERY_CONFIG.get("chunk_size", 25)  # 청크 태스크 하나가 맡는 심볼 수
+SCAN_TIMEOUT = CELERY_CONFIG.get("result_timeout", 1800)  # 병합 결과 대기 시간 (초)
+# 한 IP에서 동시에 실행될 수 있는 청크 태스크 수 (같은 IP를 쓰는 워커들의 동시성 합)
+MAX_PARALLEL_CHUNKS = CELERY_CONFIG.get("max_parallel_chunks", 4)
+
+
+def _with_defaults(func, params):
+    """스크리너 함수의 기본 인자 값 위에 요청 파라미터를 덮어씁니다."""
+    defaults = {
+        name: parameter.default for name, parameter in inspect.signature(func).parameters.items()
+        if parameter.default is not inspect.Parameter.empty
+    }
+    unknown = set(params) - set(defaults)
+    if unknown:
+        raise ValueError(f"알 수 없는 스크리너 파라미터: {', '.join(sorted(unknown))}")
+    return {**defaults, **params}
+
+
+def _chunked(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _prepare_daily(params):
+    params = _with_defaults(daily_screener.daily_screener, params)
+    symbols = daily_screener.select_symbols(params['min_daily_volume_krw'])
+    return symbols, {}, params
+
+
+def _prepare_altcoin(params):
+    params = _with_defaults(altcoin_screener.altcoin_screener, params)
+    symbols = daily_screener.select_symbols(params['min_daily_volume_usd'])
+    return symbols, {}, params
+
+
+def _prepare_futures(params):
+    params = _with_defaults(binance_futures_screener.futures_screener_async, params)
+    symbols, tickers, funding_rates = asyncio.run(binance_futures_screener.load_futures_universe())
+    return symbols, {'tickers': tickers, 'funding_rates': funding_rates}, params
+
+
+def _scan_daily(chunk, params):
+    coins, charts = daily_screener.screen_daily_symbols(chunk['symbols'], **params)
+    return {'coins': coins, 'charts': charts}
+
+
+def _scan_altcoin(chunk, params):
+    return {'coins': altcoin_screener.screen_altcoin_symbols(chunk['symbols'], **params), 'charts': []}
+
+
+def _scan_futures(chunk, params):
+    data = asyncio.run(binance_futures_screener.get_binance_futures_data(
+        chunk['symbols'], chunk['tickers'], chunk['funding_rates']
+    ))
+    # 장기 OI 변화율은 청크를 처리한 워커의 로컬 아카이브에서 계산합니다.
+    lookback_windows = binance_futures_screener.OI_LOOKBACK_WINDOWS if oi_store.STORE_ENABLED else None
+    coins = binance_futures_screener.screen_coins(data, lookback_windows)
+    # 롱숏 비율은 심볼당 요청이 필요하므로 청크의 최종 결과에만 조회
+    asyncio.run(binance_futures_screener.add_long_short_ratios(coins))
+    return {'coins': coins, 'charts': []}
+
+
+# 스크리너 이름 -> (준비, 청크 스캔, 결과 저장)
+SCREENERS = {
+    'daily': (_prepare_daily, _scan_daily,
+              lambda db, coins, charts: daily_screener.finalize_daily_result(db, coins, charts)),
+    'altcoin': (_prepare_altcoin, _scan_altcoin,
+                lambda db, coins, charts: altcoin_screener.finalize_altcoin_result(db, coins)),
+    'futures': (_prepare_futures, _scan_futures,
+                lambda db, coins, charts: binance_futures_screener.finalize_futures_result(db, coins)),
+}
+
+
+def build_chunks(symbols, context, chunk_size=None, max_parallel=None):
+    """
+    심볼 목록을 청크로 나눕니다. context의 {심볼: 값} 사전은 청크에 속한 심볼 것만 잘라 함께 넘깁니다.
+    각 청크의 rate_share는 동시에 실행될 수 있는 청크 수로 나눈 거래소 요청 예산 비율입니다.
+    """
+    chunks = []
+    for chunk_symbols in _chunked(symbols, chunk_size or SCAN_CHUNK_SIZE):
+        chunk = {'symbols': chunk_symbols}
+        for key, values in context.items():
+            chunk[key] = {symbol: values[symbol] for symbol in chunk_symbols if symbol in values}
+        chunks.append(chunk)
+    parallel = min(len(chunks), max_parallel or MAX_PARALLEL_CHUNKS)
+    for chunk in chunks:
+        chunk['rate_share'] = 1 / parallel
+    return chunks
+
+
+@celery_app.task(name="screener.scan_chunk")
+def scan_chunk(screener_name, chunk, params):
+    """심볼 청크 하나에 스크리너 조건을 적용하고 {'coins': [...], 'charts': [...]}를 반환합니다."""
+    logger.info(f"{screener_name} 스크리너 청크 스캔 시작 ({len(chunk['symbols'])}개 심볼)")
+    set_rate_share(chunk.get('rate_share', 1.0))
+    try:
+        return SCREENERS[screener_name][1](chunk, params)
+    finally:
+        set_rate_share(1.0)
+
+
+@celery_app.task(name="screener.merge_scan_results")
+def merge_scan_results(chunk_results, screener_name, params):
+    """청크 결과를 심볼 순서대로 합쳐 ScreenerResult 하나로 저장하고 결과 dict를 반환합니다."""
+    coins = [coin for result in chunk_results for coin in result['coins']]
+    charts = [chart for result in chunk_results for chart in result['charts']]
+    db = SessionLocal()
+    try:
+        return SCREENERS[screener_name][2](db, coins, charts)
+    finally:
+        db.close()
+
+
+def run_distributed_scan(screener_name, params=None, timeout=None):
+    """
+    심볼 목록을 준비해 청크 태스크들로 나누고, 코드(chord)로 병합된 최종 결과 dict를 기다려 반환합니다.
+    심볼 준비(마켓/티커 일괄 조회)는 호출한 프로세스에서, 청크 스캔과 병합은 워커에서 실행됩니다.
+    """
+    if screener_name not in SCREENERS:
+        raise ValueError(f"알 수 없는 스크리너 이름: {screener_name}")
+    symbols, context, params = SCREENERS[screener_name][0](params or {})
+    if symbols is None:
+        return daily_screener.market_error_result()
+
+    chunks = build_chunks(symbols, context)
+    logger.info(f"{screener_name} 스크리너: {len(symbols)}개 심볼을 {len(chunks)}개 청크로 분산 실행")
+    if not chunks:
+        return merge_scan_results([], screener_name, params)
+    result = chord(
+        group(scan_chunk.s(screener_name, chunk, params) for chunk in chunks),
+        merge_scan_results.s(screener_name, params)
+    ).apply_async()
+    return result.get(timeout=timeout or SCAN_TIMEOUT)
+
+
+@celery_app.task(name="screener.prune_results")
+def prune_old_results(retention_days=None, vacuum=False):
+    """보존 기간이 지난 결과의 output_text를 보관 파일로 옮기고 비웁니다. (celery beat로 매일 실행)"""
+    db = SessionLocal()
+    try:
+        kwargs = {'retention_days': retention_days} if retention_days is not None else {}
+        pruned = prune_results(db, **kwargs)
+    finally:
+        db.close()
+    if vacuum:
+        compact_database()
+    logger.info(f"오래된 스크리너 결과 {pruned}개 정리")
+    return pruned
@@ -0,0 +1,96 @@
+"""
+동시 작성자 환경에서 스크리너 결과 저장 처리량을 측정합니다.
+
+여러 스레드가 동시에 결과를 저장할 때
+  1) 스레드마다 직접 커밋 (기본 저널 모드)
+  2) 스레드마다 직접 커밋 (WAL + 튜닝된 pragma)
+  3) 단일 작성자 큐(ResultWriter)를 통한 묶음 커밋 (WAL)
+의 초당 저장 결과 수를 비교합니다. 각 방식은 임시 디렉터리의 새 SQLite 파일을 사용합니다.
+
+    python scripts/bench_result_writer.py --threads 8 --per-thread 100
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.database import ScreenerResult, attach_hits, init_db, set_sqlite_pragmas
+from utils.result_writer import ResultWriter
+
+
+def make_engine(directory, wal):
+    engine = create_engine(
+        f"sqlite:///{os.path.join(directory, 'results.db')}",
+        connect_args={"check_same_thread": False, "timeout": 30}
+    )
+    if wal:
+        event.listen(engine, "connect", set_sqlite_pragmas)
+    init_db(engine)
+    return engine
+
+
+def make_result(output_size, hits):
+    coins = [{"symbol": f"COIN{i}/KRW", "downtrend": 80.0, "volatility": 50.0, "cci": 1.0} for i in range(hits)]
+    return attach_hits(ScreenerResult(screener_name="daily", output_text="x" * output_size), coins)
+
+
+def measure(write, threads, per_thread, output_size, hits):
+    """threads개 스레드가 per_thread개씩 결과를 저장하는 데 걸린 시간으로 초당 저장 수를 계산합니다."""
+    def worker():
+        for _ in range(per_thread):
+            write(make_result(output_size, hits))
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return threads * per_thread / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="스크리너 결과 저장 처리량 벤치마크")
+    parser.add_argument("--threads", type=int, default=8, help="동시 작성 스레드 수")
+    parser.add_argument("--per-thread", type=int, default=100, help="스레드당 저장할 결과 수")
+    parser.add_argument("--output-size", type=int, default=4000, help="결과 하나의 output_text 크기 (바이트)")
+    parser.add_argument("--hits", type=int, default=10, help="결과 하나에 붙는 코인 수")
+    args = parser.parse_args()
+    workload = (args.threads, args.per_thread, args.output_size, args.hits)
+
+    print(f"{args.threads}개 스레드 x {args.per_thread}개 결과 "
+          f"(output_text {args.output_size}B, 코인 {args.hits}개)")
+    for label, wal in (("직접 커밋 (기본 저널)", False), ("직접 커밋 (WAL)", True)):
+        with tempfile.TemporaryDirectory() as directory:
+            engine = make_engine(directory, wal)
+            Session = sessionmaker(bind=engine)
+
+            def write(result):
+                session = Session()
+                try:
+                    session.add(result)
+                    session.commit()
+                finally:
+                    session.close()
+
+            print(f"{label:<24} {measure(write, *workload):8.0f} results/s")
+            engine.dispose()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = make_engine(directory, wal=True)
+        writer = ResultWriter(engine)
+        rate = measure(writer.write, *workload)
+        writer.close()
+        print(f"{'작성자 큐 (WAL)':<24} {rate:8.0f} results/s "
+              f"({writer.written}개 결과를 {writer.batches}개 트랜잭션으로 커밋)")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+import unittest
+
+import numpy as np
+
+from utils import backtest, indicators
+
+MINUTE = 60 * 1000
+HOUR = 60 * MINUTE
+
+
+def reference_backtest(close, ema_5, ema_20, rsi_14, start_index=20, position_size_usd=10000, initial_balance=10000):
+    """기존 run_backtest_logic의 캔들 단위 루프를 그대로 옮긴 기준 구현."""
+    balance = initial_balance
+    in_position = False
+    entry_price = 0
+    trades = []
+    for i in range(start_index, len(close)):
+        golden_cross = (ema_5[i - 1] < ema_20[i - 1]) and (ema_5[i] > ema_20[i])
+        death_cross = (ema_5[i - 1] > ema_20[i - 1]) and (ema_5[i] < ema_20[i])
+        if not in_position:
+            if golden_cross and rsi_14[i] >= 50:
+                entry_price = close[i]
+                in_position = True
+        else:
+            take_profit_price = entry_price * (1 + 0.01)
+            stop_loss_price = entry_price * (1 - 0.005)
+            exit_price = None
+            if close[i] >= take_profit_price:
+                exit_price, reason = take_profit_price, backtest.EXIT_TAKE_PROFIT
+            elif close[i] <= stop_loss_price:
+                exit_price, reason = stop_loss_price, backtest.EXIT_STOP_LOSS
+            elif death_cross:
+                exit_price, reason = close[i], backtest.EXIT_DEATH_CROSS
+            if exit_price is not None:
+                pnl = position_size_usd * ((exit_price - entry_price) / entry_price)
+                balance += pnl
+                trades.append((i, exit_price, pnl, reason))
+                in_position = False
+    return trades, balance
+
+
+def make_close(n, seed, volatility=0.004):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, volatility, n)))
+
+
+class TestBacktest(unittest.TestCase):
+
+    def test_matches_candle_loop(self):
+        for seed in range(10):
+            close = make_close(3000, seed, volatility=0.002 + 0.001 * seed)
+            ema_5, ema_20, rsi_14 = indicators.ema(close, 5), indicators.ema(close, 20), indicators.rsi(close, 14)
+
+            ledger, summary = backtest.run_backtest(close, ema_5, ema_20, rsi_14)
+            trades, balance = reference_backtest(close, ema_5, ema_20, rsi_14)
+
+            self.assertGreater(len(trades), 0)
+            self.assertEqual(ledger['exit_index'].tolist(), [t[0] for t in trades])
+            self.assertEqual(ledger['exit_price'].tolist(), [t[1] for t in trades])
+            self.assertEqual(ledger['profit_loss_usd'].tolist(), [t[2] for t in trades])
+            self.assertEqual(ledger['exit_reason'].tolist(), [t[3] for t in trades])
+            self.assertEqual(summary['final_balance'], balance)
+            self.assertEqual(summary['total_trades'], len(trades))
+
+    def test_chunked_replay_matches_full_backtest(self):
+        close = make_close(20000, seed=3, volatility=0.003)
+        candles = np.column_stack([np.arange(len(close)) * 60_000, close, close, close, close, np.ones(len(close))])
+        ledger, summary = backtest.run_backtest(close, indicators.ema(close, 5), indicators.ema(close, 20),
+                                                indicators.rsi(close, 14))
+
+        for chunk_size in (997, len(close)):
+            chunks = (candles[i:i + chunk_size] for i in range(0, len(candles), chunk_size))
+            replay_ledger, replay_summary = backtest.run_backtest_chunks(chunks)
+
+            self.assertEqual(replay_ledger['exit_time'].tolist(), (ledger['exit_index'] * 60_000).tolist())
+            self.assertEqual(replay_ledger['entry_time'].tolist(), (ledger['entry_index'] * 60_000).tolist())
+            self.assertAlmostEqual(replay_summary['final_balance'], summary['final_balance'], places=9)
+
+    def test_intrabar_without_lower_candles_matches_close_engine(self):
+        close = make_close(3000, seed=4)
+        signals = (indicators.ema(close, 5), indicators.ema(close, 20), indicators.rsi(close, 14))
+        timestamps = np.arange(len(close)) * HOUR
+        intrabar = backtest.IntrabarPath(timestamps, close, np.empty((0, 6)), HOUR)
+
+        ledger, summary = backtest.run_backtest(close, *signals)
+        intrabar_ledger, intrabar_summary = backtest.run_backtest(close, *signals, intrabar=intrabar)
+
+        self.assertEqual(intrabar_ledger['exit_index'].tolist(), ledger['exit_index'].tolist())
+        self.assertEqual(intrabar_summary, summary)
+
+    def test_intrabar_resolves_stop_loss_touched_before_close(self):
+        close = np.array([100.0, 100.0, 102.0])
+        fast, slow = np.array([1.0, 2.0, 2.0]), np.array([2.0, 1.0, 1.0])
+        rsi = np.full(3, 60.0)
+        timestamps = np.arange(3) * HOUR
+        minutes = np.array([
+            [2 * HOUR + 0 * MINUTE, 100, 100.2, 99.4, 99.5, 1],   # 손절가(99.5) 먼저 도달
+            [2 * HOUR + 1 * MINUTE, 99.5, 102.0, 99.5, 102.0, 1],
+        ])
+
+        ledger, _ = backtest.run_backtest(close, fast, slow, rsi, start_index=1)
+        intrabar_ledger, _ = backtest.run_backtest(close, fast, slow, rsi, start_index=1,
+                                                   intrabar=backtest.IntrabarPath(timestamps, close, minutes, HOUR))
+
+        self.assertEqual(ledger['exit_reason'].tolist(), [backtest.EXIT_TAKE_PROFIT])
+        self.assertEqual(intrabar_ledger['exit_reason'].tolist(), [backtest.EXIT_STOP_LOSS])
+        self.assertEqual(intrabar_ledger['exit_index'].tolist(), [2])
+        self.assertAlmostEqual(intrabar_ledger['exit_price'][0], 99.5)
+
+    def test_intrabar_matches_minute_loop(self):
+        rng = np.random.default_rng(8)
+        minute_close = 100 * np.exp(np.cumsum(rng.normal(0, 0.0008, 60 * 1500)))
+        minutes = np.column_stack([np.arange(len(minute_close)) * MINUTE, minute_close,
+                                   minute_close * 1.0005, minute_close * 0.9995, minute_close, np.ones(len(minute_close))])
+        minutes = np.delete(minutes, np.s_[60 * 700:60 * 705], axis=0)  # 분봉이 빠진 구간은 종가로 판정
+        close = minute_close[59::60]
+        timestamps = np.arange(len(close)) * HOUR
+        signals = (indicators.ema(close, 5), indicators.ema(close, 20), indicators.rsi(close, 14))
+        intrabar = backtest.IntrabarPath(timestamps, close, minutes, HOUR)
+
+        ledger, _ = backtest.run_backtest(close, *signals, intrabar=intrabar)
+
+        _, death = backtest.crossover_signals(signals[0], signals[1])
+        for entry, exit_index, reason in zip(ledger['entry_index'], ledger['exit_index'], ledger['exit_reason']):
+            tp, sl = close[entry] * 1.01, close[entry] * 0.995
+            expected = None
+            for hour in range(entry + 1, len(close)):
+                rows = minutes[(minutes[:, 0] >= hour * HOUR) & (minutes[:, 0] < (hour + 1) * HOUR)]
+                highs, lows = (rows[:, 2], rows[:, 3]) if len(rows) else ([close[hour]], [close[hour]])
+                for high, low in zip(highs, lows):
+                    if low <= sl:
+                        expected = (hour, backtest.EXIT_STOP_LOSS)
+                    elif high >= tp:
+                        expected = (hour, backtest.EXIT_TAKE_PROFIT)
+                    if expected:
+                        break
+                if expected is None and death[hour]:
+                    expected = (hour, backtest.EXIT_DEATH_CROSS)
+                if expected:
+                    break
+            self.assertEqual((exit_index, reason), expected)
+
+    def test_open_position_at_end_is_not_counted(self):
+        close = np.array([10.0, 10.0, 10.0, 10.0])
+        fast = np.array([1.0, 2.0, 3.0, 3.0])
+        slow = np.array([2.0, 1.0, 1.0, 1.0])
+        rsi = np.full(4, 60.0)
+
+        ledger, summary = backtest.run_backtest(close, fast, slow, rsi, start_index=1)
+
+        self.assertEqual(len(ledger['entry_index']), 0)
+        self.assertEqual(summary['total_trades'], 0)
+        self.assertEqual(summary['final_balance'], 10000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from utils.database import (
+    ScreenerHit, ScreenerResult, attach_hits, decode_cursor, init_db, migrate_screener_hits,
+    prune_results, query_hit_stats, query_screener_results,
+)
+
+START = datetime(2026, 1, 1)
+
+
+class TestQueryScreenerResults(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+        init_db(self.engine)
+        self.db = sessionmaker(bind=self.engine)()
+        self.addCleanup(self.db.close)
+        for i in range(10):
+            self.db.add(ScreenerResult(
+                screener_name='daily' if i % 2 == 0 else 'altcoin',
+                # 같은 시각에 저장된 결과도 id로 순서가 정해지는지 확인하기 위해 두 개씩 같은 시각 사용
+                timestamp=START + timedelta(hours=i // 2),
+                output_text=f'output {i}',
+                chart_paths=json.dumps([f'charts/{i}.png']),
+                table_headers=json.dumps(['종목명']),
+                table_rows=json.dumps([[f'COIN{i}/KRW']]),
+            ))
+        self.db.commit()
+
+    def test_indexes_are_created(self):
+        names = {index['name'] for index in inspect(self.engine).get_indexes('screener_results')}
+        self.assertIn('ix_screener_results_name_timestamp_id', names)
+        init_db(self.engine)  # 이미 있는 인덱스는 다시 만들지 않음
+
+    def test_cursor_pagination_walks_all_rows_newest_first(self):
+        ids, cursor = [], None
+        while True:
+            items, cursor = query_screener_results(self.db, cursor=cursor, limit=3, fields=['id'])
+            ids.extend(item['id'] for item in items)
+            if cursor is None:
+                break
+        self.assertEqual(ids, list(range(10, 0, -1)))
+
+    def test_filters_and_projection(self):
+        items, cursor = query_screener_results(
+            self.db, screener_name='daily', since=START + timedelta(hours=1), until=START + timedelta(hours=4),
+            fields=['id', 'screener_name', 'table_rows']
+        )
+        self.assertIsNone(cursor)
+        self.assertEqual([item['id'] for item in items], [7, 5, 3])
+        self.assertEqual(set(items[0]), {'id', 'screener_name', 'table_rows'})
+        self.assertEqual(items[0]['table_rows'], [['COIN6/KRW']])
+
+    def test_invalid_field_and_cursor_raise(self):
+        with self.assertRaises(ValueError):
+            query_screener_results(self.db, fields=['password'])
+        with self.assertRaises(ValueError):
+            decode_cursor('not-a-cursor')
+
+
+class TestScreenerHits(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+        init_db(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.addCleanup(self.db.close)
+
+    def test_attach_hits_stores_typed_metrics(self):
+        coins = [
+            {'symbol': 'IMX/KRW', 'downtrend': 80.0, 'volatility': 50.0, 'cci': -10.0, 'max_volume_spike': 5.0, 'max_spike_date': '12-03'},
+            {'symbol': 'MOVE/KRW', 'downtrend': 85.0, 'volatility': 60.0, 'cci': 20.0, 'max_volume_spike': 9.0, 'max_spike_date': '11-20'},
+        ]
+        for day in range(3):
+            result = ScreenerResult(screener_name='daily', timestamp=START + timedelta(days=day), table_rows='[]')
+            self.db.add(attach_hits(result, coins if day < 2 else coins[:1]))
+        self.db.commit()
+
+        stats = query_hit_stats(self.db, screener_name='daily')
+        self.assertEqual([(row['symbol'], row['hits']) for row in stats], [('IMX/KRW', 3), ('MOVE/KRW', 2)])
+        self.assertAlmostEqual(stats[1]['avg_cci'], 20.0)
+        self.assertEqual(stats[0]['last_seen'], START + timedelta(days=2))
+        stats = query_hit_stats(self.db, symbol='IMX/KRW', since=START + timedelta(days=1))
+        self.assertEqual(stats[0]['hits'], 2)
+
+    def test_migrate_parses_existing_table_rows_once(self):
+        self.db.add(ScreenerResult(
+            screener_name='daily', timestamp=START,
+            table_headers=json.dumps(['종목명', 'ATH대비', '변동성(30일)', '현재CCI', '과거 거래량 급증']),
+            table_rows=json.dumps([['MOVE/KRW', '-83.7%', '61.2%', '-111.1', '28.6배 (12-03)']]),
+        ))
+        self.db.add(ScreenerResult(
+            screener_name='futures', timestamp=START,
+            table_headers=json.dumps(['Symbol', 'Price Chg 24H', 'OI Chg 24H', 'OI Chg 4H', 'OI (USD)', 'Volume 24H (USD)', 'Funding', 'Long %']),
+            table_rows=json.dumps([['BTC/USDT:USDT', '-1.25%', '12.00%', '3.50%', '12.5M', '80.0M', '-', '55.0%']]),
+        ))
+        self.db.commit()
+
+        self.assertEqual(migrate_screener_hits(self.db, batch_size=1), 2)
+        daily = self.db.query(ScreenerHit).filter_by(symbol='MOVE/KRW').one()
+        self.assertEqual((daily.downtrend, daily.cci, daily.max_volume_spike, daily.max_spike_date), (83.7, -111.1, 28.6, '12-03'))
+        futures = self.db.query(ScreenerHit).filter_by(symbol='BTC/USDT:USDT').one()
+        self.assertEqual((futures.price_change_24h, futures.current_oi_usd, futures.funding_rate), (-1.25, 12_500_000, None))
+
+        self.assertEqual(migrate_screener_hits(self.db), 0)
+        self.assertEqual(self.db.query(ScreenerHit).count(), 2)
+
+    def test_migrate_skips_baseline_duplicate_daily_rows(self):
+        # 이전 버전의 데일리 스크리너는 같은 결과를 연달아 두 번 저장했음
+        headers = json.dumps(['종목명', 'ATH대비', '변동성(30일)', '현재CCI', '과거 거래량 급증'])
+        for day, rows in enumerate([[['IMX/KRW', '-80.0%', '50.0%', '10.0', '5.0배 (12-01)']],
+                                    [['IMX/KRW', '-81.0%', '51.0%', '12.0', '5.0배 (12-01)']]]):
+            for copy in range(2):
+                self.db.add(ScreenerResult(
+                    screener_name='daily', timestamp=START + timedelta(days=day, milliseconds=copy),
+                    output_text=f'--- day {day} ---', table_headers=headers, table_rows=json.dumps(rows),
+                ))
+        self.db.commit()
+
+        self.assertEqual(migrate_screener_hits(self.db, batch_size=1), 2)
+        self.assertEqual(query_hit_stats(self.db, symbol='IMX/KRW')[0]['hits'], 2)
+        self.assertEqual(migrate_screener_hits(self.db), 0)
+        self.assertEqual(self.db.query(ScreenerHit).count(), 2)
+
+
+class TestPruneResults(unittest.TestCase):
+
+    def test_prune_archives_and_clears_old_output(self):
+        engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+        init_db(engine)
+        db = sessionmaker(bind=engine)()
+        self.addCleanup(db.close)
+        now = datetime.now()
+        old = attach_hits(ScreenerResult(screener_name='daily', timestamp=now - timedelta(days=40), output_text='old run'),
+                          [{'symbol': 'IMX/KRW', 'cci': 1.0}])
+        db.add_all([old, ScreenerResult(screener_name='daily', timestamp=now, output_text='new run')])
+        db.commit()
+
+        with tempfile.TemporaryDirectory() as archive_dir:
+            self.assertEqual(prune_results(db, retention_days=30, archive_dir=archive_dir, batch_size=1), 1)
+            self.assertEqual(prune_results(db, retention_days=30, archive_dir=archive_dir), 0)
+            (archive_file,) = os.listdir(archive_dir)
+            with gzip.open(os.path.join(archive_dir, archive_file), 'rt', encoding='utf-8') as f:
+                archived = [json.loads(line) for line in f]
+
+        self.assertEqual([(item['id'], item['output_text']) for item in archived], [(old.id, 'old run')])
+        outputs = dict(db.query(ScreenerResult.id, ScreenerResult.output_text).all())
+        self.assertEqual(outputs, {old.id: None, old.id + 1: 'new run'})
+        self.assertEqual(db.query(ScreenerHit).count(), 1)  # 코인별 결과는 유지
+
+
+if __name__ == '__main__':
+    unittest.main()
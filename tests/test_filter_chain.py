@@ -0,0 +1,95 @@
+import unittest
+from unittest.mock import MagicMock
+
+import numpy as np
+import pandas as pd
+
+from utils.filter_chain import (
+    FilterChain, ScreenFilter, COST_INDICATOR, history_filter, ath_drawdown_filter,
+    volatility_filter, cci_filter
+)
+from utils.panel import build_panel
+
+
+def make_df(closes):
+    return pd.DataFrame({
+        'high': [c * 1.1 for c in closes],
+        'low': [c * 0.9 for c in closes],
+        'close': closes,
+        'volume': [1000] * len(closes),
+    })
+
+
+class TestFilterChain(unittest.TestCase):
+
+    def setUp(self):
+        def add_cci(df):
+            df['CCI_20_0.015'] = 0.0
+            return df
+        self.indicators = MagicMock(side_effect=add_cci)
+
+    def build_chain(self, min_downtrend):
+        return FilterChain(
+            [
+                cci_filter(-40, 40, 20),
+                volatility_filter(0, 1000),
+                ath_drawdown_filter(min_downtrend),
+                history_filter(5),
+            ],
+            providers={'indicators': (COST_INDICATOR, self.indicators)}
+        )
+
+    def test_cheap_filters_run_first(self):
+        chain = self.build_chain(0.5)
+
+        names = [f.name for f in chain.filters]
+
+        self.assertEqual(names[0], 'min_history')
+        self.assertEqual(names[-1], 'cci_range')
+
+    def test_indicators_skipped_when_cheap_filter_fails(self):
+        chain = self.build_chain(0.5)
+
+        result = chain.evaluate(make_df([100] * 10), 'FLAT/KRW')
+
+        self.assertIsNone(result)
+        self.indicators.assert_not_called()
+
+    def test_indicators_computed_once_for_survivors(self):
+        chain = self.build_chain(0.5)
+        chain.filters.append(ScreenFilter('extra', lambda df, m: None, requires=('indicators',)))
+
+        df, metrics = chain.evaluate(make_df([100] * 9 + [30]), 'DOWN/KRW')
+
+        self.assertAlmostEqual(metrics['downtrend'], 1 - 30 / 110)
+        self.assertEqual(metrics['cci'], 0.0)
+        self.assertIn('CCI_20_0.015', df.columns)
+        self.indicators.assert_called_once()
+
+    def test_panel_provider_runs_only_for_survivors(self):
+        chain = self.build_chain(0.5)
+        frames = {
+            'DOWN/KRW': make_df([100] * 9 + [30]),
+            'FLAT/KRW': make_df([100] * 10),
+            'SHORT/KRW': make_df([100, 30]),
+        }
+        for i, df in enumerate(frames.values()):
+            df['open'] = df['close']
+            df['timestamp'] = pd.date_range('2024-01-01', periods=len(df)) + pd.Timedelta(days=i)
+        calls = []
+
+        def provide(panel):
+            calls.append(list(panel.symbols))
+            return {'CCI_20_0.015': np.full(len(panel), 10.0)}
+
+        panel = build_panel(frames)
+        passed, metrics = chain.evaluate_panel(panel, panel_providers={'indicators': provide})
+
+        # 값싼 조건에서 탈락한 심볼은 지표(스트리밍 상태)를 갱신하지 않음
+        self.assertEqual(calls, [['DOWN/KRW']])
+        self.assertEqual(passed.tolist(), [True, False, False])
+        self.assertEqual(metrics['cci'][0], 10.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import asyncio
+import unittest
+
+from screener import binance_futures_screener as futures
+from utils.rate_limiter import WeightedRateLimiter
+
+HOUR = 60 * 60 * 1000
+MINUTE = 60 * 1000
+
+
+class FakeEnrichmentExchange:
+
+    def __init__(self, now):
+        self.now = now
+        self.calls = []
+        self.last_response_headers = {}
+
+    def milliseconds(self):
+        return self.now
+
+    async def fetch_funding_rates(self):
+        self.calls.append('fetch_funding_rates')
+        return {
+            'BTC/USDT:USDT': {'fundingRate': 0.0001, 'nextFundingTimestamp': 8 * HOUR},
+            'ETH/USDT:USDT': {'fundingRate': -0.0002, 'nextFundingTimestamp': 8 * HOUR},
+        }
+
+    async def fetch_long_short_ratio_history(self, symbol, timeframe, limit=None):
+        self.calls.append(('fetch_long_short_ratio_history', symbol))
+        return [{'longShortRatio': 1.5, 'info': {'longAccount': '0.6'}}]
+
+
+class FakeOpenInterestExchange:
+    """5분 단위 OI 히스토리를 마지막으로 마감된 구간까지만 돌려주는 거래소"""
+
+    def __init__(self, now):
+        self.now = now
+        self.last_response_headers = {}
+        self.requests = []
+
+    def milliseconds(self):
+        return self.now
+
+    async def fetch_open_interest_history(self, symbol, timeframe, since=None, limit=None):
+        self.requests.append(since)
+        step = 5 * MINUTE
+        first = -(-since // step) * step
+        last_closed = self.now // step * step - step
+        # OI는 5분마다 1000 USD씩 증가
+        return [{'timestamp': ts, 'openInterestValue': 1_000_000 + ts // step * 1000}
+                for ts in range(first, last_closed + 1, step)][-limit:]
+
+
+class TestMonitorSymbol(unittest.TestCase):
+
+    def test_first_cycle_already_has_24h_change(self):
+        now = 10 * 24 * HOUR + 2 * MINUTE
+        exchange = FakeOpenInterestExchange(now)
+        buffers = {}
+        limiter = WeightedRateLimiter(2400)
+        ticker = {'percentage': 1.5, 'quoteVolume': 10_000_000, 'last': 100.0}
+
+        record = asyncio.run(futures.monitor_symbol(exchange, 'BTC/USDT:USDT', ticker, buffers, limiter))
+        self.assertIsNotNone(record)
+        latest = 1_000_000 + (now // (5 * MINUTE) - 1) * 1000
+        self.assertAlmostEqual(record['oi_change_24h'], 288_000 / (latest - 288_000) * 100)
+        self.assertAlmostEqual(record['oi_change_4h'], 48_000 / (latest - 48_000) * 100)
+
+        # 다음 주기에는 마지막 샘플 이후분만 조회
+        exchange.now += 5 * MINUTE
+        record = asyncio.run(futures.monitor_symbol(exchange, 'BTC/USDT:USDT', ticker, buffers, limiter))
+        self.assertIsNotNone(record)
+        self.assertEqual(exchange.requests[-1], buffers['BTC/USDT:USDT'].last_timestamp - 5 * MINUTE)
+        self.assertAlmostEqual(record['current_oi_usd'], latest + 1000)
+
+
+class TestFuturesEnrichment(unittest.TestCase):
+
+    def setUp(self):
+        futures._funding_cache.update(expires_at=0, rates={})
+        futures._long_short_cache.clear()
+        self.limiter = WeightedRateLimiter(2400)
+
+    def test_funding_rates_are_cached_until_next_funding(self):
+        exchange = FakeEnrichmentExchange(now=HOUR)
+        rates = asyncio.run(futures.fetch_funding_rates(exchange, self.limiter))
+        exchange.now = 7 * HOUR
+        asyncio.run(futures.fetch_funding_rates(exchange, self.limiter))
+        self.assertEqual(exchange.calls.count('fetch_funding_rates'), 1)
+        self.assertEqual(len(rates), 2)
+
+        exchange.now = 8 * HOUR
+        asyncio.run(futures.fetch_funding_rates(exchange, self.limiter))
+        self.assertEqual(exchange.calls.count('fetch_funding_rates'), 2)
+
+    def test_funding_is_joined_and_long_short_fetched_for_hits_only(self):
+        exchange = FakeEnrichmentExchange(now=HOUR + 10)
+        rates = asyncio.run(futures.fetch_funding_rates(exchange, self.limiter))
+
+        record = futures.apply_funding_rate({'symbol': 'BTC/USDT:USDT'}, rates['BTC/USDT:USDT'])
+        other = futures.apply_funding_rate({'symbol': 'XRP/USDT:USDT'}, None)
+        self.assertAlmostEqual(record['funding_rate'], 0.01)
+        self.assertIsNone(other['funding_rate'])
+        self.assertIsNone(record['long_short_ratio'])
+        self.assertNotIn(('fetch_long_short_ratio_history', 'BTC/USDT:USDT'), exchange.calls)
+
+        for _ in range(2):
+            asyncio.run(futures.add_long_short_ratios([record], exchange, self.limiter))
+        self.assertEqual(record['long_short_ratio'], 1.5)
+        self.assertAlmostEqual(record['long_accounts_1h'], 60.0)
+        # 같은 1시간 구간 안에서는 롱숏 비율을 다시 조회하지 않고, 결과에 없는 심볼은 조회하지 않습니다.
+        self.assertEqual(exchange.calls.count(('fetch_long_short_ratio_history', 'BTC/USDT:USDT')), 1)
+        self.assertNotIn(('fetch_long_short_ratio_history', 'XRP/USDT:USDT'), exchange.calls)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils.indicator_cache import IndicatorCache, candle_key
+from utils.market_data import calculate_indicators
+
+
+def make_frame(n, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(np.arange(n) * 86_400_000, unit='ms'),
+        'open': close,
+        'high': close * 1.01,
+        'low': close * 0.99,
+        'close': close,
+        'volume': np.ones(n),
+    })
+
+
+class TestIndicatorCache(unittest.TestCase):
+
+    def test_evicts_least_recently_used_over_budget(self):
+        cache = IndicatorCache(max_bytes=3 * 800)
+        for key in ('a', 'b', 'c'):
+            cache.put(key, np.zeros(100))
+        cache.get('a')
+        cache.put('d', np.zeros(100))
+
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertLessEqual(cache.current_bytes, cache.max_bytes)
+
+    def test_get_or_compute_skips_computation_on_hit(self):
+        cache = IndicatorCache()
+        calls = []
+        compute = lambda: calls.append(1) or np.arange(3.0)
+
+        cache.get_or_compute('key', compute)
+        cache.get_or_compute('key', compute)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.hits, 1)
+
+    def test_key_changes_when_last_candle_is_updated(self):
+        df = make_frame(50)
+        for column in ('high', 'low', 'close', 'volume'):
+            # 종가가 그대로여도 진행 중인 캔들의 고가/저가/거래량이 바뀌면 다른 키
+            updated = df.copy()
+            updated.loc[49, column] *= 1.05
+
+            self.assertNotEqual(
+                candle_key('upbit', 'BTC/KRW', '1d', df, 'cci', (20,)),
+                candle_key('upbit', 'BTC/KRW', '1d', updated, 'cci', (20,))
+            )
+
+    def test_cached_indicators_match_uncached(self):
+        expected = calculate_indicators(make_frame(200))
+        for _ in range(2):
+            actual = calculate_indicators(make_frame(200), cache_key=('upbit', 'TEST/KRW', '1d'))
+            pd.testing.assert_frame_equal(actual, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
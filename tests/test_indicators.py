@@ -0,0 +1,116 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils import indicators
+
+try:
+    import pandas_ta  # noqa: F401  (df.ta accessor 등록)
+    HAS_PANDAS_TA = True
+except ImportError:
+    HAS_PANDAS_TA = False
+
+
+def make_frame(n=300, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        'open': close * (1 + rng.normal(0, 0.005, n)),
+        'high': close * (1 + rng.uniform(0, 0.03, n)),
+        'low': close * (1 - rng.uniform(0, 0.03, n)),
+        'close': close,
+        'volume': rng.uniform(1e3, 1e6, n),
+    })
+
+
+@unittest.skipUnless(HAS_PANDAS_TA, "pandas_ta가 설치되어 있지 않습니다.")
+class TestIndicatorsMatchPandasTa(unittest.TestCase):
+
+    def setUp(self):
+        self.df = make_frame()
+        self.high = self.df['high'].to_numpy()
+        self.low = self.df['low'].to_numpy()
+        self.close = self.df['close'].to_numpy()
+
+    def assertSeriesClose(self, actual, expected):
+        np.testing.assert_allclose(actual, np.asarray(expected, dtype=float), rtol=1e-7, atol=1e-7, equal_nan=True)
+
+    def test_ema(self):
+        for length in (5, 20, 50, 200):
+            self.df.ta.ema(length=length, append=True)
+            self.assertSeriesClose(indicators.ema(self.close, length), self.df[f'EMA_{length}'])
+
+    def test_rsi(self):
+        self.df.ta.rsi(length=14, append=True)
+        self.assertSeriesClose(indicators.rsi(self.close, 14), self.df['RSI_14'])
+
+    def test_cci(self):
+        self.df.ta.cci(length=20, append=True)
+        self.assertSeriesClose(indicators.cci(self.high, self.low, self.close, 20), self.df['CCI_20_0.015'])
+
+    def test_macd(self):
+        self.df.ta.macd(append=True)
+        macd_line, histogram, signal = indicators.macd(self.close)
+        self.assertSeriesClose(macd_line, self.df['MACD_12_26_9'])
+        self.assertSeriesClose(histogram, self.df['MACDh_12_26_9'])
+        self.assertSeriesClose(signal, self.df['MACDs_12_26_9'])
+
+    def test_bbands(self):
+        self.df.ta.bbands(append=True)
+        lower, mid, upper, bandwidth, percent = indicators.bbands(self.close)
+        self.assertSeriesClose(lower, self.df['BBL_5_2.0'])
+        self.assertSeriesClose(mid, self.df['BBM_5_2.0'])
+        self.assertSeriesClose(upper, self.df['BBU_5_2.0'])
+        self.assertSeriesClose(bandwidth, self.df['BBB_5_2.0'])
+        self.assertSeriesClose(percent, self.df['BBP_5_2.0'])
+
+    def test_stoch(self):
+        self.df.ta.stoch(append=True)
+        stoch_k, stoch_d = indicators.stoch(self.high, self.low, self.close)
+        self.assertSeriesClose(stoch_k, self.df['STOCHk_14_3_3'])
+        self.assertSeriesClose(stoch_d, self.df['STOCHd_14_3_3'])
+
+
+class TestIndicatorsOnPanel(unittest.TestCase):
+
+    def test_panel_rows_match_single_series(self):
+        frames = [make_frame(300, 1), make_frame(120, 2), make_frame(40, 3)]
+        width = 300
+        panel = {name: np.full((len(frames), width), np.nan) for name in ('high', 'low', 'close')}
+        for row, df in enumerate(frames):
+            for name in panel:
+                panel[name][row, width - len(df):] = df[name].to_numpy()
+
+        results = {
+            'ema': indicators.ema(panel['close'], 20),
+            'rsi': indicators.rsi(panel['close'], 14),
+            'cci': indicators.cci(panel['high'], panel['low'], panel['close'], 20),
+            'macd': indicators.macd(panel['close'])[2],
+            'stoch': indicators.stoch(panel['high'], panel['low'], panel['close'])[1],
+        }
+        for row, df in enumerate(frames):
+            high, low, close = df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy()
+            expected = {
+                'ema': indicators.ema(close, 20),
+                'rsi': indicators.rsi(close, 14),
+                'cci': indicators.cci(high, low, close, 20),
+                'macd': indicators.macd(close)[2],
+                'stoch': indicators.stoch(high, low, close)[1],
+            }
+            for name, values in expected.items():
+                np.testing.assert_allclose(results[name][row, width - len(df):], values, rtol=1e-9, equal_nan=True, err_msg=name)
+                self.assertTrue(np.isnan(results[name][row, :width - len(df)]).all(), name)
+
+    def test_long_series_does_not_overflow(self):
+        close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 0.1, 200_000))
+
+        result = indicators.ema(close, 5)
+
+        expected = pd.Series(close).ewm(span=5, adjust=False).mean().to_numpy()
+        self.assertTrue(np.isfinite(result[4:]).all())
+        np.testing.assert_allclose(result[-1000:], expected[-1000:], rtol=1e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import threading
+import unittest
+
+from utils.jobs import (
+    JobManager, COMPLETED, FAILED, PENDING, RUNNING, latest_closed_candle, params_hash, result_cache_key,
+)
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+
+class TestJobManager(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = JobManager(max_workers=2, max_finished_jobs=2)
+        self.addCleanup(self.manager.shutdown)
+
+    def wait(self, job):
+        for _ in range(200):
+            if job.status in (COMPLETED, FAILED):
+                return
+            threading.Event().wait(0.01)
+        self.fail(f"작업이 끝나지 않았습니다: {job.status}")
+
+    def test_submit_returns_before_job_finishes(self):
+        release = threading.Event()
+        job = self.manager.submit('daily', lambda: release.wait(5) and {'output': 'done'}, params={'cci_period': 20})
+        self.assertIn(job.status, (PENDING, RUNNING))
+        self.assertIs(self.manager.get(job.id), job)
+
+        release.set()
+        self.wait(job)
+        self.assertEqual(job.status, COMPLETED)
+        self.assertEqual(job.result, {'output': 'done'})
+        self.assertEqual(job.to_dict()['params'], {'cci_period': 20})
+
+    def test_failed_job_keeps_error(self):
+        def fail():
+            raise RuntimeError('boom')
+
+        job = self.manager.submit('altcoin', fail)
+        self.wait(job)
+        self.assertEqual(job.status, FAILED)
+        self.assertEqual(job.error, 'boom')
+        self.assertIsNotNone(job.finished_at)
+
+    def test_jobs_run_concurrently_and_old_finished_jobs_are_pruned(self):
+        barrier = threading.Barrier(2, timeout=5)
+        first = self.manager.submit('daily', barrier.wait)
+        second = self.manager.submit('daily', barrier.wait)
+        self.wait(first)
+        self.wait(second)
+        self.assertEqual((first.status, second.status), (COMPLETED, COMPLETED))
+
+        third = self.manager.submit('daily', lambda: None)
+        self.wait(third)
+        self.manager.submit('daily', lambda: None)
+        self.assertIsNone(self.manager.get(first.id))
+        self.assertEqual(self.manager.list()[-1].id, second.id)
+
+    def test_identical_requests_share_one_job(self):
+        release = threading.Event()
+        calls = []
+
+        def scan():
+            calls.append(1)
+            release.wait(5)
+            return {'output': 'done'}
+
+        key = result_cache_key('daily', {'min_cci': -40.0, 'cci_period': 20}, '1d', now_ms=10 * DAY_MS + 5)
+        first, created = self.manager.submit_once(key, 'daily', scan)
+        self.assertTrue(created)
+        # 실행 중인 동일 요청은 같은 작업을 기다림
+        same_key = result_cache_key('daily', {'cci_period': 20, 'min_cci': -40.0}, '1d', now_ms=11 * DAY_MS - 1)
+        second, created = self.manager.submit_once(same_key, 'daily', scan)
+        self.assertIs(second, first)
+        self.assertFalse(created)
+
+        release.set()
+        self.wait(first)
+        self.assertIs(self.manager.submit_once(key, 'daily', scan)[0], first)
+        self.assertEqual(len(calls), 1)
+
+        # 새 일봉이 마감되면 키가 바뀌어 다시 실행
+        next_day = result_cache_key('daily', {'min_cci': -40.0, 'cci_period': 20}, '1d', now_ms=11 * DAY_MS)
+        third, created = self.manager.submit_once(next_day, 'daily', scan)
+        self.assertTrue(created)
+        self.wait(third)
+        self.assertEqual(len(calls), 2)
+
+    def test_failed_job_is_not_reused(self):
+        def fail():
+            raise RuntimeError('boom')
+
+        key = ('altcoin', params_hash({}), latest_closed_candle('1d', now_ms=DAY_MS))
+        first, _ = self.manager.submit_once(key, 'altcoin', fail)
+        self.wait(first)
+        second, created = self.manager.submit_once(key, 'altcoin', lambda: None)
+        self.assertTrue(created)
+        self.assertIsNot(second, first)
+        self.assertEqual(latest_closed_candle('1d', now_ms=DAY_MS), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,283 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock, AsyncMock
+
+import numpy as np
+
+from utils import market_data, ohlcv_store
+
+
+def _sync_rows(path, worker, rows):
+    for i in range(rows):
+        ohlcv_store.sync_array(path, [[worker * 1000 + i, 1, 1, 1, 1, 1]])
+
+
+class TestExchangeRegistry(unittest.TestCase):
+
+    def setUp(self):
+        market_data._exchanges.clear()
+        market_data._markets_loaded_at.clear()
+        market_data._markets_locks.clear()
+
+    @patch('utils.market_data.ccxt.upbit')
+    def test_exchange_is_shared(self, mock_upbit):
+        mock_upbit.return_value = MagicMock()
+
+        first = market_data.get_exchange('upbit')
+        second = market_data.get_exchange('upbit')
+
+        self.assertIs(first, second)
+        mock_upbit.assert_called_once_with({'enableRateLimit': True})
+
+    @patch('utils.market_data.time.monotonic')
+    @patch('utils.market_data.ccxt.upbit')
+    def test_markets_reloaded_only_after_ttl(self, mock_upbit, mock_monotonic):
+        mock_exchange = MagicMock()
+        mock_exchange.load_markets.return_value = {
+            'MOVE/KRW': {'symbol': 'MOVE/KRW', 'quote': 'KRW', 'active': True},
+            'BTC/USDT': {'symbol': 'BTC/USDT', 'quote': 'USDT', 'active': True},
+        }
+        mock_upbit.return_value = mock_exchange
+
+        mock_monotonic.return_value = 0
+        self.assertEqual(market_data.get_active_symbols('upbit', 'KRW'), ['MOVE/KRW'])
+        mock_monotonic.return_value = 10
+        market_data.get_active_symbols('upbit', 'KRW')
+        mock_monotonic.return_value = market_data.MARKETS_CACHE_TTL + 1
+        market_data.get_active_symbols('upbit', 'KRW')
+
+        reloads = [call.kwargs['reload'] for call in mock_exchange.load_markets.call_args_list]
+        self.assertEqual(reloads, [True, False, True])
+
+
+class TestPrescreenByVolume(unittest.TestCase):
+
+    def setUp(self):
+        market_data._exchanges.clear()
+        market_data._markets_locks.clear()
+
+    @patch('utils.market_data.ccxt.upbit')
+    def test_drops_low_volume_symbols_with_one_request(self, mock_upbit):
+        mock_exchange = MagicMock()
+        mock_exchange.fetch_tickers.return_value = {
+            'BTC/KRW': {'quoteVolume': 900_000_000},
+            'NEAR/KRW': {'quoteVolume': 450_000_000},
+            'DUST/KRW': {'quoteVolume': 1_000},
+            'NEW/KRW': {'quoteVolume': None},
+        }
+        mock_upbit.return_value = mock_exchange
+        symbols = ['BTC/KRW', 'NEAR/KRW', 'DUST/KRW', 'NEW/KRW']
+
+        passed = market_data.prescreen_by_volume('upbit', symbols, 500_000_000)
+
+        # 기준 바로 아래(여유 범위 안)의 심볼은 캔들 기준 조건에 맡기기 위해 남김
+        self.assertEqual(passed, ['BTC/KRW', 'NEAR/KRW', 'NEW/KRW'])
+        mock_exchange.fetch_tickers.assert_called_once_with(symbols)
+
+    @patch('utils.market_data.ccxt.upbit')
+    def test_keeps_all_symbols_when_tickers_fail(self, mock_upbit):
+        mock_exchange = MagicMock()
+        mock_exchange.fetch_tickers.side_effect = Exception('boom')
+        mock_upbit.return_value = mock_exchange
+
+        passed = market_data.prescreen_by_volume('upbit', ['BTC/KRW'], 500_000_000)
+
+        self.assertEqual(passed, ['BTC/KRW'])
+
+
+class TestFetchOhlcvBatch(unittest.TestCase):
+
+    @patch('utils.market_data.ccxt_async.upbit')
+    def test_returns_frames_per_symbol(self, mock_upbit):
+        mock_exchange = AsyncMock()
+        mock_upbit.return_value = mock_exchange
+
+        def mock_fetch_ohlcv(symbol, timeframe, limit):
+            if symbol == 'BAD/KRW':
+                raise Exception('boom')
+            return [[1720396800000, 100, 110, 90, 105, 1000]]
+
+        mock_exchange.fetch_ohlcv.side_effect = mock_fetch_ohlcv
+
+        result = market_data.fetch_ohlcv_batch(
+            'upbit', ['MOVE/KRW', 'IMX/KRW', 'BAD/KRW'], '1d', limit=10,
+            max_concurrency=2, requests_per_second=5, use_store=False
+        )
+
+        self.assertEqual(sorted(result), ['IMX/KRW', 'MOVE/KRW'])
+        self.assertEqual(result['MOVE/KRW']['close'].iloc[-1], 105)
+        mock_upbit.assert_called_once_with({'enableRateLimit': True})
+        mock_exchange.close.assert_called_once()
+
+
+class TestOhlcvStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        patcher = patch('utils.ohlcv_store.STORE_DIR', self.tmpdir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmpdir.cleanup)
+        market_data._exchanges.clear()
+        market_data._markets_locks.clear()
+
+    @unittest.skipIf(ohlcv_store.fcntl is None, "fcntl 잠금이 없는 플랫폼")
+    def test_concurrent_processes_do_not_lose_rows(self):
+        # 여러 워커 프로세스가 같은 파일에 동시에 병합해도 모든 행이 남아야 함
+        path = os.path.join(self.tmpdir.name, 'shared.npy')
+        context = multiprocessing.get_context('fork')
+        workers = [context.Process(target=_sync_rows, args=(path, worker, 20)) for worker in range(4)]
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join()
+
+        self.assertEqual(len(ohlcv_store.load_array(path)), 80)
+        self.assertEqual([name for name in os.listdir(self.tmpdir.name) if name.endswith('.tmp')], [])
+
+    def test_merge_overwrites_partial_candle(self):
+        stored = np.array([[1, 1, 1, 1, 1, 1], [2, 2, 2, 2, 2, 2]], dtype=float)
+        new = [[2, 2, 3, 2, 3, 5], [3, 3, 3, 3, 3, 3]]
+
+        merged = ohlcv_store.merge_candles(stored, new)
+
+        self.assertEqual(merged[:, 0].tolist(), [1, 2, 3])
+        self.assertEqual(merged[1].tolist(), [2, 2, 3, 2, 3, 5])
+
+    @patch('utils.market_data.ccxt.upbit')
+    def test_get_ohlcv_fetches_only_new_candles(self, mock_upbit):
+        day = 24 * 60 * 60 * 1000
+        mock_exchange = MagicMock()
+        mock_exchange.parse_timeframe.return_value = day // 1000
+        mock_exchange.milliseconds.return_value = 11 * day + 1
+        mock_exchange.fetch_ohlcv.return_value = [[d * day, 100, 110, 90, 105, 1000] for d in range(10)]
+        mock_upbit.return_value = mock_exchange
+
+        first = market_data.get_ohlcv('upbit', 'MOVE/KRW', '1d', limit=2000)
+        self.assertEqual(len(first), 10)
+        # 한 페이지(200개)를 다 채우지 못했으므로 상장 이후 전체 이력으로 기록
+        mock_exchange.fetch_ohlcv.assert_called_once_with('MOVE/KRW', '1d', limit=200)
+        self.assertEqual(ohlcv_store.load_coverage('upbit', 'MOVE/KRW', '1d'), {'complete': True})
+
+        mock_exchange.fetch_ohlcv.return_value = [[9 * day, 100, 120, 90, 115, 2000], [10 * day, 115, 116, 114, 115, 10], [11 * day, 115, 115, 115, 115, 1]]
+        second = market_data.get_ohlcv('upbit', 'MOVE/KRW', '1d', limit=5)
+
+        mock_exchange.fetch_ohlcv.assert_called_with('MOVE/KRW', '1d', since=9 * day)
+        self.assertEqual(len(second), 5)
+        self.assertEqual(second['close'].tolist(), [105, 105, 115, 115, 115])
+        self.assertEqual(second['high'].iloc[2], 120)
+
+    @patch('utils.market_data.ccxt.upbit')
+    def test_get_ohlcv_backfills_only_missing_older_range(self, mock_upbit):
+        day = 24 * 60 * 60 * 1000
+        # 다른 스크리너가 더 짧은 limit로 최근 3일만 저장해 둔 상태
+        ohlcv_store.save_candles('upbit', 'MOVE/KRW', '1d', np.array([[d * day, 1, 1, 1, 1, 1] for d in range(7, 10)], dtype=float))
+        mock_exchange = MagicMock()
+        mock_exchange.parse_timeframe.return_value = day // 1000
+        mock_exchange.milliseconds.return_value = 9 * day + 1
+        mock_exchange.fetch_ohlcv.side_effect = lambda symbol, timeframe, since, limit=None: [
+            [d * day, 2, 2, 2, 2, 2] for d in range(10) if d * day >= since
+        ][:limit]
+        mock_upbit.return_value = mock_exchange
+
+        df = market_data.get_ohlcv('upbit', 'MOVE/KRW', '1d', limit=10)
+
+        self.assertEqual(mock_exchange.fetch_ohlcv.call_args_list[0].kwargs, {'since': 0, 'limit': 10})
+        self.assertEqual(len(df), 10)
+        self.assertEqual(len(ohlcv_store.load_candles('upbit', 'MOVE/KRW', '1d')), 10)
+        self.assertEqual(ohlcv_store.load_coverage('upbit', 'MOVE/KRW', '1d'), {'covered_since': 0})
+
+        # 기록된 수집 범위로 충분하므로 다음 실행에서는 증분 요청만 보냄
+        mock_exchange.fetch_ohlcv.reset_mock()
+        market_data.get_ohlcv('upbit', 'MOVE/KRW', '1d', limit=10)
+        mock_exchange.fetch_ohlcv.assert_called_once_with('MOVE/KRW', '1d', since=9 * day)
+
+    @patch('utils.market_data.ccxt.upbit')
+    def test_young_listing_is_not_backfilled_again(self, mock_upbit):
+        day = 24 * 60 * 60 * 1000
+        # 상장 5일째인 심볼: limit=2000이라도 거래소에는 5개뿐
+        ohlcv_store.save_candles('upbit', 'MOVE/KRW', '1d', np.array([[d * day, 1, 1, 1, 1, 1] for d in range(100, 105)], dtype=float))
+        mock_exchange = MagicMock()
+        mock_exchange.parse_timeframe.return_value = day // 1000
+        mock_exchange.milliseconds.return_value = 104 * day + 1
+        mock_exchange.fetch_ohlcv.side_effect = lambda symbol, timeframe, since, limit=None: [
+            [d * day, 2, 2, 2, 2, 2] for d in range(100, 105) if since <= d * day < since + (limit or 200) * day
+        ]
+        mock_upbit.return_value = mock_exchange
+
+        with patch.dict(market_data.PAGE_LIMITS, {'upbit': 40}):
+            market_data.get_ohlcv('upbit', 'MOVE/KRW', '1d', limit=200)
+            # 상장 전 구간은 빈 페이지마다 한 페이지(40일)씩 건너뛰며 받고, 이어서 증분 요청 1회
+            sinces = [call.kwargs['since'] for call in mock_exchange.fetch_ohlcv.call_args_list]
+            self.assertEqual(sinces, [-95 * day, -55 * day, -15 * day, 25 * day, 65 * day, 104 * day])
+            self.assertEqual(ohlcv_store.load_coverage('upbit', 'MOVE/KRW', '1d'), {'complete': True})
+
+            mock_exchange.fetch_ohlcv.reset_mock()
+            market_data.get_ohlcv('upbit', 'MOVE/KRW', '1d', limit=2000)
+            mock_exchange.fetch_ohlcv.assert_called_once_with('MOVE/KRW', '1d', since=104 * day)
+
+    @patch('utils.market_data.ccxt.upbit')
+    def test_get_ohlcv_falls_back_to_store_when_offline(self, mock_upbit):
+        ohlcv_store.save_candles('upbit', 'MOVE/KRW', '1d', np.array([[0, 1, 2, 0.5, 1.5, 10]], dtype=float))
+        mock_exchange = MagicMock()
+        mock_exchange.parse_timeframe.return_value = 86400
+        mock_exchange.milliseconds.return_value = 10 * 86400 * 1000
+        mock_exchange.fetch_ohlcv.side_effect = Exception('network down')
+        mock_upbit.return_value = mock_exchange
+
+        df = market_data.get_ohlcv('upbit', 'MOVE/KRW', '1d')
+
+        self.assertEqual(df['close'].tolist(), [1.5])
+
+    @patch('utils.ohlcv_store.save_array', wraps=ohlcv_store.save_array)
+    @patch('utils.market_data.ccxt.upbit')
+    def test_download_candles_pages_range_into_store(self, mock_upbit, mock_save):
+        minute = 60 * 1000
+        mock_exchange = MagicMock()
+        mock_exchange.fetch_ohlcv.side_effect = lambda symbol, timeframe, since, limit=None: [
+            [t, 1, 1, 1, 1, 1] for t in range(-(-since // minute) * minute, since + 3 * minute, minute)
+        ]
+        mock_upbit.return_value = mock_exchange
+
+        count = market_data.download_candles('upbit', 'MOVE/KRW', '1m', since=0, until=10 * minute, segment_size=4)
+
+        self.assertEqual(count, 10)
+        # 구간마다 저장소 파일을 다시 읽고 쓰지 않고 끝에서 한 번만 병합
+        self.assertEqual(mock_save.call_count, 1)
+        chunks = list(ohlcv_store.iter_candles('upbit', 'MOVE/KRW', '1m', start=2 * minute, end=9 * minute, chunk_size=3))
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 1])
+        self.assertEqual(chunks[0][0, 0], 2 * minute)
+        self.assertEqual(chunks[-1][-1, 0], 8 * minute)
+
+    def test_streaming_state_is_kept_per_indicator_specs(self):
+        day = 24 * 60 * 60 * 1000
+        rng = np.random.default_rng(0)
+        close = 100 + np.cumsum(rng.normal(0, 1, 60))
+        candles = np.column_stack([np.arange(60) * day, close, close + 1, close - 1, close, rng.uniform(1, 5, 60)])
+        daily_specs = {'CCI_20_0.015': ('cci', 20)}
+        altcoin_specs = {'CCI_20_0.015': ('cci', 20), 'RSI_14': ('rsi', 14)}
+
+        def run(specs, n):
+            market_data.INDICATOR_CACHE.clear()
+            frames = {'MOVE/KRW': market_data.ohlcv_to_dataframe(candles[:n])}
+            return market_data.update_streaming_indicators('upbit', '1d', frames, specs)['MOVE/KRW']
+
+        with patch('utils.ohlcv_store.STORE_ENABLED', True), \
+                patch('utils.market_data.IndicatorSet', wraps=market_data.IndicatorSet) as indicator_set:
+            run(daily_specs, 50)
+            run(altcoin_specs, 50)
+            indicator_set.reset_mock()
+            # 두 스크리너가 번갈아 실행되어도 각자의 상태를 이어서 갱신 (새로 만들지 않음)
+            daily = run(daily_specs, 60)
+            altcoin = run(altcoin_specs, 60)
+        indicator_set.assert_not_called()
+
+        expected = market_data.calculate_indicators(market_data.ohlcv_to_dataframe(candles))
+        self.assertAlmostEqual(daily['CCI_20_0.015'], expected['CCI_20_0.015'].iloc[-1])
+        self.assertAlmostEqual(altcoin['RSI_14'], expected['RSI_14'].iloc[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+
+from utils import market_data, multi_timeframe
+
+MINUTE = 60 * 1000
+
+
+def make_candles(n, start=0, step=MINUTE, seed=2):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    timestamps = start + np.arange(n) * step
+    return np.column_stack([timestamps, close * 0.999, close * 1.002, close * 0.997, close, rng.uniform(1, 5, n)])
+
+
+class TestResample(unittest.TestCase):
+
+    def test_plan_groups_timeframes_under_bases(self):
+        plan = multi_timeframe.plan_base_timeframes(['1d', '4h', '1h', '15m', '5m', '1m'], max_ratio=24)
+        self.assertEqual(plan, {'1m': ['1m', '5m', '15m'], '1h': ['1h', '4h', '1d']})
+
+    def test_matches_pandas_resample(self):
+        candles = make_candles(1000, start=7 * MINUTE)
+        df = pd.DataFrame(candles[:, 1:], columns=['open', 'high', 'low', 'close', 'volume'],
+                          index=pd.to_datetime(candles[:, 0], unit='ms'))
+        expected = df.resample('15min').agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'})
+
+        result = multi_timeframe.resample_candles(candles, '15m')
+
+        self.assertEqual(result[:, 0].tolist(), expected.index.as_unit('ms').astype('int64').tolist())
+        np.testing.assert_allclose(result[:, 1:], expected.to_numpy())
+
+    def test_incremental_update_matches_full_resample(self):
+        candles = make_candles(3000)
+        builder = multi_timeframe.MultiTimeframeCandles('1m', ['1m', '5m', '15m'], bars=150)
+        builder.update(candles[:2000])
+        for end in range(2001, 3001, 37):
+            partial = candles[end - 1].copy()
+            partial[4] *= 1.01
+            builder.update(np.vstack([candles[end - 40:end - 1], partial]))
+            builder.update(candles[end - 1:end])
+
+        for timeframe in ('1m', '5m', '15m'):
+            expected = multi_timeframe.resample_candles(candles, timeframe)[-150:]
+            np.testing.assert_allclose(builder.candles[timeframe], expected)
+
+
+class TestBuildMultiTimeframe(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        patcher = patch('utils.ohlcv_store.STORE_DIR', self.tmpdir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmpdir.cleanup)
+        self.addCleanup(multi_timeframe._builders.clear)
+        market_data._exchanges.clear()
+        market_data._markets_locks.clear()
+
+    @patch('utils.market_data.ccxt.bybit')
+    def test_fetches_base_timeframes_only_and_then_incrementally(self, mock_bybit):
+        now = 40 * 24 * 60 * MINUTE
+        history = {'1m': make_candles(40 * 24 * 60), '1h': make_candles(40 * 24, step=60 * MINUTE)}
+
+        def fetch_ohlcv(symbol, timeframe, since, limit=200):
+            candles = history[timeframe]
+            return candles[(candles[:, 0] >= since) & (candles[:, 0] < now)][:limit].tolist()
+
+        mock_exchange = MagicMock()
+        mock_exchange.milliseconds.side_effect = lambda: now
+        mock_exchange.fetch_ohlcv.side_effect = fetch_ohlcv
+        mock_bybit.return_value = mock_exchange
+
+        frames = multi_timeframe.build_multi_timeframe('bybit', 'BTC/USDT', ['1d', '4h', '1h', '15m', '5m', '1m'],
+                                                       bars=20, use_store=True)
+
+        fetched = {call.args[1] for call in mock_exchange.fetch_ohlcv.call_args_list}
+        self.assertEqual(fetched, {'1m', '1h'})
+        # 첫 수집은 거래소 최대 페이지 크기로 요청 (1m 300개, 1h 480개가 각각 한 페이지)
+        self.assertTrue(all(call.kwargs['limit'] == 1000 for call in mock_exchange.fetch_ohlcv.call_args_list))
+        self.assertLessEqual(len([call for call in mock_exchange.fetch_ohlcv.call_args_list if call.args[1] == '1m']), 2)
+        self.assertEqual({tf: len(df) for tf, df in frames.items()},
+                         {'1m': 20, '5m': 20, '15m': 20, '1h': 20, '4h': 20, '1d': 20})
+        self.assertEqual(frames['1d']['close'].iloc[-1], history['1h'][-1, 4])
+
+        mock_exchange.fetch_ohlcv.reset_mock()
+        now += 5 * MINUTE
+        history['1m'] = make_candles(40 * 24 * 60 + 5)
+        multi_timeframe.build_multi_timeframe('bybit', 'BTC/USDT', ['15m', '5m', '1m'], bars=20, use_store=True)
+        since = [call.kwargs['since'] for call in mock_exchange.fetch_ohlcv.call_args_list if call.args[1] == '1m'][0]
+        self.assertEqual(since, history['1m'][-6, 0])
+
+    @patch('utils.market_data.ccxt.bybit')
+    def test_refetches_window_when_store_has_gaps(self, mock_bybit):
+        now = 2 * 24 * 60 * MINUTE
+        history = make_candles(2 * 24 * 60)
+
+        def fetch_ohlcv(symbol, timeframe, since, limit=200):
+            return history[(history[:, 0] >= since) & (history[:, 0] < now)][:limit].tolist()
+
+        mock_exchange = MagicMock()
+        mock_exchange.milliseconds.side_effect = lambda: now
+        mock_exchange.fetch_ohlcv.side_effect = fetch_ohlcv
+        mock_bybit.return_value = mock_exchange
+
+        # 필요한 구간 중간의 캔들 10개가 빠진 저장소
+        gapped = np.delete(history, np.s_[-300:-290], axis=0)
+        with patch('utils.ohlcv_store.load_candles', return_value=gapped):
+            frames = multi_timeframe.build_multi_timeframe('bybit', 'BTC/USDT', ['5m', '1m'], bars=100, use_store=True)
+
+        required_since = multi_timeframe._get_builder('bybit', 'BTC/USDT', '1m', ['5m', '1m'], 100).required_since(now)
+        self.assertEqual(mock_exchange.fetch_ohlcv.call_args_list[0].kwargs['since'], required_since)
+        self.assertTrue(np.array_equal(frames['1m'].iloc[-1, 1:].to_numpy(dtype=float), history[-1, 1:]))
+
+
+if __name__ == '__main__':
+    unittest.main()
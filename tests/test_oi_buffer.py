@@ -0,0 +1,85 @@
+import asyncio
+import unittest
+
+import numpy as np
+
+from screener import binance_futures_screener as futures
+from utils.oi_buffer import OpenInterestBuffer
+from utils.rate_limiter import WeightedRateLimiter
+
+HOUR = 60 * 60 * 1000
+FIVE_MINUTES = 5 * 60 * 1000
+
+
+class TestOpenInterestBuffer(unittest.TestCase):
+
+    def test_keeps_latest_samples_in_order(self):
+        buffer = OpenInterestBuffer(4)
+        for i in range(6):
+            buffer.append(i * HOUR, 100 + i, 10 + i)
+        samples = buffer.samples()
+        self.assertEqual(len(buffer), 4)
+        np.testing.assert_array_equal(samples[:, 0], [2 * HOUR, 3 * HOUR, 4 * HOUR, 5 * HOUR])
+        np.testing.assert_array_equal(samples[:, 1], [102, 103, 104, 105])
+
+    def test_same_timestamp_overwrites_and_past_is_ignored(self):
+        buffer = OpenInterestBuffer(3)
+        buffer.append(HOUR, 100)
+        buffer.append(2 * HOUR, 110)
+        self.assertTrue(buffer.append(2 * HOUR, 120))
+        self.assertFalse(buffer.append(0, 90))
+        self.assertEqual(len(buffer), 2)
+        self.assertEqual(buffer.latest()[1], 120)
+
+    def test_change_over_window(self):
+        buffer = OpenInterestBuffer(25)
+        buffer.extend((i * HOUR, 100 + i, np.nan) for i in range(25))
+        self.assertAlmostEqual(buffer.change(24 * HOUR), (124 - 100) / 100 * 100)
+        self.assertAlmostEqual(buffer.change(4 * HOUR), (124 - 120) / 120 * 100)
+        self.assertIsNone(buffer.change(25 * HOUR))
+
+
+class FakeFuturesExchange:
+
+    def __init__(self, now):
+        self.now = now
+        self.calls = []
+        self.last_response_headers = {}
+
+    def milliseconds(self):
+        return self.now
+
+    async def fetch_open_interest_history(self, symbol, timeframe, since=None, limit=None):
+        self.calls.append((since, limit))
+        start = -(-since // FIVE_MINUTES) * FIVE_MINUTES
+        history = [{'timestamp': ts, 'openInterestValue': 1000 + ts // FIVE_MINUTES}
+                   for ts in range(start, self.now + 1, FIVE_MINUTES)]
+        return history[:limit]
+
+
+class TestMonitorSymbol(unittest.TestCase):
+
+    def test_seeds_once_then_polls_only_new_samples(self):
+        exchange = FakeFuturesExchange(now=1000 * HOUR)
+        limiter = WeightedRateLimiter(2400)
+        ticker = {'percentage': 3.0, 'quoteVolume': 1e9, 'last': 50.0}
+        buffers = {}
+
+        coin = asyncio.run(futures.monitor_symbol(exchange, 'BTC/USDT:USDT', ticker, buffers, limiter, '5m'))
+        buffer = buffers['BTC/USDT:USDT']
+        # 24시간 전 샘플이 밀려나지 않도록 24시간치보다 두 구간 더 채움
+        self.assertEqual(len(buffer), 24 * 12 + 3)
+        self.assertEqual(buffer.latest()[2], 50.0)
+        latest = 1000 + exchange.now // FIVE_MINUTES
+        self.assertAlmostEqual(coin['oi_change_24h'], (latest - (latest - 288)) / (latest - 288) * 100)
+        self.assertAlmostEqual(coin['oi_change_4h'], 48 / (latest - 48) * 100)
+
+        exchange.now += FIVE_MINUTES
+        coin = asyncio.run(futures.monitor_symbol(exchange, 'BTC/USDT:USDT', ticker, buffers, limiter, '5m'))
+        self.assertEqual(exchange.calls[-1][0], 1000 * HOUR)
+        self.assertEqual(len(buffer), 24 * 12 + 3)
+        self.assertEqual(coin['current_oi_usd'], latest + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from screener import binance_futures_screener as futures
+from utils import oi_store
+from utils.rate_limiter import WeightedRateLimiter
+
+HOUR = 60 * 60 * 1000
+
+
+def make_history(start, end, step=HOUR):
+    return [{'timestamp': ts, 'openInterestAmount': ts / HOUR, 'openInterestValue': 1000 + ts / HOUR}
+            for ts in range(start, end, step)]
+
+
+class FakeArchiveExchange:
+
+    def __init__(self, now):
+        self.now = now
+        self.calls = []
+        self.last_response_headers = {}
+
+    def milliseconds(self):
+        return self.now
+
+    async def fetch_open_interest_history(self, symbol, timeframe, since=None, limit=None):
+        self.calls.append(since)
+        start = -(-since // HOUR) * HOUR
+        return make_history(start, self.now + 1)[:limit]
+
+
+class TestOpenInterestStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        patcher = patch('utils.oi_store.STORE_DIR', self.tmpdir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def test_sync_merges_and_serves_ranges(self):
+        oi_store.sync_open_interest('binanceusdm', 'BTC/USDT:USDT', '1h', make_history(0, 10 * HOUR))
+        merged = oi_store.sync_open_interest('binanceusdm', 'BTC/USDT:USDT', '1h', make_history(8 * HOUR, 12 * HOUR))
+        np.testing.assert_array_equal(merged[:, 0], np.arange(12) * HOUR)
+
+        window = oi_store.load_range('binanceusdm', 'BTC/USDT:USDT', '1h', 3 * HOUR, 6 * HOUR)
+        np.testing.assert_array_equal(window[:, oi_store.VALUE_COLUMN], [1003, 1004, 1005])
+        self.assertEqual(len(oi_store.load_range('binanceusdm', 'ETH/USDT:USDT', '1h')), 0)
+
+    def test_change_over_window(self):
+        samples = oi_store.history_to_rows(make_history(0, 73 * HOUR))
+        self.assertAlmostEqual(oi_store.change(samples, 72 * HOUR), (1072 - 1000) / 1000 * 100)
+        self.assertAlmostEqual(oi_store.change(samples, 4 * HOUR), (1072 - 1068) / 1068 * 100)
+        self.assertIsNone(oi_store.change(samples, 7 * 24 * HOUR))
+
+    def test_archive_sync_fetches_only_new_samples(self):
+        exchange = FakeArchiveExchange(now=2000 * HOUR)
+        limiter = WeightedRateLimiter(2400)
+        samples = asyncio.run(futures.sync_open_interest_archive(exchange, 'BTC/USDT:USDT', limiter, '1h'))
+        # 30일치(721개)는 최대 조회 개수(500) 단위로 나누어 받습니다.
+        self.assertEqual(len(samples), 30 * 24 + 1)
+        self.assertEqual(len(exchange.calls), 2)
+
+        exchange.now += 3 * HOUR
+        samples = asyncio.run(futures.sync_open_interest_archive(exchange, 'BTC/USDT:USDT', limiter, '1h'))
+        self.assertEqual(exchange.calls[-1], 2000 * HOUR + 1)
+        self.assertEqual(samples[-1, 0], 2003 * HOUR)
+        self.assertEqual(len(samples), 30 * 24 + 4)
+
+    def test_screen_coins_with_lookback_windows(self):
+        oi_store.sync_open_interest('binanceusdm', 'BTC/USDT:USDT', '1h', make_history(0, 150 * HOUR))
+        coin = {'symbol': 'BTC/USDT:USDT', 'price_change_24h': 1.0, 'volume_24h_usd': 1e9,
+                'current_oi_usd': 1149.0, 'oi_change_24h': 1.0, 'oi_change_4h': 1.0}
+        other = dict(coin, symbol='ETH/USDT:USDT')
+
+        found = futures.screen_coins([coin, other], {'3d': 5.0, '7d': None})
+        self.assertEqual([c['symbol'] for c in found], ['BTC/USDT:USDT'])
+        self.assertAlmostEqual(found[0]['oi_change_3d'], (1149 - 1077) / 1077 * 100)
+        self.assertIsNone(found[0]['oi_change_7d'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils.panel import (
+    build_panel, ath_drawdown, recent_volatility, latest_cci, latest_rsi, max_volume_spike
+)
+
+
+def make_frame(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, n)))
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=n, freq='D'),
+        'open': close,
+        'high': close * (1 + rng.uniform(0, 0.05, n)),
+        'low': close * (1 - rng.uniform(0, 0.05, n)),
+        'close': close,
+        'volume': rng.uniform(1e3, 1e6, n),
+    })
+
+
+class TestPricePanel(unittest.TestCase):
+
+    def setUp(self):
+        self.frames = {'A/KRW': make_frame(300, 1), 'B/KRW': make_frame(45, 2), 'C/KRW': make_frame(10, 3)}
+        self.panel = build_panel(self.frames)
+
+    def test_rows_are_right_aligned(self):
+        self.assertEqual(self.panel.close.shape, (3, 300))
+        self.assertEqual(self.panel.lengths.tolist(), [300, 45, 10])
+        self.assertTrue(np.isnan(self.panel.close[2, -11]))
+        self.assertEqual(self.panel.close[1, -1], self.frames['B/KRW']['close'].iloc[-1])
+
+    def test_metrics_match_per_symbol_pandas(self):
+        drawdown = ath_drawdown(self.panel)
+        volatility = recent_volatility(self.panel)
+        cci = latest_cci(self.panel, 20)
+        rsi = latest_rsi(self.panel, 14)
+
+        for row, (symbol, df) in enumerate(self.frames.items()):
+            close = df['close'].iloc[-1]
+            self.assertAlmostEqual(drawdown[row], 1 - close / df['high'].max())
+            expected_volatility = (df['high'].tail(30).max() - df['low'].tail(30).min()) / close * 100
+            self.assertAlmostEqual(volatility[row], expected_volatility)
+
+            tp = (df['high'] + df['low'] + df['close']) / 3
+            mad = tp.rolling(20).apply(lambda x: np.fabs(x - x.mean()).mean(), raw=True)
+            expected_cci = ((tp - tp.rolling(20).mean()) / (0.015 * mad)).iloc[-1]
+
+            delta = df['close'].diff()
+            gain = delta.clip(lower=0).ewm(alpha=1 / 14, min_periods=14).mean()
+            loss = (-delta.clip(upper=0)).ewm(alpha=1 / 14, min_periods=14).mean()
+            expected_rsi = (100 * gain / (gain + loss)).iloc[-1]
+
+            if np.isnan(expected_cci):
+                self.assertTrue(np.isnan(cci[row]), symbol)
+            else:
+                self.assertAlmostEqual(cci[row], expected_cci, places=6)
+            if np.isnan(expected_rsi):
+                self.assertTrue(np.isnan(rsi[row]), symbol)
+            else:
+                self.assertAlmostEqual(rsi[row], expected_rsi, places=6)
+
+    def test_max_volume_spike_matches_idxmax(self):
+        ratios, timestamps = max_volume_spike(self.panel, lookback=30, window=30)
+
+        df = self.frames['A/KRW']
+        spike = (df['volume'] / df['volume'].rolling(30).mean()).iloc[-30:]
+        self.assertAlmostEqual(ratios[0], spike.max())
+        self.assertEqual(pd.to_datetime(timestamps[0], unit='ms'), df.loc[spike.idxmax(), 'timestamp'])
+        self.assertTrue(np.isnan(ratios[2]))
+
+
+if __name__ == '__main__':
+    unittest.main()
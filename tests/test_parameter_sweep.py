@@ -0,0 +1,58 @@
+import unittest
+
+import numpy as np
+
+from utils import backtest, indicators, parameter_sweep
+
+GRID = {
+    'fast_period': [5, 8, 30],
+    'slow_period': [20, 30],
+    'rsi_period': [14],
+    'rsi_threshold': [40, 50],
+    'take_profit': [0.01, 0.02],
+    'stop_loss': [0.005],
+    'position_size_usd': [10000],
+}
+
+
+def make_close(n=2000, seed=11):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+
+
+class TestParameterSweep(unittest.TestCase):
+
+    def test_skips_fast_period_not_below_slow(self):
+        tasks = parameter_sweep.build_tasks(GRID)
+        self.assertEqual(len(tasks), 4)
+        self.assertTrue(all(fast < slow for fast, slow, _, _ in tasks))
+
+    def test_missing_parameter_raises(self):
+        with self.assertRaises(ValueError):
+            parameter_sweep.build_tasks({'fast_period': [5]})
+
+    def test_process_pool_matches_direct_backtest(self):
+        close = make_close()
+        results = parameter_sweep.sweep_parameters(close, GRID, max_workers=2)
+
+        self.assertEqual(len(results), 4 * 4)
+        self.assertTrue(results['total_pnl'].is_monotonic_decreasing)
+        for row in results.itertuples():
+            _, summary = backtest.run_backtest(
+                close, indicators.ema(close, row.fast_period), indicators.ema(close, row.slow_period),
+                indicators.rsi(close, row.rsi_period), rsi_threshold=row.rsi_threshold,
+                take_profit=row.take_profit, stop_loss=row.stop_loss, position_size_usd=row.position_size_usd,
+                start_index=max(row.slow_period, row.rsi_period)
+            )
+            self.assertEqual(row.final_balance, summary['final_balance'])
+            self.assertEqual(row.total_trades, summary['total_trades'])
+
+    def test_in_process_matches_process_pool(self):
+        close = make_close(seed=12)
+        sequential = parameter_sweep.sweep_parameters(close, GRID, max_workers=1)
+        parallel = parameter_sweep.sweep_parameters(close, GRID, max_workers=2)
+        self.assertTrue(sequential.equals(parallel))
+
+
+if __name__ == '__main__':
+    unittest.main()
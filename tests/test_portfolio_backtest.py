@@ -0,0 +1,62 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils import backtest, indicators, portfolio_backtest
+
+
+def make_frame(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(1_600_000_000_000 + np.arange(n) * 3_600_000, unit='ms'),
+        'close': close,
+    })
+
+
+class TestPortfolioBacktest(unittest.TestCase):
+
+    def test_single_symbol_with_ample_capital_matches_backtest(self):
+        df = make_frame(2000, seed=1)
+        close = df['close'].to_numpy()
+        ledger, expected = backtest.run_backtest(
+            close, indicators.ema(close, 5), indicators.ema(close, 20), indicators.rsi(close, 14),
+            position_size_usd=1000, initial_balance=10**9
+        )
+
+        trades, per_symbol, summary = portfolio_backtest.run_portfolio_backtest(
+            {'AAA/USDT': df}, initial_balance=10**9, position_size_usd=1000, max_workers=1
+        )
+
+        self.assertEqual(trades['profit_loss_usd'].tolist(), ledger['profit_loss_usd'].tolist())
+        self.assertEqual(summary['final_balance'], expected['final_balance'])
+        self.assertEqual(per_symbol.loc[0, 'total_trades'], expected['total_trades'])
+
+    def test_shared_capital_limits_open_positions(self):
+        frames = {f'S{seed}/USDT': make_frame(1500, seed) for seed in range(8)}
+
+        trades, per_symbol, summary = portfolio_backtest.run_portfolio_backtest(
+            frames, initial_balance=2000, position_size_usd=1000, max_workers=2
+        )
+        _, _, unlimited = portfolio_backtest.run_portfolio_backtest(
+            frames, initial_balance=10**9, position_size_usd=1000, max_workers=1
+        )
+
+        self.assertLessEqual(summary['max_open_positions'], 2)
+        self.assertGreater(summary['skipped_signals'], 0)
+        self.assertLess(summary['total_trades'], unlimited['total_trades'])
+        self.assertEqual(per_symbol['total_trades'].sum(), len(trades))
+        self.assertEqual(len(per_symbol), len(frames))
+
+    def test_same_symbol_does_not_overlap_positions(self):
+        frames = {f'S{seed}/USDT': make_frame(1500, seed) for seed in range(4)}
+        trades, _, _ = portfolio_backtest.run_portfolio_backtest(frames, initial_balance=10**9, max_workers=1)
+
+        for _, group in trades.groupby('symbol'):
+            group = group.sort_values('entry_time')
+            self.assertTrue((group['entry_time'].iloc[1:].to_numpy() > group['exit_time'].iloc[:-1].to_numpy()).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
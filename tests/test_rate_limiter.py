@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import unittest
+
+import ccxt.async_support as ccxt
+
+from utils.rate_limiter import RequestThrottle, WeightedRateLimiter, shared_throttle
+
+
+class FakeClock:
+    """sleep 호출 시 시간을 그만큼 진행시키는 가짜 시계."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeExchange:
+
+    def __init__(self, failures=0, headers=None):
+        self.failures = failures
+        self.calls = 0
+        self.last_response_headers = headers or {}
+
+    async def fetch_open_interest_history(self, symbol, timeframe, since=None, limit=None):
+        self.calls += 1
+        if self.failures:
+            self.failures -= 1
+            raise ccxt.RateLimitExceeded('429')
+        return [symbol, timeframe, since, limit]
+
+
+class TestWeightedRateLimiter(unittest.TestCase):
+
+    def make_limiter(self, clock, **kwargs):
+        return WeightedRateLimiter(kwargs.pop('max_weight', 10), safety_ratio=1.0,
+                                   clock=clock, sleep=clock.sleep, **kwargs)
+
+    def test_waits_when_budget_is_spent(self):
+        clock = FakeClock()
+        limiter = self.make_limiter(clock)
+        exchange = FakeExchange()
+
+        async def run_all():
+            return await asyncio.gather(*[
+                limiter.run(exchange, 'fetch_open_interest_history', 'BTC', '1h', since=0, limit=25, weight=4)
+                for _ in range(3)
+            ])
+
+        results = asyncio.run(run_all())
+        self.assertEqual(results[0], ['BTC', '1h', 0, 25])
+        self.assertEqual(exchange.calls, 3)
+        # 4 + 4 = 8까지는 즉시 실행되고 세 번째 요청은 첫 요청이 1분 창에서 빠질 때까지 대기
+        self.assertAlmostEqual(clock.now, 60.0)
+
+    def test_backs_off_and_retries_on_rate_limit(self):
+        clock = FakeClock()
+        limiter = self.make_limiter(clock, max_weight=100, base_backoff=2.0)
+        exchange = FakeExchange(failures=2)
+
+        result = asyncio.run(limiter.run(exchange, 'fetch_open_interest_history', 'ETH', '1h'))
+        self.assertEqual(result[0], 'ETH')
+        self.assertEqual(exchange.calls, 3)
+        self.assertEqual(limiter.throttled, 2)
+        self.assertEqual(clock.sleeps, [2.0, 4.0])
+        self.assertLess(limiter.budget, limiter.max_weight)
+
+    def test_gives_up_after_max_retries(self):
+        clock = FakeClock()
+        limiter = self.make_limiter(clock, max_retries=1)
+        exchange = FakeExchange(failures=5)
+
+        with self.assertRaises(ccxt.RateLimitExceeded):
+            asyncio.run(limiter.run(exchange, 'fetch_open_interest_history', 'ETH', '1h'))
+        self.assertEqual(exchange.calls, 2)
+
+    def test_uses_reported_weight_header(self):
+        clock = FakeClock()
+        limiter = self.make_limiter(clock, max_weight=100)
+        exchange = FakeExchange(headers={'x-mbx-used-weight-1m': '95'})
+
+        asyncio.run(limiter.run(exchange, 'fetch_open_interest_history', 'BTC', '1h'))
+        self.assertEqual(limiter.used_weight(), 95)
+        asyncio.run(limiter.run(exchange, 'fetch_open_interest_history', 'BTC', '1h', weight=10))
+        self.assertAlmostEqual(clock.now, 60.0)
+
+
+class TestRequestThrottle(unittest.TestCase):
+
+    def test_threads_share_one_budget(self):
+        # 두 작업(스레드)이 각자의 이벤트 루프에서 요청해도 요청 간격은 하나의 예산을 따름
+        clock = FakeClock()
+        throttle = RequestThrottle(4, clock=clock, sleep=clock.sleep)
+        delays = []
+
+        def job():
+            for _ in range(5):
+                delays.append(throttle.reserve())
+
+        threads = [threading.Thread(target=job) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(delays), [i * 0.25 for i in range(10)])
+
+    def test_wait_sleeps_until_reserved_slot(self):
+        clock = FakeClock()
+        throttle = RequestThrottle(2, clock=clock, sleep=clock.sleep)
+
+        async def run_all():
+            for _ in range(3):
+                await throttle.wait()
+
+        asyncio.run(run_all())
+        self.assertEqual(clock.sleeps, [0.5, 0.5])
+        self.assertAlmostEqual(clock.now, 1.0)
+
+    def test_shared_throttle_is_reused_per_exchange(self):
+        self.assertIs(shared_throttle('upbit', 8), shared_throttle('upbit', 8))
+        self.assertIsNot(shared_throttle('upbit', 8), shared_throttle('bithumb', 8))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from utils.database import ScreenerResult, attach_hits, init_db
+from utils.result_writer import ResultWriter
+
+
+class TestResultWriter(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.engine = create_engine(
+            f"sqlite:///{os.path.join(tmp.name, 'results.db')}", connect_args={'check_same_thread': False}
+        )
+        self.addCleanup(self.engine.dispose)
+        init_db(self.engine)
+        self.writer = ResultWriter(self.engine)
+        self.addCleanup(self.writer.close)
+
+    def test_concurrent_writers_are_batched(self):
+        # 첫 커밋을 잠시 붙잡아 두는 동안 다른 스레드들의 요청이 큐에 쌓이도록 함
+        gate = threading.Event()
+        event.listen(self.engine, 'commit', lambda conn: gate.wait(5))
+        saved = []
+
+        def write(i):
+            result = ScreenerResult(screener_name='daily', output_text=f'run {i}')
+            saved.append(self.writer.write(attach_hits(result, [{'symbol': f'COIN{i}/KRW', 'cci': float(i)}])))
+
+        threads = [threading.Thread(target=write, args=(i,)) for i in range(20)]
+        for thread in threads:
+            thread.start()
+        gate.set()
+        for thread in threads:
+            thread.join(10)
+
+        self.assertEqual(len(saved), 20)
+        self.assertTrue(all(result.id for result in saved))
+        self.assertEqual(self.writer.written, 20)
+        self.assertLess(self.writer.batches, 20)
+        db = sessionmaker(bind=self.engine)()
+        self.addCleanup(db.close)
+        self.assertEqual(db.query(ScreenerResult).count(), 20)
+
+    def test_failed_result_does_not_fail_the_batch(self):
+        self.writer.write(ScreenerResult(id=1, screener_name='daily'))
+        batch_sizes = []
+        commit = self.writer._commit
+        self.writer._commit = lambda batch: batch_sizes.append(len(batch)) or commit(batch)
+
+        # 앞선 커밋을 붙잡아 두어 bad와 also_good이 같은 묶음으로 커밋되도록 함
+        gate, committing = threading.Event(), threading.Event()
+        event.listen(self.engine, 'commit', lambda conn: committing.set() or gate.wait(5))
+        holder = self.writer.submit(ScreenerResult(screener_name='daily'))
+        self.assertTrue(committing.wait(5))
+        bad = self.writer.submit(ScreenerResult(id=1, screener_name='daily'))  # 중복 기본 키
+        also_good = self.writer.submit(ScreenerResult(screener_name='altcoin'))
+        gate.set()
+
+        self.assertIsNotNone(holder.result(5).id)
+        with self.assertRaises(Exception):
+            bad.result(5)
+        self.assertIsNotNone(also_good.result(5).id)
+        # 묶음(2개) 커밋이 실패한 뒤 하나씩 다시 커밋
+        self.assertEqual(batch_sizes, [1, 2, 1, 1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from utils import indicators
+from utils.streaming_indicators import IndicatorSet, CciState, EmaState, RsiState
+
+SPECS = {'EMA_20': ('ema', 20), 'RSI_14': ('rsi', 14), 'CCI_20_0.015': ('cci', 20)}
+
+
+def make_candles(n, seed=5):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    high = close * (1 + rng.uniform(0, 0.03, n))
+    low = close * (1 - rng.uniform(0, 0.03, n))
+    timestamps = np.arange(n) * 86_400_000
+    return np.column_stack([timestamps, close, high, low, close, np.ones(n)])
+
+
+def expected_values(candles):
+    high, low, close = candles[:, 2], candles[:, 3], candles[:, 4]
+    return {
+        'EMA_20': indicators.ema(close, 20)[-1],
+        'RSI_14': indicators.rsi(close, 14)[-1],
+        'CCI_20_0.015': indicators.cci(high, low, close, 20)[-1],
+    }
+
+
+class TestStreamingIndicators(unittest.TestCase):
+
+    def assertValuesClose(self, actual, expected):
+        for name, value in expected.items():
+            self.assertAlmostEqual(actual[name], value, places=7, msg=name)
+
+    def test_incremental_updates_match_full_recompute(self):
+        candles = make_candles(300)
+        indicator_set = IndicatorSet(SPECS)
+        indicator_set.sync(candles[:250])
+
+        for end in range(251, 301):
+            values = indicator_set.sync(candles[end - 2:end])
+            self.assertValuesClose(values, expected_values(candles[:end]))
+
+    def test_partial_last_candle_is_replaced(self):
+        candles = make_candles(100)
+        indicator_set = IndicatorSet(SPECS)
+        partial = candles.copy()
+        partial[-1, 2:5] *= 0.9
+        indicator_set.sync(partial)
+
+        values = indicator_set.sync(candles[-1:])
+
+        self.assertValuesClose(values, expected_values(candles))
+
+    def test_state_round_trips_through_dict(self):
+        candles = make_candles(120)
+        indicator_set = IndicatorSet(SPECS)
+        indicator_set.sync(candles[:110])
+
+        restored = IndicatorSet.from_dict(indicator_set.to_dict(), SPECS)
+        values = restored.sync(candles[109:])
+
+        self.assertValuesClose(values, expected_values(candles))
+        self.assertIsNone(IndicatorSet.from_dict(indicator_set.to_dict(), {'EMA_5': ('ema', 5)}))
+
+    def test_gap_triggers_full_recompute(self):
+        candles = make_candles(200)
+        indicator_set = IndicatorSet(SPECS)
+        indicator_set.sync(candles[:50])
+
+        values = indicator_set.sync(candles[100:])
+
+        self.assertValuesClose(values, expected_values(candles[100:]))
+
+    def test_update_many_matches_kernels(self):
+        candles = make_candles(500)
+        timestamps, high, low, close = candles[:, 0], candles[:, 2], candles[:, 3], candles[:, 4]
+        for state, expected in ((EmaState(20), indicators.ema(close, 20)), (RsiState(14), indicators.rsi(close, 14)),
+                                (CciState(20), indicators.cci(high, low, close, 20))):
+            values = np.concatenate([
+                state.update_many(timestamps[:7], high[:7], low[:7], close[:7]),
+                state.update_many(timestamps[7:300], high[7:300], low[7:300], close[7:300]),
+                state.update_many(timestamps[300:], high[300:], low[300:], close[300:]),
+            ])
+            np.testing.assert_allclose(values, expected, rtol=1e-10, equal_nan=True)
+
+    def test_cold_sync_applies_candles_in_bulk(self):
+        # 상태가 없을 때도 캔들별 파이썬 루프가 아니라 update_many의 벡터화 경로로 적용
+        candles = make_candles(2000)
+        with patch.object(CciState, '_apply', autospec=True, side_effect=CciState._apply) as cci_apply, \
+                patch.object(RsiState, '_apply', autospec=True, side_effect=RsiState._apply) as rsi_apply:
+            values = IndicatorSet(SPECS).sync(candles)
+
+        self.assertValuesClose(values, expected_values(candles))
+        self.assertLessEqual(cci_apply.call_count, 1)
+        self.assertLessEqual(rsi_apply.call_count, 2)
+
+    def test_rejects_out_of_order_candle(self):
+        for state in (EmaState(5), RsiState(5)):
+            state.update(2, 1.0, 1.0, 1.0)
+            with self.assertRaises(ValueError):
+                state.update(1, 1.0, 1.0, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import json
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from celery_app import celery_app
+from screener import tasks
+from utils import rate_limiter
+from utils.database import Base, ScreenerResult
+
+SYMBOLS = [f'COIN{i}/KRW' for i in range(7)]
+
+
+def fake_screen_daily_symbols(symbols, **params):
+    # 짝수 번호 코인만 조건을 통과한다고 가정
+    coins = [{'symbol': symbol, 'downtrend': 80.0, 'volatility': 50.0, 'cci': 0.0,
+              'max_volume_spike': float(symbol[4]), 'max_spike_date': '01-01'}
+             for symbol in symbols if int(symbol[4]) % 2 == 0]
+    return coins, [f"charts/{coin['symbol'].replace('/', '_')}.png" for coin in coins]
+
+
+class TestScreenerTasks(unittest.TestCase):
+
+    def setUp(self):
+        # Redis 없이 실행되도록 메모리 브로커/결과 백엔드와 즉시 실행(eager) 모드를 사용합니다.
+        overrides = {'task_always_eager': True, 'task_eager_propagates': True,
+                     'broker_url': 'memory://', 'result_backend': 'cache+memory://'}
+        previous = {key: celery_app.conf[key] for key in overrides}
+        celery_app.conf.update(overrides)
+        self.addCleanup(celery_app.conf.update, previous)
+
+        engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=engine)
+        self.Session = sessionmaker(bind=engine)
+        for target, value in (('screener.tasks.SessionLocal', self.Session), ('screener.tasks.SCAN_CHUNK_SIZE', 3)):
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_build_chunks_slices_context(self):
+        chunks = tasks.build_chunks(SYMBOLS, {'tickers': {'COIN1/KRW': 1, 'COIN4/KRW': 4}}, chunk_size=3)
+        self.assertEqual([chunk['symbols'] for chunk in chunks], [SYMBOLS[:3], SYMBOLS[3:6], SYMBOLS[6:]])
+        self.assertEqual(chunks[0]['tickers'], {'COIN1/KRW': 1})
+        self.assertEqual(chunks[1]['tickers'], {'COIN4/KRW': 4})
+        self.assertEqual(chunks[2]['tickers'], {})
+
+    def test_concurrent_chunks_split_the_rate_budget(self):
+        # 동시에 실행될 수 있는 청크 수만큼 거래소 요청 예산을 나눔
+        self.assertEqual({chunk['rate_share'] for chunk in tasks.build_chunks(SYMBOLS, {}, chunk_size=3, max_parallel=4)},
+                         {1 / 3})
+        self.assertEqual({chunk['rate_share'] for chunk in tasks.build_chunks(SYMBOLS, {}, chunk_size=1, max_parallel=4)},
+                         {1 / 4})
+
+        shares = []
+
+        def screen(symbols, **params):
+            shares.append(rate_limiter.rate_share())
+            return [], []
+
+        with patch('screener.daily_screener.select_symbols', return_value=SYMBOLS), \
+                patch('screener.daily_screener.screen_daily_symbols', side_effect=screen):
+            tasks.run_distributed_scan('daily')
+        self.assertEqual(shares, [1 / 3] * 3)
+        self.assertEqual(rate_limiter.rate_share(), 1.0)
+
+    def test_daily_scan_fans_out_and_merges_into_one_result(self):
+        chunk_calls = []
+
+        def screen(symbols, **params):
+            chunk_calls.append((list(symbols), params['cci_period']))
+            return fake_screen_daily_symbols(symbols, **params)
+
+        with patch('screener.daily_screener.select_symbols', return_value=SYMBOLS), \
+                patch('screener.daily_screener.screen_daily_symbols', side_effect=screen):
+            result = tasks.run_distributed_scan('daily', {'cci_period': 30})
+
+        self.assertEqual([symbols for symbols, _ in chunk_calls], [SYMBOLS[:3], SYMBOLS[3:6], SYMBOLS[6:]])
+        self.assertTrue(all(cci_period == 30 for _, cci_period in chunk_calls))
+        self.assertEqual([row[0] for row in result['table_data']['rows']],
+                         ['COIN6/KRW', 'COIN4/KRW', 'COIN2/KRW', 'COIN0/KRW'])
+        self.assertEqual(len(result['charts']), 4)
+
+        db = self.Session()
+        stored = db.query(ScreenerResult).filter_by(screener_name='daily').all()
+        self.assertTrue(stored)
+        self.assertEqual(json.loads(stored[-1].table_rows), result['table_data']['rows'])
+        db.close()
+
+    def test_unknown_parameter_is_rejected(self):
+        with patch('screener.daily_screener.select_symbols', return_value=SYMBOLS):
+            with self.assertRaises(ValueError):
+                tasks.run_distributed_scan('daily', {'not_a_param': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
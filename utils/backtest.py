@@ -0,0 +1,282 @@
+import numpy as np
+
+from utils.streaming_indicators import EmaState, RsiState
+
+# NumPy 배열 기반 백테스트 엔진
+# 신호는 전체 구간에 대해 한 번에 계산하고, 캔들 단위 루프 대신 거래 단위로
+# 다음 진입 후보와 첫 청산 지점을 배열 연산(searchsorted / argmax)으로 찾습니다.
+
+EXIT_TAKE_PROFIT = 0
+EXIT_STOP_LOSS = 1
+EXIT_DEATH_CROSS = 2
+EXIT_REASONS = ("익절", "손절", "데드 크로스")
+
+
+def crossover_signals(fast, slow):
+    """
+    (골든 크로스, 데드 크로스) 불리언 배열을 반환합니다.
+    직전 캔들 대비 fast가 slow를 상향/하향 돌파한 캔들이 True이며, NaN 구간은 False입니다.
+    """
+    fast = np.asarray(fast, dtype=np.float64)
+    slow = np.asarray(slow, dtype=np.float64)
+    golden = np.zeros(fast.shape, dtype=bool)
+    death = np.zeros(fast.shape, dtype=bool)
+    golden[1:] = (fast[:-1] < slow[:-1]) & (fast[1:] > slow[1:])
+    death[1:] = (fast[:-1] > slow[:-1]) & (fast[1:] < slow[1:])
+    return golden, death
+
+
+def _next_true_index(mask):
+    """각 위치 i에 대해 i 이상에서 처음 True인 위치. 없으면 len(mask)."""
+    n = len(mask)
+    positions = np.where(mask, np.arange(n), n)
+    return np.minimum.accumulate(positions[::-1])[::-1]
+
+
+def entry_signals(close, fast_ema, slow_ema, rsi, rsi_threshold=50.0, start_index=20):
+    """(진입 후보 인덱스 배열, 각 위치 이후 첫 데드 크로스 인덱스 배열)을 반환합니다."""
+    golden, death = crossover_signals(fast_ema, slow_ema)
+    entry_signal = golden & (np.asarray(rsi, dtype=np.float64) >= rsi_threshold)
+    entry_signal[:start_index] = False
+    death[:start_index] = False
+    return np.flatnonzero(entry_signal), _next_true_index(death)
+
+
+class IntrabarPath:
+    """
+    백테스트 캔들(예: 1h) 안의 가격 경로를 하위 타임프레임 캔들(예: 1m)의 고가/저가로 표현합니다.
+    각 하위 캔들은 자신이 속한 백테스트 캔들에 배정되며, 하위 캔들이 없는 백테스트 캔들은
+    종가 하나로 대신하므로 그 구간에서는 종가 기준 판정과 같아집니다.
+    """
+
+    def __init__(self, timestamps, close, lower_candles, timeframe_ms):
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        close = np.asarray(close, dtype=np.float64)
+        lower = np.asarray(lower_candles, dtype=np.float64).reshape(-1, 6)
+        lower = lower[(lower[:, 0] >= timestamps[0]) & (lower[:, 0] < timestamps[-1] + timeframe_ms)] \
+            if len(timestamps) else lower[:0]
+
+        bar = np.searchsorted(timestamps, lower[:, 0].astype(np.int64), side='right') - 1
+        inside = lower[:, 0] < timestamps[bar] + timeframe_ms  # 백테스트 캔들 사이 공백에 놓인 캔들 제외
+        lower, bar = lower[inside], bar[inside]
+        covered = np.zeros(len(timestamps), dtype=bool)
+        covered[bar] = True
+        missing = np.flatnonzero(~covered)
+
+        self.bar = np.concatenate([bar, missing])
+        self.high = np.concatenate([lower[:, 2], close[missing]])
+        self.low = np.concatenate([lower[:, 3], close[missing]])
+        order = np.argsort(self.bar, kind='stable')
+        self.bar, self.high, self.low = self.bar[order], self.high[order], self.low[order]
+        # bar_start[i]: 백테스트 캔들 i의 첫 경로 위치 (마지막 원소는 경로 길이)
+        self.bar_start = np.searchsorted(self.bar, np.arange(len(timestamps) + 1), side='left')
+
+    def first_exit(self, start, end, entry_price, take_profit, stop_loss):
+        """
+        [start, end) 캔들 구간에서 익절/손절 목표가에 처음 닿는 (캔들 인덱스, 청산 사유)를 찾습니다.
+        같은 하위 캔들에서 두 목표가에 모두 닿으면 순서를 알 수 없으므로 보수적으로 손절로 처리합니다.
+        """
+        first, last = self.bar_start[start], self.bar_start[end]
+        hit_tp = self.high[first:last] >= entry_price * (1 + take_profit)
+        hit_sl = self.low[first:last] <= entry_price * (1 - stop_loss)
+        hit = hit_tp | hit_sl
+        if not hit.any():
+            return None
+        offset = int(np.argmax(hit))
+        return int(self.bar[first + offset]), EXIT_STOP_LOSS if hit_sl[offset] else EXIT_TAKE_PROFIT
+
+
+def find_exit(close, entry, next_death, take_profit=0.01, stop_loss=0.005, intrabar=None):
+    """
+    entry 캔들 종가로 진입한 포지션의 (청산 인덱스, 청산 사유)를 반환합니다.
+    intrabar(IntrabarPath)가 주어지면 익절/손절을 하위 타임프레임 고가/저가로 판정합니다.
+    데이터 끝까지 청산되지 않으면 None을 반환합니다.
+    """
+    return _first_exit(close, entry + 1, close[entry], next_death, take_profit, stop_loss, intrabar)
+
+
+def _first_exit(close, start, entry_price, next_death, take_profit, stop_loss, intrabar=None):
+    """start 캔들부터 처음 익절/손절 목표가에 닿거나 데드 크로스가 나오는 캔들을 찾습니다."""
+    n = len(close)
+    if start >= n:
+        return None
+
+    # 첫 데드 크로스까지만 목표가 도달 여부를 확인합니다.
+    # 데드 크로스는 캔들 종가에 확정되므로 같은 캔들 안에서 닿은 목표가가 먼저입니다.
+    death_index = next_death[start]
+    if intrabar is not None:
+        exit_ = intrabar.first_exit(start, min(death_index + 1, n), entry_price, take_profit, stop_loss)
+        if exit_ is not None:
+            return exit_
+        return (int(death_index), EXIT_DEATH_CROSS) if death_index < n else None
+
+    window = close[start:death_index + 1]
+    hit_tp = window >= entry_price * (1 + take_profit)
+    hit_sl = window <= entry_price * (1 - stop_loss)
+    hit = hit_tp | hit_sl
+    if hit.any():
+        offset = int(np.argmax(hit))
+        return start + offset, EXIT_TAKE_PROFIT if hit_tp[offset] else EXIT_STOP_LOSS
+    if death_index < n:
+        return int(death_index), EXIT_DEATH_CROSS
+    return None
+
+
+def exit_prices(close, entry_index, exit_index, exit_reason, take_profit=0.01, stop_loss=0.005):
+    """청산 사유에 따른 청산가 (익절/손절은 목표가, 데드 크로스는 종가)."""
+    entry_price = close[entry_index]
+    return np.select(
+        [exit_reason == EXIT_TAKE_PROFIT, exit_reason == EXIT_STOP_LOSS],
+        [entry_price * (1 + take_profit), entry_price * (1 - stop_loss)],
+        close[exit_index]
+    )
+
+
+def run_backtest(close, fast_ema, slow_ema, rsi, rsi_threshold=50.0, take_profit=0.01, stop_loss=0.005,
+                 position_size_usd=10000, initial_balance=10000, start_index=20, intrabar=None):
+    """
+    EMA 골든 크로스 + RSI 조건으로 롱 진입하고 익절/손절/데드 크로스로 청산하는 전략을 시뮬레이션합니다.
+    진입은 신호 캔들 종가, 익절/손절은 목표가, 데드 크로스는 해당 캔들 종가로 청산하며,
+    청산 판단은 캔들 종가 기준(익절 > 손절 > 데드 크로스 순)입니다.
+    intrabar(IntrabarPath)를 넘기면 익절/손절은 하위 타임프레임 캔들에서 처음 닿은 시점으로 판정합니다.
+    (거래 장부 {필드: 배열}, 요약 통계 dict) 튜플을 반환합니다.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    entry_candidates, next_death = entry_signals(close, fast_ema, slow_ema, rsi, rsi_threshold, start_index)
+
+    entries, exits, reasons = [], [], []
+    search_from = 0
+    while True:
+        k = np.searchsorted(entry_candidates, search_from)
+        if k == len(entry_candidates):
+            break
+        entry = entry_candidates[k]
+        exit_ = find_exit(close, entry, next_death, take_profit, stop_loss, intrabar)
+        if exit_ is None:
+            break  # 청산되지 않은 마지막 포지션은 집계하지 않습니다.
+
+        entries.append(entry)
+        exits.append(exit_[0])
+        reasons.append(exit_[1])
+        search_from = exit_[0] + 1
+
+    entry_index = np.array(entries, dtype=np.int64)
+    exit_index = np.array(exits, dtype=np.int64)
+    exit_reason = np.array(reasons, dtype=np.int8)
+    entry_price = close[entry_index]
+    exit_price = exit_prices(close, entry_index, exit_index, exit_reason, take_profit, stop_loss)
+    profit_loss_ratio = (exit_price - entry_price) / entry_price
+    profit_loss_usd = position_size_usd * profit_loss_ratio
+
+    ledger = {
+        'entry_index': entry_index,
+        'exit_index': exit_index,
+        'entry_price': entry_price,
+        'exit_price': exit_price,
+        'profit_loss_ratio': profit_loss_ratio,
+        'profit_loss_usd': profit_loss_usd,
+        'exit_reason': exit_reason,
+    }
+    return ledger, summarize_trades(profit_loss_usd, initial_balance)
+
+
+def run_backtest_chunks(chunks, fast_period=5, slow_period=20, rsi_period=14, rsi_threshold=50.0,
+                        take_profit=0.01, stop_loss=0.005, position_size_usd=10000, initial_balance=10000,
+                        start_index=None):
+    """
+    [timestamp, open, high, low, close, volume] 캔들 배열 청크를 차례로 받아 run_backtest와 같은 전략을 실행합니다.
+    지표와 포지션 상태를 청크 사이에 이어 가므로 전체 히스토리를 메모리에 올리지 않고도 같은 결과를 얻습니다.
+    (거래 장부 {필드: 배열}, 요약 통계 dict) 튜플을 반환하며, 장부의 시각은 타임스탬프(ms)입니다.
+    """
+    start_index = max(slow_period, rsi_period) if start_index is None else start_index
+    fast_state, slow_state, rsi_state = EmaState(fast_period), EmaState(slow_period), RsiState(rsi_period)
+    prev_fast = prev_slow = np.nan
+    offset = 0
+    entry_time = entry_price = None  # 청크 경계를 넘어 보유 중인 포지션
+    ledger = {'entry_time': [], 'exit_time': [], 'entry_price': [], 'exit_price': [], 'exit_reason': []}
+
+    for chunk in chunks:
+        if len(chunk) == 0:
+            continue
+        timestamps = chunk[:, 0].astype(np.int64)
+        high, low, close = chunk[:, 2], chunk[:, 3], chunk[:, 4]
+        fast = fast_state.update_many(timestamps, high, low, close)
+        slow = slow_state.update_many(timestamps, high, low, close)
+        rsi = rsi_state.update_many(timestamps, high, low, close)
+
+        # 직전 청크의 마지막 값을 앞에 붙여 청크 첫 캔들의 교차 여부도 판단합니다.
+        golden, death = crossover_signals(np.concatenate([[prev_fast], fast]), np.concatenate([[prev_slow], slow]))
+        golden, death = golden[1:], death[1:]
+        warmup = max(0, min(len(chunk), start_index - offset))
+        golden[:warmup] = False
+        death[:warmup] = False
+        entries = np.flatnonzero(golden & (rsi >= rsi_threshold))
+        next_death = _next_true_index(death)
+
+        position = 0
+        while True:
+            if entry_price is not None:
+                exit_ = _first_exit(close, position, entry_price, next_death, take_profit, stop_loss)
+                if exit_ is None:
+                    break  # 다음 청크에서 이어서 청산 여부를 확인합니다.
+                exit_index, reason = exit_
+                ledger['entry_time'].append(entry_time)
+                ledger['exit_time'].append(int(timestamps[exit_index]))
+                ledger['entry_price'].append(entry_price)
+                ledger['exit_reason'].append(reason)
+                ledger['exit_price'].append(
+                    entry_price * (1 + take_profit) if reason == EXIT_TAKE_PROFIT
+                    else entry_price * (1 - stop_loss) if reason == EXIT_STOP_LOSS
+                    else float(close[exit_index])
+                )
+                entry_time = entry_price = None
+                position = exit_index + 1
+            else:
+                k = np.searchsorted(entries, position)
+                if k == len(entries):
+                    break
+                entry = entries[k]
+                entry_time, entry_price = int(timestamps[entry]), float(close[entry])
+                position = entry + 1
+
+        prev_fast, prev_slow = fast[-1], slow[-1]
+        offset += len(chunk)
+
+    # 마지막까지 청산되지 않은 포지션은 집계하지 않습니다.
+    entry_price = np.array(ledger['entry_price'], dtype=np.float64)
+    exit_price = np.array(ledger['exit_price'], dtype=np.float64)
+    profit_loss_ratio = (exit_price - entry_price) / entry_price
+    profit_loss_usd = position_size_usd * profit_loss_ratio
+    result = {
+        'entry_time': np.array(ledger['entry_time'], dtype=np.int64),
+        'exit_time': np.array(ledger['exit_time'], dtype=np.int64),
+        'entry_price': entry_price,
+        'exit_price': exit_price,
+        'profit_loss_ratio': profit_loss_ratio,
+        'profit_loss_usd': profit_loss_usd,
+        'exit_reason': np.array(ledger['exit_reason'], dtype=np.int8),
+    }
+    return result, summarize_trades(profit_loss_usd, initial_balance)
+
+
+def summarize_trades(profit_loss_usd, initial_balance=10000):
+    """거래별 손익(USD) 배열로 최종 자본, 승률, 평균 익절/손절 등의 요약 통계를 계산합니다."""
+    pnl = np.asarray(profit_loss_usd, dtype=np.float64)
+    # 잔고는 거래 순서대로 누적해 기존 루프 방식과 같은 부동소수점 결과를 얻습니다.
+    final_balance = float(np.cumsum(np.concatenate([[initial_balance], pnl]))[-1])
+    total_trades = len(pnl)
+    wins = pnl[pnl > 0]
+    losses = pnl[pnl < 0]
+    winning_trades = len(wins)
+    losing_trades = total_trades - winning_trades
+    return {
+        'initial_balance': initial_balance,
+        'final_balance': final_balance,
+        'total_pnl': final_balance - initial_balance,
+        'total_trades': total_trades,
+        'winning_trades': winning_trades,
+        'losing_trades': losing_trades,
+        'win_rate': (winning_trades / total_trades * 100) if total_trades > 0 else 0,
+        'avg_profit': sum(wins.tolist()) / winning_trades if winning_trades > 0 else 0,
+        'avg_loss': sum(losses.tolist()) / losing_trades if losing_trades > 0 else 0,
+    }
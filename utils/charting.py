@@ -2,6 +2,10 @@
 import mplfinance as mpf
 import pandas as pd
 import os
+import threading
+
+# pyplot의 전역 figure 상태는 스레드 안전하지 않으므로, 동시에 실행되는 작업들의 차트 생성을 직렬화합니다.
+_plot_lock = threading.Lock()
 
 def save_chart(
     df,
@@ -23,16 +27,24 @@ def save_chart(
     output_path = os.path.join(output_dir, f"{symbol.replace('/', '_')}.png")
 
     # 차트 생성 및 저장
+    # 임시 파일에 그린 뒤 교체하여, 같은 심볼 차트를 읽는 쪽이 쓰다 만 파일을 보지 않도록 합니다.
+    temp_path = f"{output_path}.{threading.get_ident()}.tmp.png"
     try:
-        mpf.plot(df_chart, 
-                 type='candle', 
-                 style='yahoo',
-                 title=title,
-                 volume=True, 
-                 panel_ratios=(3, 1),
-                 addplot=add_plots,
-                 vlines=dict(vlines=vlines, linewidths=0.5, colors='r', alpha=0.7) if vlines else None,
-                 savefig=dict(fname=output_path, dpi=150, bbox_inches='tight'))
+        with _plot_lock:
+            mpf.plot(df_chart, 
+                     type='candle', 
+                     style='yahoo',
+                     title=title,
+                     volume=True, 
+                     panel_ratios=(3, 1),
+                     addplot=add_plots,
+                     vlines=dict(vlines=vlines, linewidths=0.5, colors='r', alpha=0.7) if vlines else None,
+                     savefig=dict(fname=temp_path, dpi=150, bbox_inches='tight'))
+            os.replace(temp_path, output_path)
         print(f"Chart saved to {output_path}")  # 차트 저장 경로 출력
+        return output_path
     except Exception as e:
         print(f"Error creating chart for {symbol}: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return None
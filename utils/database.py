@@ -1,14 +1,42 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text
+from sqlalchemy import create_engine, event, Column, Integer, String, Float, DateTime, Text, Index, ForeignKey, and_, or_, func, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from datetime import datetime
+from sqlalchemy.orm import sessionmaker, load_only, relationship
+from datetime import datetime, timedelta
+import base64
+import gzip
 import json
+import os
+import re
+
+from utils.config_loader import CONFIG
 
 # SQLite 데이터베이스 파일 경로
 DATABASE_URL = "sqlite:///./screener_results.db"
 
+DATABASE_CONFIG = CONFIG.get("database", {})
+BUSY_TIMEOUT_MS = DATABASE_CONFIG.get("busy_timeout_ms", 30000)  # 다른 프로세스가 쓰는 중일 때 잠금 대기 시간
+CACHE_SIZE_KB = DATABASE_CONFIG.get("cache_size_kb", 16384)
+RETENTION_DAYS = DATABASE_CONFIG.get("retention_days", 90)  # 이보다 오래된 결과의 output_text는 정리 대상
+ARCHIVE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    DATABASE_CONFIG.get("archive_path", os.path.join("data", "archive"))
+)
+
 # SQLAlchemy 엔진 생성
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False, "timeout": BUSY_TIMEOUT_MS / 1000})
+
+# 웹 앱과 Celery 워커가 같은 파일에 동시에 접근하므로 WAL 모드로 읽기와 쓰기가 서로 막지 않게 합니다.
+# WAL에서는 synchronous=NORMAL로도 손상 없이 커밋마다의 fsync를 줄일 수 있습니다.
+@event.listens_for(engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA cache_size=-{int(CACHE_SIZE_KB)}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
 
 # Base 클래스 생성 (모델 정의에 사용)
 Base = declarative_base()
@@ -28,12 +56,226 @@ class ScreenerResult(Base):
     table_headers = Column(Text) # JSON string of list of headers
     table_rows = Column(Text) # JSON string of list of lists of rows
 
+    hits = relationship("ScreenerHit", back_populates="result", cascade="all, delete-orphan")
+
+    # 결과 목록 조회(스크리너별 최신순, 기간 필터)용 인덱스
+    __table_args__ = (
+        Index("ix_screener_results_timestamp_id", "timestamp", "id"),
+        Index("ix_screener_results_name_timestamp_id", "screener_name", "timestamp", "id"),
+    )
+
     def __repr__(self):
         return f"<ScreenerResult(id={self.id}, screener_name='{self.screener_name}', timestamp='{self.timestamp}')>"
 
+# 스크리너 실행 결과에서 발견된 코인 한 개 (실행 × 심볼 한 행)
+# 지표 값을 타입이 있는 컬럼으로 저장해 심볼별 출현 횟수, 지표 평균 같은 통계를 SQL로 바로 계산합니다.
+# 스크리너마다 채우는 컬럼이 다르며, 해당하지 않는 지표는 NULL입니다.
+class ScreenerHit(Base):
+    __tablename__ = "screener_hits"
+
+    id = Column(Integer, primary_key=True)
+    result_id = Column(Integer, ForeignKey("screener_results.id", ondelete="CASCADE"), nullable=False, index=True)
+    screener_name = Column(String, nullable=False) # 조회 편의를 위해 결과 테이블에서 복사
+    timestamp = Column(DateTime, nullable=False)   # 결과 테이블의 실행 시각 복사
+    symbol = Column(String, nullable=False)
+    # 데일리/알트코인 스크리너
+    downtrend = Column(Float)       # ATH 대비 하락률 (%)
+    volatility = Column(Float)      # 30일 변동성 (%)
+    cci = Column(Float)
+    rsi = Column(Float)
+    volume_increase_percentage = Column(Float)
+    max_volume_spike = Column(Float) # 과거 거래량 급증 배수
+    max_spike_date = Column(String)  # 급증일 (MM-DD)
+    # 선물 OI 스크리너
+    price_change_24h = Column(Float)
+    oi_change_24h = Column(Float)
+    oi_change_4h = Column(Float)
+    current_oi_usd = Column(Float)
+    volume_24h_usd = Column(Float)
+    funding_rate = Column(Float)     # (%)
+    long_short_ratio = Column(Float)
+    long_accounts_1h = Column(Float) # 롱 계정 비율 (%)
+
+    result = relationship("ScreenerResult", back_populates="hits")
+
+    __table_args__ = (
+        Index("ix_screener_hits_symbol_timestamp", "symbol", "timestamp"),
+        Index("ix_screener_hits_name_timestamp", "screener_name", "timestamp"),
+    )
+
+    def __repr__(self):
+        return f"<ScreenerHit(result_id={self.result_id}, symbol='{self.symbol}', timestamp='{self.timestamp}')>"
+
+# 스크리너 코인 dict에서 ScreenerHit 컬럼으로 그대로 옮기는 지표 키
+HIT_METRICS = (
+    "downtrend", "volatility", "cci", "rsi", "volume_increase_percentage", "max_volume_spike", "max_spike_date",
+    "price_change_24h", "oi_change_24h", "oi_change_4h", "current_oi_usd", "volume_24h_usd",
+    "funding_rate", "long_short_ratio", "long_accounts_1h",
+)
+
+def attach_hits(result, found_coins):
+    """스크리너가 찾은 코인 dict 목록을 ScreenerHit 행으로 만들어 결과에 연결합니다. (커밋은 호출한 쪽에서)"""
+    result.timestamp = result.timestamp or datetime.now()
+    result.hits = [
+        ScreenerHit(
+            screener_name=result.screener_name,
+            timestamp=result.timestamp,
+            symbol=coin["symbol"],
+            **{key: coin.get(key) for key in HIT_METRICS}
+        )
+        for coin in found_coins
+    ]
+    return result
+
 # 데이터베이스 테이블 생성
-def init_db():
-    Base.metadata.create_all(bind=engine)
+def init_db(bind=None):
+    bind = bind or engine
+    Base.metadata.create_all(bind=bind)
+    # create_all은 이미 있는 테이블에 새 인덱스를 추가하지 않으므로 인덱스는 따로 확인해 생성
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
+# --- 기존 결과 마이그레이션 ---
+# screener_hits 테이블 도입 전에 저장된 결과는 표 행(table_rows)의 문자열에서 지표 값을 복원합니다.
+# 표 헤더 -> ScreenerHit 컬럼 ('과거 거래량 급증'은 "28.6배 (12-03)" 형태로 배수와 날짜를 함께 담고 있음)
+HEADER_COLUMNS = {
+    "종목명": "symbol", "Symbol": "symbol",
+    "ATH대비": "downtrend", "변동성(30일)": "volatility", "현재CCI": "cci", "현재RSI": "rsi",
+    "거래량증가율": "volume_increase_percentage", "과거 거래량 급증": "max_volume_spike",
+    "Price Chg 24H": "price_change_24h", "OI Chg 24H": "oi_change_24h", "OI Chg 4H": "oi_change_4h",
+    "OI (USD)": "current_oi_usd", "Volume 24H (USD)": "volume_24h_usd",
+    "Funding": "funding_rate", "Long %": "long_accounts_1h",
+}
+_NUMBER_PATTERN = re.compile(r"-?\d+(?:\.\d+)?")
+_SPIKE_DATE_PATTERN = re.compile(r"\((\d{2}-\d{2})\)")
+
+def _parse_number(text):
+    """표에 표시된 문자열("-83.7%", "12.5M")에서 숫자를 꺼냅니다. 값이 없으면 None."""
+    match = _NUMBER_PATTERN.search(str(text))
+    if not match:
+        return None
+    value = float(match.group())
+    return value * 1_000_000 if str(text).strip().endswith("M") else value
+
+def hits_from_table(headers, rows):
+    """저장된 표 헤더/행에서 ScreenerHit 컬럼 값 dict 목록을 복원합니다. 모르는 헤더는 건너뜁니다."""
+    hits = []
+    for row in rows:
+        hit = {}
+        for header, cell in zip(headers, row):
+            column = HEADER_COLUMNS.get(header)
+            if column == "symbol":
+                hit[column] = cell
+            elif column == "downtrend":
+                value = _parse_number(cell)
+                hit[column] = abs(value) if value is not None else None # 표에는 "-83.7%"로 표시
+            elif column == "max_volume_spike":
+                hit[column] = _parse_number(cell)
+                date_match = _SPIKE_DATE_PATTERN.search(str(cell))
+                hit["max_spike_date"] = date_match.group(1) if date_match else None
+            elif column:
+                hit[column] = _parse_number(cell)
+        if hit.get("symbol"):
+            hits.append(hit)
+    return hits
+
+# 이전 버전의 데일리 스크리너는 실행마다 같은 결과를 두 번 저장했으므로,
+# 같은 스크리너의 바로 앞 결과와 내용이 같고 이 시간 안에 저장된 결과는 중복으로 보고 옮기지 않습니다.
+DUPLICATE_RESULT_WINDOW = timedelta(minutes=1)
+
+def _is_duplicate_run(result, previous):
+    """previous는 같은 스크리너의 바로 앞 결과의 (timestamp, output_text, table_rows)입니다."""
+    if previous is None:
+        return False
+    timestamp, output_text, table_rows = previous
+    return (
+        result.timestamp - timestamp <= DUPLICATE_RESULT_WINDOW
+        and result.output_text == output_text
+        and result.table_rows == table_rows
+    )
+
+def migrate_screener_hits(db, batch_size=200):
+    """
+    ScreenerHit 행이 없는 기존 결과의 table_rows를 풀어 screener_hits 테이블을 채웁니다.
+    이미 옮긴 결과와 바로 앞 결과의 중복 저장본은 건너뛰므로 여러 번 실행해도 안전합니다.
+    옮긴 결과 수를 반환합니다.
+    """
+    migrated_ids = {result_id for (result_id,) in db.query(ScreenerHit.result_id).distinct()}
+    # 중복 판정에 바로 앞 결과가 필요하므로 이미 옮긴 결과를 포함해 전체를 id 순으로 훑습니다.
+    query = (
+        db.query(ScreenerResult)
+        .options(load_only(ScreenerResult.id, ScreenerResult.screener_name, ScreenerResult.timestamp,
+                           ScreenerResult.output_text, ScreenerResult.table_headers, ScreenerResult.table_rows))
+        .order_by(ScreenerResult.id)
+    )
+    previous_by_screener = {}
+    migrated = 0
+    last_id = 0
+    while True:
+        results = query.filter(ScreenerResult.id > last_id).limit(batch_size).all()
+        if not results:
+            return migrated
+        for result in results:
+            previous = previous_by_screener.get(result.screener_name)
+            previous_by_screener[result.screener_name] = (result.timestamp, result.output_text, result.table_rows)
+            if result.id in migrated_ids or not result.table_rows or result.table_rows == "[]":
+                continue
+            if _is_duplicate_run(result, previous):
+                continue
+            rows = json.loads(result.table_rows)
+            headers = json.loads(result.table_headers) if result.table_headers else []
+            for hit in hits_from_table(headers, rows):
+                db.add(ScreenerHit(result_id=result.id, screener_name=result.screener_name,
+                                   timestamp=result.timestamp, **hit))
+            migrated += 1
+        last_id = results[-1].id
+        db.commit()
+
+# --- 보존 기간 정리 ---
+def prune_results(db, retention_days=RETENTION_DAYS, archive_dir=ARCHIVE_DIR, batch_size=500):
+    """
+    retention_days보다 오래된 결과의 output_text(가장 큰 컬럼)를 비웁니다. 표 데이터와 screener_hits는 유지합니다.
+    archive_dir이 주어지면 지우기 전에 gzip JSONL 파일로 보관합니다. 정리한 결과 수를 반환합니다.
+    """
+    cutoff = datetime.now() - timedelta(days=retention_days)
+    query = (
+        db.query(ScreenerResult)
+        .options(load_only(ScreenerResult.id, ScreenerResult.screener_name, ScreenerResult.timestamp, ScreenerResult.output_text))
+        .filter(ScreenerResult.timestamp < cutoff, ScreenerResult.output_text.is_not(None))
+        .order_by(ScreenerResult.id)
+    )
+    archive_path = None
+    if archive_dir:
+        os.makedirs(archive_dir, exist_ok=True)
+        archive_path = os.path.join(archive_dir, f"screener_results_{datetime.now().strftime('%Y%m%d%H%M%S')}.jsonl.gz")
+    pruned = 0
+    while True:
+        results = query.limit(batch_size).all()
+        if not results:
+            return pruned
+        if archive_path:
+            # 보관 파일에 먼저 기록한 뒤 커밋하므로, 기록에 실패하면 DB의 내용은 그대로 남습니다.
+            with gzip.open(archive_path, "at", encoding="utf-8") as f:
+                for result in results:
+                    f.write(json.dumps({
+                        "id": result.id,
+                        "screener_name": result.screener_name,
+                        "timestamp": result.timestamp.isoformat(),
+                        "output_text": result.output_text,
+                    }, ensure_ascii=False) + "\n")
+        for result in results:
+            result.output_text = None
+        db.commit()
+        pruned += len(results)
+
+def compact_database(bind=None):
+    """WAL 파일을 체크포인트하고 VACUUM으로 정리 후 남은 빈 페이지를 반환합니다."""
+    bind = bind or engine
+    # VACUUM은 트랜잭션 안에서 실행할 수 없으므로 autocommit 연결을 사용
+    with bind.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+        connection.execute(text("VACUUM"))
 
 # 의존성 주입을 위한 함수 (FastAPI에서 사용)
 def get_db():
@@ -41,4 +283,98 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# 결과 목록 조회에서 선택할 수 있는 필드 (JSON 문자열로 저장된 필드는 파싱해서 반환)
+RESULT_FIELDS = ("id", "screener_name", "timestamp", "output_text", "chart_paths", "table_headers", "table_rows")
+JSON_FIELDS = ("chart_paths", "table_headers", "table_rows")
+SUMMARY_FIELDS = ("id", "screener_name", "timestamp")
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(timestamp, result_id):
+    """(timestamp, id) 위치를 불투명한 커서 문자열로 만듭니다."""
+    raw = json.dumps([timestamp.isoformat(), result_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor):
+    """커서 문자열을 (timestamp, id)로 되돌립니다. 형식이 잘못되면 ValueError를 발생시킵니다."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, result_id = json.loads(raw)
+        return datetime.fromisoformat(timestamp), int(result_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"잘못된 커서입니다: {cursor}") from e
+
+def query_screener_results(db, screener_name=None, since=None, until=None, cursor=None, limit=50, fields=None):
+    """
+    스크리너 결과를 최신순으로 한 페이지 조회합니다. (커서 기반 페이지네이션)
+    fields로 필요한 필드만 읽어 오며, (결과 dict 목록, 다음 페이지 커서 또는 None)을 반환합니다.
+    """
+    fields = tuple(fields or RESULT_FIELDS)
+    unknown = [field for field in fields if field not in RESULT_FIELDS]
+    if unknown:
+        raise ValueError(f"알 수 없는 필드: {', '.join(unknown)}")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    # 커서 계산에 필요한 timestamp, id는 항상 읽습니다.
+    columns = {"id", "timestamp", *fields}
+    query = db.query(ScreenerResult).options(
+        load_only(*[getattr(ScreenerResult, name) for name in RESULT_FIELDS if name in columns])
+    )
+    if screener_name:
+        query = query.filter(ScreenerResult.screener_name == screener_name)
+    if since:
+        query = query.filter(ScreenerResult.timestamp >= since)
+    if until:
+        query = query.filter(ScreenerResult.timestamp < until)
+    if cursor:
+        cursor_timestamp, cursor_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            ScreenerResult.timestamp < cursor_timestamp,
+            and_(ScreenerResult.timestamp == cursor_timestamp, ScreenerResult.id < cursor_id),
+        ))
+
+    rows = query.order_by(ScreenerResult.timestamp.desc(), ScreenerResult.id.desc()).limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1].timestamp, rows[limit - 1].id) if len(rows) > limit else None
+
+    items = []
+    for row in rows[:limit]:
+        item = {}
+        for name in fields:
+            value = getattr(row, name)
+            if name in JSON_FIELDS:
+                value = json.loads(value) if value else []
+            item[name] = value
+        items.append(item)
+    return items, next_cursor
+
+# 심볼별 통계로 집계할 지표 컬럼
+STAT_METRICS = ("downtrend", "volatility", "cci", "max_volume_spike", "oi_change_24h", "funding_rate")
+
+def query_hit_stats(db, symbol=None, screener_name=None, since=None, until=None, limit=50):
+    """
+    기간 내 심볼별 발견 횟수, 처음/마지막 발견 시각, 주요 지표 평균을 발견 횟수 순으로 반환합니다.
+    집계는 screener_hits 테이블에서 SQL로 처리합니다.
+    """
+    columns = [
+        ScreenerHit.symbol,
+        func.count(ScreenerHit.id).label("hits"),
+        func.min(ScreenerHit.timestamp).label("first_seen"),
+        func.max(ScreenerHit.timestamp).label("last_seen"),
+    ] + [func.avg(getattr(ScreenerHit, name)).label(f"avg_{name}") for name in STAT_METRICS]
+    query = db.query(*columns)
+    if symbol:
+        query = query.filter(ScreenerHit.symbol == symbol)
+    if screener_name:
+        query = query.filter(ScreenerHit.screener_name == screener_name)
+    if since:
+        query = query.filter(ScreenerHit.timestamp >= since)
+    if until:
+        query = query.filter(ScreenerHit.timestamp < until)
+    rows = (
+        query.group_by(ScreenerHit.symbol)
+        .order_by(func.count(ScreenerHit.id).desc(), ScreenerHit.symbol)
+        .limit(max(1, min(limit, MAX_PAGE_SIZE)))
+        .all()
+    )
+    return [dict(row._mapping) for row in rows]
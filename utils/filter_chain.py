@@ -0,0 +1,194 @@
+import logging
+
+import numpy as np
+
+from utils import panel as price_panel
+
+logger = logging.getLogger(__name__)
+
+# 조건별 상대 비용 (낮을수록 먼저 평가)
+COST_TRIVIAL = 0    # 길이 비교 등 상수 시간
+COST_LATEST = 1     # 마지막 캔들만 참조
+COST_SCAN = 2       # 전체 또는 일부 구간 스캔
+COST_INDICATOR = 10  # 지표 계산 (CCI, RSI 등)
+
+
+class ScreenFilter:
+    """
+    스크리너 조건 하나를 선언합니다.
+
+    predicate(df, metrics)는 통과 시 None, 탈락 시 로그용 사유 문자열을 반환하며,
+    계산한 값은 metrics 딕셔너리에 기록하여 결과 표와 다른 조건에서 재사용합니다.
+    requires에는 평가 전에 준비되어야 할 데이터 이름(예: 'indicators')을 적습니다.
+    vectorized(panel)는 같은 조건을 PricePanel 전체에 적용하여 (통과 마스크, {지표명: 배열})을 반환합니다.
+    """
+
+    def __init__(self, name, predicate, cost=COST_LATEST, requires=(), vectorized=None):
+        self.name = name
+        self.predicate = predicate
+        self.cost = cost
+        self.requires = tuple(requires)
+        self.vectorized = vectorized
+
+    def __repr__(self):
+        return f"<ScreenFilter(name='{self.name}', cost={self.cost}, requires={self.requires})>"
+
+
+class FilterChain:
+    """
+    비용이 낮은 조건부터 평가하고 첫 탈락에서 중단하는 필터 체인입니다.
+    providers의 데이터(예: 지표)는 그것을 요구하는 조건에 도달했을 때 한 번만 계산됩니다.
+    """
+
+    def __init__(self, filters, providers=None):
+        self.providers = providers or {}  # 이름 -> (비용, df를 받아 df를 반환하는 함수)
+        self.filters = sorted(filters, key=self._effective_cost)
+
+    def _effective_cost(self, screen_filter):
+        return screen_filter.cost + sum(self.providers[name][0] for name in screen_filter.requires)
+
+    def evaluate(self, df, symbol=''):
+        """모든 조건을 통과하면 (df, metrics)를, 하나라도 탈락하면 None을 반환합니다."""
+        metrics = {}
+        ready = set()
+        for screen_filter in self.filters:
+            for name in screen_filter.requires:
+                if name not in ready:
+                    df = self.providers[name][1](df)
+                    ready.add(name)
+            reason = screen_filter.predicate(df, metrics)
+            if reason is not None:
+                logger.debug(f"{symbol}: {reason}")
+                return None
+        return df, metrics
+
+    def evaluate_panel(self, panel, panel_providers=None):
+        """
+        PricePanel의 모든 심볼에 조건을 불리언 마스크로 적용합니다.
+        각 조건은 앞선 조건을 통과한 행에 대해서만 계산되며, (통과 마스크, {지표명: 배열})을 반환합니다.
+        panel_providers({이름: 부분 패널을 받아 {지표 컬럼명: 배열}을 반환하는 함수})의 데이터는
+        그것을 요구하는 조건에 도달했을 때 남은 행에 대해서만 한 번 계산해 panel.latest_values에 채웁니다.
+        """
+        panel_providers = panel_providers or {}
+        passed = np.ones(len(panel), dtype=bool)
+        metrics = {}
+        ready = set()
+        for screen_filter in self.filters:
+            rows = np.flatnonzero(passed)
+            if len(rows) == 0:
+                break
+            for name in screen_filter.requires:
+                if name in panel_providers and name not in ready:
+                    for column, values in panel_providers[name](panel.take(rows)).items():
+                        panel.latest_values.setdefault(column, np.full(len(panel), np.nan))[rows] = values
+                    ready.add(name)
+            mask, values = screen_filter.vectorized(panel.take(rows))
+            for key, value in values.items():
+                metrics.setdefault(key, np.full(len(panel), np.nan))[rows] = value
+            passed[rows] = mask
+            logger.debug(f"{screen_filter.name}: {int(mask.sum())}/{len(rows)}개 통과")
+        return passed, metrics
+
+
+# --- 스크리너 공통 조건 ---
+
+def history_filter(min_days):
+    def predicate(df, metrics):
+        if len(df) < min_days:
+            return "OHLCV 데이터 부족 또는 로드 실패."
+    def vectorized(panel):
+        return panel.lengths >= min_days, {}
+    return ScreenFilter('min_history', predicate, cost=COST_TRIVIAL, vectorized=vectorized)
+
+
+def listing_days_filter(max_days):
+    def predicate(df, metrics):
+        if len(df) > max_days:
+            return f"상장일 ({len(df)}일) 기준 미달."
+    def vectorized(panel):
+        return panel.lengths <= max_days, {}
+    return ScreenFilter('max_listing_days', predicate, cost=COST_TRIVIAL, vectorized=vectorized)
+
+
+def daily_volume_filter(min_volume, currency):
+    def predicate(df, metrics):
+        latest = df.iloc[-1]
+        daily_volume = latest['close'] * latest['volume']
+        metrics['daily_volume'] = daily_volume
+        if daily_volume < min_volume:
+            return f"일일 거래량 ({daily_volume:.0f} {currency}) 기준 미달."
+    def vectorized(panel):
+        values = price_panel.daily_volume(panel)
+        return values >= min_volume, {'daily_volume': values}
+    return ScreenFilter('min_daily_volume', predicate, cost=COST_LATEST, vectorized=vectorized)
+
+
+def ath_drawdown_filter(min_downtrend):
+    def predicate(df, metrics):
+        ath = df['high'].max()
+        downtrend = (1 - df['close'].iloc[-1] / ath)
+        metrics['downtrend'] = downtrend
+        if downtrend < min_downtrend:
+            return f"ATH 대비 하락률 ({downtrend:.2f}) 기준 미달."
+    def vectorized(panel):
+        values = price_panel.ath_drawdown(panel)
+        return ~(values < min_downtrend), {'downtrend': values}
+    return ScreenFilter('min_downtrend_from_ath', predicate, cost=COST_SCAN, vectorized=vectorized)
+
+
+def volatility_filter(min_volatility, max_volatility, lookback=30, label='30일 변동성'):
+    def predicate(df, metrics):
+        close = df['close'].iloc[-1]
+        recent_high = df['high'].tail(lookback).max()
+        recent_low = df['low'].tail(lookback).min()
+        volatility = ((recent_high - recent_low) / close) * 100 if close > 0 else 0
+        metrics['volatility'] = volatility
+        if not (min_volatility <= volatility <= max_volatility):
+            return f"{label} ({volatility:.2f}%) 기준 미달."
+    def vectorized(panel):
+        values = price_panel.recent_volatility(panel, lookback)
+        return (min_volatility <= values) & (values <= max_volatility), {'volatility': values}
+    return ScreenFilter('volatility_range', predicate, cost=COST_SCAN, vectorized=vectorized)
+
+
+def cci_filter(min_cci, max_cci, cci_period):
+    def predicate(df, metrics):
+        current_cci = df[f'CCI_{cci_period}_0.015'].iloc[-1]
+        metrics['cci'] = current_cci
+        if not (min_cci <= current_cci <= max_cci):
+            return f"CCI ({current_cci:.2f}) 기준 미달."
+    def vectorized(panel):
+        values = price_panel.latest_cci(panel, cci_period)
+        return (min_cci <= values) & (values <= max_cci), {'cci': values}
+    return ScreenFilter('cci_range', predicate, cost=COST_LATEST, requires=('indicators',), vectorized=vectorized)
+
+
+def rsi_filter(min_value, rsi_period):
+    def predicate(df, metrics):
+        current_rsi = df[f'RSI_{rsi_period}'].iloc[-1]
+        metrics['rsi'] = current_rsi
+        if current_rsi < min_value:
+            return f"RSI ({current_rsi:.2f}) 기준 미달."
+    def vectorized(panel):
+        values = price_panel.latest_rsi(panel, rsi_period)
+        return ~(values < min_value), {'rsi': values}
+    return ScreenFilter('min_rsi', predicate, cost=COST_LATEST, requires=('indicators',), vectorized=vectorized)
+
+
+def volume_increase_filter(min_percentage, compare_period, increase_period):
+    def predicate(df, metrics):
+        if len(df) < compare_period + increase_period:
+            return "거래량 증가 분석을 위한 데이터 부족."
+        recent_avg_volume = df['volume'].tail(increase_period).mean()
+        compare_avg_volume = df['volume'].iloc[-(compare_period + increase_period):-increase_period].mean()
+        if compare_avg_volume <= 0:
+            return "비교 거래량 0으로 거래량 증가 분석 불가."
+        increase = ((recent_avg_volume - compare_avg_volume) / compare_avg_volume) * 100
+        metrics['volume_increase_percentage'] = increase
+        if increase < min_percentage:
+            return f"거래량 증가율 ({increase:.2f}%) 기준 미달."
+    def vectorized(panel):
+        values = price_panel.volume_increase(panel, compare_period, increase_period)
+        enough = panel.lengths >= compare_period + increase_period
+        return enough & (values >= min_percentage), {'volume_increase_percentage': values}
+    return ScreenFilter('min_volume_increase', predicate, cost=COST_SCAN, vectorized=vectorized)
@@ -0,0 +1,93 @@
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.config_loader import CONFIG
+
+# 지표 계산 결과 메모이제이션 캐시 설정 (기본 64MB)
+CACHE_CONFIG = CONFIG.get("indicator_cache", {})
+MAX_CACHE_BYTES = CACHE_CONFIG.get("max_bytes", 64 * 1024 * 1024)
+
+
+def _size_of(value):
+    """캐시 항목의 대략적인 메모리 크기(바이트)."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(_size_of(v) for v in value.values()) + sys.getsizeof(value)
+    if isinstance(value, (tuple, list)):
+        return sum(_size_of(v) for v in value) + sys.getsizeof(value)
+    return sys.getsizeof(value)
+
+
+class IndicatorCache:
+    """
+    메모리 예산이 있는 LRU 캐시입니다.
+    키는 (거래소, 심볼, 타임프레임, 마지막 캔들 타임스탬프, 지표, 파라미터) 튜플을 사용합니다.
+    """
+
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = _size_of(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+    def get_or_compute(self, key, compute):
+        """캐시에 있으면 그 값을, 없으면 compute()를 실행해 저장한 뒤 반환합니다."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+
+def candle_key(exchange_name, symbol, timeframe, df, indicator, params):
+    """
+    캐시 키를 만듭니다. 마지막 캔들 타임스탬프 외에 캔들 수와 마지막 캔들의 고가/저가/종가/거래량을
+    파라미터에 포함하여, 진행 중인 캔들이 갱신되었거나 조회 구간이 달라진 경우 같은 키가 되지 않도록 합니다.
+    (종가가 같아도 고가/저가나 거래량만 바뀌면 CCI 등 값이 달라집니다.)
+    """
+    last = df.iloc[-1]
+    last_timestamp = int(np.datetime64(last['timestamp'], 'ms').astype('int64'))
+    data_fingerprint = (len(df), *(float(last[column]) for column in ('high', 'low', 'close', 'volume')))
+    return (exchange_name, symbol, timeframe, last_timestamp, indicator, tuple(params) + data_fingerprint)
+
+
+# 프로세스 전역 캐시
+INDICATOR_CACHE = IndicatorCache()
@@ -0,0 +1,194 @@
+import sys
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# NumPy 기반 기술적 지표 커널
+# 모든 함수는 1차원 배열(단일 심볼) 또는 2차원 배열(심볼 × 일 패널)을 받아 마지막 축을 시간 축으로 계산합니다.
+# 패널의 앞부분 NaN 패딩은 해당 심볼의 데이터가 시작되기 전 구간으로 취급하며,
+# 결과와 컬럼 이름은 pandas_ta 기본 구현과 일치하도록 맞춥니다.
+
+# 지수 가중 누적 시 decay^-block이 float64 범위를 넘지 않도록 하는 블록 크기 기준 (e^500)
+_MAX_EXPONENT = 500.0
+
+
+def _as_float_array(values):
+    return np.asarray(values, dtype=np.float64)
+
+
+def _first_valid_index(values):
+    """각 행에서 처음으로 NaN이 아닌 위치. 유효 값이 없으면 길이를 반환합니다."""
+    valid = ~np.isnan(values)
+    first = np.argmax(valid, axis=-1)
+    return np.where(valid.any(axis=-1), first, values.shape[-1])
+
+
+def decay_scan(inputs, decay, initial=0.0):
+    """
+    y[t] = decay * y[t-1] + inputs[t] (y[-1] = initial)를 마지막 축에 대해 계산합니다.
+    블록 단위로 decay 거듭제곱과 누적합을 이용해 파이썬 루프 없이 처리하며,
+    initial로 이전 구간의 마지막 값을 넘기면 구간을 나누어 이어서 계산할 수 있습니다.
+    """
+    n = inputs.shape[-1]
+    out = np.empty_like(inputs)
+    if n == 0:
+        return out
+    if decay <= 0:
+        out[...] = inputs
+        return out
+
+    block = n if decay >= 1 else max(1, int(_MAX_EXPONENT / -np.log(decay)))
+    carry = np.broadcast_to(np.asarray(initial, dtype=np.float64), inputs.shape[:-1])
+    for start in range(0, n, block):
+        chunk = inputs[..., start:start + block]
+        k = chunk.shape[-1]
+        powers = decay ** np.arange(k)
+        scaled = np.cumsum(chunk / powers, axis=-1)
+        out[..., start:start + k] = powers * scaled + carry[..., None] * (decay * powers)
+        carry = out[..., start + k - 1]
+    return out
+
+
+def _rolling_windows(values, length):
+    """마지막 축에 대한 (…, n - length + 1, length) 슬라이딩 윈도우 뷰."""
+    return sliding_window_view(values, length, axis=-1)
+
+
+def _rolling_apply(values, length, func):
+    """윈도우별 func(axis=-1) 결과를 원래 길이에 맞춰 앞부분을 NaN으로 채워 반환합니다."""
+    values = _as_float_array(values)
+    result = np.full(values.shape, np.nan)
+    if values.shape[-1] >= length:
+        result[..., length - 1:] = func(_rolling_windows(values, length), axis=-1)
+    return result
+
+
+def _non_zero_range(high, low):
+    """pandas_ta non_zero_range: 범위에 0이 있으면 해당 행 전체에 epsilon을 더합니다."""
+    diff = high - low
+    has_zero = np.any(diff == 0, axis=-1, keepdims=True)
+    return np.where(has_zero, diff + sys.float_info.epsilon, diff)
+
+
+# --- 이동평균 ---
+
+def sma(close, length):
+    """단순 이동평균. 윈도우 안에 NaN이 있으면 NaN입니다. (pandas rolling(length).mean())"""
+    values = _as_float_array(close)
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    zeros = np.zeros(values.shape[:-1] + (1,))
+    sums = np.concatenate([zeros, np.cumsum(filled, axis=-1)], axis=-1)
+    counts = np.concatenate([zeros, np.cumsum(valid, axis=-1)], axis=-1)
+    result = np.full(values.shape, np.nan)
+    if values.shape[-1] >= length:
+        window_sum = sums[..., length:] - sums[..., :-length]
+        window_count = counts[..., length:] - counts[..., :-length]
+        result[..., length - 1:] = np.where(window_count == length, window_sum / length, np.nan)
+    return result
+
+
+def ema(close, length=10):
+    """
+    지수 이동평균 (pandas_ta ema 기본값: 첫 length개 SMA를 시드로 adjust=False EWM).
+    시드는 각 행의 첫 유효 값부터 계산합니다.
+    """
+    values = _as_float_array(close)
+    n = values.shape[-1]
+    alpha = 2.0 / (length + 1)
+    positions = np.arange(n)
+
+    start = _first_valid_index(values)
+    seed_idx = start + length - 1
+    has_seed = seed_idx < n
+    safe_seed_idx = np.where(has_seed, seed_idx, 0)
+
+    filled = np.nan_to_num(values)
+    csum = np.concatenate([np.zeros(values.shape[:-1] + (1,)), np.cumsum(filled, axis=-1)], axis=-1)
+    seed_sum = (np.take_along_axis(csum, np.expand_dims(safe_seed_idx + 1, -1), axis=-1)
+                - np.take_along_axis(csum, np.expand_dims(np.minimum(start, n), -1), axis=-1))
+    seed = seed_sum[..., 0] / length
+
+    before_seed = positions < np.expand_dims(seed_idx, -1)
+    inputs = np.where(before_seed, 0.0, alpha * filled)
+    at_seed = positions == np.expand_dims(np.where(has_seed, seed_idx, -1), -1)
+    inputs = np.where(at_seed, np.expand_dims(seed, -1), inputs)
+
+    result = decay_scan(inputs, 1 - alpha)
+    result[before_seed | ~np.expand_dims(has_seed, -1)] = np.nan
+    return result
+
+
+def rma(close, length=10):
+    """Wilder 이동평균 (pandas_ta rma: alpha=1/length, adjust=True EWM, min_periods=length)."""
+    values = _as_float_array(close)
+    valid = ~np.isnan(values)
+    decay = 1 - 1.0 / length
+    numerator = decay_scan(np.where(valid, values, 0.0), decay)
+    denominator = decay_scan(valid.astype(np.float64), decay)
+    count = np.cumsum(valid, axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count >= length, numerator / denominator, np.nan)
+
+
+# --- 모멘텀 / 변동성 ---
+
+def rsi(close, length=14):
+    """상대강도지수 (pandas_ta rsi, 컬럼명 RSI_{length})."""
+    values = _as_float_array(close)
+    delta = np.full(values.shape, np.nan)
+    delta[..., 1:] = np.diff(values, axis=-1)
+    positive = np.where(delta > 0, delta, np.where(np.isnan(delta), np.nan, 0.0))
+    negative = np.where(delta < 0, -delta, np.where(np.isnan(delta), np.nan, 0.0))
+    positive_avg = rma(positive, length)
+    negative_avg = rma(negative, length)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return 100 * positive_avg / (positive_avg + negative_avg)
+
+
+def cci(high, low, close, length=14, c=0.015):
+    """Commodity Channel Index (pandas_ta cci, 컬럼명 CCI_{length}_{c})."""
+    typical_price = (_as_float_array(high) + _as_float_array(low) + _as_float_array(close)) / 3
+    result = np.full(typical_price.shape, np.nan)
+    if typical_price.shape[-1] < length:
+        return result
+    windows = _rolling_windows(typical_price, length)
+    mean = windows.mean(axis=-1)
+    mad = np.abs(windows - mean[..., None]).mean(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result[..., length - 1:] = (typical_price[..., length - 1:] - mean) / (c * mad)
+    return result
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """MACD (pandas_ta macd). (MACD, 히스토그램, 시그널) 튜플을 반환합니다."""
+    macd_line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(macd_line, signal)
+    return macd_line, macd_line - signal_line, signal_line
+
+
+def bbands(close, length=5, std=2.0):
+    """
+    볼린저 밴드 (pandas_ta bbands: SMA 중심선, ddof=0 표준편차).
+    (하단, 중심, 상단, 밴드폭, %B) 튜플을 반환합니다.
+    """
+    values = _as_float_array(close)
+    mid = sma(values, length)
+    deviation = _rolling_apply(values, length, np.std)
+    lower = mid - std * deviation
+    upper = mid + std * deviation
+    with np.errstate(invalid='ignore', divide='ignore'):
+        bandwidth = 100 * (upper - lower) / mid
+        percent = _non_zero_range(values, lower) / _non_zero_range(upper, lower)
+    return lower, mid, upper, bandwidth, percent
+
+
+def stoch(high, low, close, k=14, d=3, smooth_k=3):
+    """스토캐스틱 (pandas_ta stoch, SMA 평활). (%K, %D) 튜플을 반환합니다."""
+    lowest_low = _rolling_apply(low, k, np.min)
+    highest_high = _rolling_apply(high, k, np.max)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        raw = 100 * (_as_float_array(close) - lowest_low) / _non_zero_range(highest_high, lowest_low)
+    stoch_k = sma(raw, smooth_k)
+    stoch_d = sma(stoch_k, d)
+    return stoch_k, stoch_d
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from utils.config_loader import CONFIG
+from utils.multi_timeframe import timeframe_to_ms
+
+# 웹 요청과 분리해 스크리너를 백그라운드 스레드 풀에서 실행하는 작업 관리자
+# 요청 핸들러는 작업 ID만 즉시 반환하고, 클라이언트는 상태/결과 조회로 진행 상황을 확인합니다.
+# 스크리너는 대부분 거래소 I/O를 기다리므로 프로세스 대신 스레드 풀을 사용합니다.
+
+JOBS_CONFIG = CONFIG.get("jobs", {})
+MAX_WORKERS = JOBS_CONFIG.get("max_workers", 4)
+MAX_FINISHED_JOBS = JOBS_CONFIG.get("max_finished_jobs", 100)  # 보관할 완료 작업 수 (초과 시 오래된 것부터 삭제)
+RESULT_CACHE_ENABLED = JOBS_CONFIG.get("result_cache", True)  # 같은 캔들 구간의 동일 요청은 기존 작업을 재사용
+
+PENDING = 'pending'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+FINISHED_STATES = (COMPLETED, FAILED)
+
+
+def params_hash(params):
+    """파라미터 dict를 키 순서와 무관한 해시 문자열로 만듭니다."""
+    normalized = json.dumps(params or {}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(normalized.encode()).hexdigest()[:16]
+
+
+def latest_closed_candle(timeframe, now_ms=None):
+    """now_ms 시점에 마지막으로 마감된 캔들의 시작 시각(ms, UTC 기준 정렬)을 반환합니다."""
+    timeframe_ms = timeframe_to_ms(timeframe)
+    now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+    return now_ms - now_ms % timeframe_ms - timeframe_ms
+
+
+def result_cache_key(name, params, timeframe, now_ms=None):
+    """
+    (스크리너 이름, 파라미터 해시, 마지막 마감 캔들 시각) 캐시 키를 만듭니다.
+    새 캔들이 마감되면 키가 바뀌므로 이전 구간의 결과는 자동으로 재사용되지 않습니다.
+    """
+    return (name, params_hash(params), latest_closed_candle(timeframe, now_ms))
+
+
+class Job:
+    """백그라운드 작업 하나의 상태와 결과를 보관합니다."""
+
+    def __init__(self, name, params=None):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.params = params or {}
+        self.status = PENDING
+        self.submitted_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "screener_name": self.name,
+            "params": self.params,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """작업을 스레드 풀에 제출하고 ID로 조회할 수 있게 보관합니다."""
+
+    def __init__(self, max_workers=MAX_WORKERS, max_finished_jobs=MAX_FINISHED_JOBS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="screener-job")
+        self._jobs = OrderedDict()
+        self._cached = {}  # 캐시 키 -> 작업 ID
+        self._lock = threading.Lock()
+        self.max_finished_jobs = max_finished_jobs
+
+    def submit(self, name, fn, *args, params=None, **kwargs):
+        """fn(*args, **kwargs)를 백그라운드에서 실행하는 작업을 만들고 바로 반환합니다."""
+        job = Job(name, params)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def submit_once(self, cache_key, name, fn, *args, params=None, **kwargs):
+        """
+        같은 cache_key로 실행 중이거나 완료된 작업이 있으면 새로 실행하지 않고 그 작업을 반환합니다. (single-flight)
+        실패한 작업은 재사용하지 않습니다. (작업, 새로 제출했는지 여부)를 반환합니다.
+        """
+        with self._lock:
+            job = self._jobs.get(self._cached.get(cache_key))
+            if job is not None and job.status != FAILED:
+                return job, False
+            job = Job(name, params)
+            self._jobs[job.id] = job
+            # 이전 캔들 구간의 키는 다시 요청되지 않으므로 같은 (이름, 파라미터)의 키를 교체
+            for key in [key for key in self._cached if key[:-1] == cache_key[:-1]]:
+                del self._cached[key]
+            self._cached[cache_key] = job.id
+            self._prune()
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job, True
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = RUNNING
+        job.started_at = datetime.now()
+        try:
+            job.result = fn(*args, **kwargs)
+            job.status = COMPLETED
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = datetime.now()
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED_STATES]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+        for key in [key for key, job_id in self._cached.items() if job_id not in self._jobs]:
+            del self._cached[key]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self):
+        """최근에 제출된 작업부터 반환합니다."""
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
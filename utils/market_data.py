@@ -1,42 +1,517 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import ccxt
+import ccxt.async_support as ccxt_async
+import numpy as np
 import pandas as pd
-import pandas_ta as ta
 
-def get_active_symbols(exchange_name, base_currency):
-    """거래소에서 지정된 기준 통화의 모든 활성 심볼 목록을 가져옵니다."""
+from utils import indicators, ohlcv_store
+from utils.rate_limiter import rate_share, shared_throttle
+from utils.streaming_indicators import IndicatorSet
+from utils.config_loader import CONFIG
+from utils.indicator_cache import INDICATOR_CACHE, candle_key
+
+# 마켓 메타데이터(load_markets) 캐시 유지 시간 (초)
+MARKETS_CACHE_TTL = 60 * 60
+
+# 프로세스 전역 거래소 클라이언트 레지스트리 (거래소당 하나)
+_exchanges = {}
+_markets_loaded_at = {}
+_registry_lock = threading.Lock()
+_markets_locks = {}
+
+# 비동기 일괄 OHLCV 수집 설정 (동시 요청 수, 거래소별 초당 요청 예산)
+MARKET_DATA_CONFIG = CONFIG.get("market_data", {})
+MAX_CONCURRENCY = MARKET_DATA_CONFIG.get("max_concurrency", 10)
+REQUESTS_PER_SECOND = MARKET_DATA_CONFIG.get("requests_per_second", {"upbit": 8})
+# 거래소별 OHLCV 한 페이지의 최대 캔들 수 (지정하지 않으면 ccxt 기본값, 대개 200)
+PAGE_LIMITS = MARKET_DATA_CONFIG.get("page_limits", {"upbit": 200, "bybit": 1000, "binance": 1000, "binanceusdm": 1500})
+# 사전 필터는 롤링 24시간 거래대금을 보므로 캔들 기준 거래대금과 어긋날 수 있어, 기준의 이 비율까지만 걸러냅니다.
+PRESCREEN_VOLUME_MARGIN = MARKET_DATA_CONFIG.get("prescreen_volume_margin", 0.8)
+
+
+def get_exchange(exchange_name):
+    """거래소별로 공유되는 ccxt 클라이언트를 반환합니다. (HTTP 세션 및 레이트리밋 상태 유지)"""
+    with _registry_lock:
+        exchange = _exchanges.get(exchange_name)
+        if exchange is None:
+            exchange = getattr(ccxt, exchange_name)({'enableRateLimit': True})
+            _exchanges[exchange_name] = exchange
+            _markets_locks[exchange_name] = threading.Lock()
+        return exchange
+
+def load_markets(exchange_name, ttl=MARKETS_CACHE_TTL):
+    """공유 클라이언트의 마켓 정보를 반환하며, TTL이 지난 경우에만 다시 불러옵니다."""
+    exchange = get_exchange(exchange_name)
+    with _markets_locks[exchange_name]:
+        loaded_at = _markets_loaded_at.get(exchange_name)
+        expired = loaded_at is None or (time.monotonic() - loaded_at) >= ttl
+        markets = exchange.load_markets(reload=expired)
+        if expired:
+            _markets_loaded_at[exchange_name] = time.monotonic()
+        return markets
+
+def get_active_symbols(exchange_name, base_currency, market_type=None):
+    """
+    거래소에서 지정된 기준 통화의 모든 활성 심볼 목록을 가져옵니다.
+    market_type('spot', 'swap' 등)이 주어지면 해당 유형의 마켓만 반환합니다.
+    """
     try:
-        exchange = getattr(ccxt, exchange_name)()
-        markets = exchange.load_markets()
+        markets = load_markets(exchange_name)
         return [
             m['symbol'] for m in markets.values() 
             if m['quote'] == base_currency and m.get('active', True)
+            and (market_type is None or m.get('type') == market_type)
         ]
     except Exception as e:
         print(f"Error loading symbols from {exchange_name}: {e}")
         return []
 
-def get_ohlcv(exchange_name, symbol, timeframe='1d', limit=2000):
-    """지정된 심볼의 OHLCV 데이터를 가져옵니다."""
+def get_ticker_volumes(exchange_name, symbols=None):
+    """한 번의 fetch_tickers 호출로 심볼별 24시간 거래대금(quoteVolume)을 가져옵니다."""
+    exchange = get_exchange(exchange_name)
+    tickers = exchange.fetch_tickers(symbols)
+    return {symbol: ticker.get('quoteVolume') for symbol, ticker in tickers.items()}
+
+def prescreen_by_volume(exchange_name, symbols, min_volume, margin=PRESCREEN_VOLUME_MARGIN):
+    """
+    캔들 수집 전에 24시간 거래대금이 min_volume * margin 미만인 심볼을 걸러냅니다.
+    티커의 24시간 거래대금은 일봉 캔들의 거래대금과 집계 구간이 달라, 기준 근처의 심볼을 잘못
+    걸러내지 않도록 margin만큼 여유를 둡니다. 최종 거래대금 조건은 캔들 기준으로 다시 적용됩니다.
+    거래대금 정보가 없는 심볼은 남겨두며, 티커 조회에 실패하면 전체 심볼을 그대로 반환합니다.
+    """
+    try:
+        volumes = get_ticker_volumes(exchange_name, symbols)
+    except Exception as e:
+        print(f"Error fetching tickers from {exchange_name}, skipping pre-screen: {e}")
+        return list(symbols)
+
+    return [
+        symbol for symbol in symbols
+        if volumes.get(symbol) is None or volumes[symbol] >= min_volume * margin
+    ]
+
+def get_ohlcv(exchange_name, symbol, timeframe='1d', limit=2000, use_store=ohlcv_store.STORE_ENABLED):
+    """
+    지정된 심볼의 OHLCV 데이터를 가져옵니다.
+    로컬 저장소가 켜져 있으면 마지막 저장 캔들 이후의 캔들만 받아 병합한 뒤 저장소에서 읽습니다.
+    최근 limit개 중 저장소에 없는 과거 구간은 그 구간만 받아 채우고, 수집 범위를 기록해 다시 받지 않습니다.
+    """
     try:
-        exchange = getattr(ccxt, exchange_name)()
-        ohlcv = exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
-        if not ohlcv:
-            return None
-            
-        df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        return df
+        if not use_store:
+            exchange = get_exchange(exchange_name)
+            return ohlcv_to_dataframe(exchange.fetch_ohlcv(symbol, timeframe, limit=limit))
+
+        stored = ohlcv_store.load_candles(exchange_name, symbol, timeframe)
+        new_candles, coverage = [], None
+        if not ohlcv_store.STORE_OFFLINE:
+            try:
+                exchange = get_exchange(exchange_name)
+                new_candles, coverage = _fetch_missing_candles(exchange, exchange_name, symbol, timeframe, stored, limit)
+            except Exception as e:
+                if stored is None:
+                    raise
+                print(f"Error syncing OHLCV for {symbol}, using stored candles: {e}")
+
+        return _stored_candles_to_dataframe(exchange_name, symbol, timeframe, stored, new_candles, limit, coverage)
     except Exception as e:
         print(f"Error fetching OHLCV for {symbol}: {e}")
         return None
 
-def calculate_indicators(df, cci_period=20, rsi_period=14):
-    """데이터프레임에 기술적 분석 지표를 추가합니다."""
+def _required_since(exchange, timeframe, limit):
+    """최근 limit개 캔들(진행 중인 캔들 포함) 중 가장 오래된 캔들의 시작 시각(ms)을 반환합니다."""
+    timeframe_ms = exchange.parse_timeframe(timeframe) * 1000
+    return (exchange.milliseconds() // timeframe_ms - (limit - 1)) * timeframe_ms
+
+def _backfill_range(stored, coverage, required_since):
+    """
+    최근 limit개를 채우기 위해 더 받아야 하는 과거 구간 (start, end)를 반환합니다. 필요 없으면 None을 반환합니다.
+    상장 시점부터 받아 두었거나(complete) 이미 required_since까지 받아 둔 심볼은 다시 받지 않습니다.
+    """
+    first = int(stored[0, 0])
+    if coverage.get('complete') or first <= required_since:
+        return None
+    if coverage.get('covered_since', first) <= required_since:
+        return None
+    return required_since, first
+
+def _range_coverage(candles, start):
+    """start부터 받은 과거 구간의 수집 범위입니다. start 시점에 캔들이 없으면 상장 이후 전체 이력을 받은 것입니다."""
+    if not candles or candles[0][0] > start:
+        return {'complete': True}
+    return {'covered_since': start}
+
+def _fetch_missing_candles(exchange, exchange_name, symbol, timeframe, stored, limit):
+    """
+    저장소에 없는 캔들(최근 limit개 중 빠진 과거 구간과 마지막 저장 캔들 이후)을 받아 (캔들, 수집 범위)로 반환합니다.
+    """
+    page_limit = min(limit, PAGE_LIMITS.get(exchange_name, limit))
+    required_since = _required_since(exchange, timeframe, limit)
+    if stored is None or len(stored) == 0:
+        latest = exchange.fetch_ohlcv(symbol, timeframe, limit=page_limit)
+        if len(latest) < page_limit:
+            # 한 페이지를 다 채우지 못했으면 상장 이후 전체 이력
+            return latest, {'complete': True}
+        if latest[0][0] <= required_since:
+            return latest, {'covered_since': required_since}
+        older = _fetch_candle_range(exchange, symbol, timeframe, required_since, latest[0][0], page_limit)
+        return older + latest, _range_coverage(older, required_since)
+
+    candles, coverage = [], None
+    backfill = _backfill_range(stored, ohlcv_store.load_coverage(exchange_name, symbol, timeframe), required_since)
+    if backfill:
+        candles = _fetch_candle_range(exchange, symbol, timeframe, *backfill, page_limit)
+        coverage = _range_coverage(candles, backfill[0])
+    candles += _fetch_candles_since(exchange, symbol, timeframe, int(stored[-1, 0]))
+    return candles, coverage
+
+async def _fetch_missing_candles_async(exchange, exchange_name, symbol, timeframe, stored, limit, throttle=None):
+    """_fetch_missing_candles의 비동기 버전입니다. throttle이 있으면 페이지 요청마다 예산을 기다립니다."""
+    page_limit = min(limit, PAGE_LIMITS.get(exchange_name, limit))
+    required_since = _required_since(exchange, timeframe, limit)
+    if stored is None or len(stored) == 0:
+        if throttle:
+            await throttle.wait()
+        latest = await exchange.fetch_ohlcv(symbol, timeframe, limit=page_limit)
+        if len(latest) < page_limit:
+            return latest, {'complete': True}
+        if latest[0][0] <= required_since:
+            return latest, {'covered_since': required_since}
+        older = await _fetch_candle_range_async(exchange, symbol, timeframe, required_since, latest[0][0], page_limit, throttle)
+        return older + latest, _range_coverage(older, required_since)
+
+    candles, coverage = [], None
+    backfill = _backfill_range(stored, ohlcv_store.load_coverage(exchange_name, symbol, timeframe), required_since)
+    if backfill:
+        candles = await _fetch_candle_range_async(exchange, symbol, timeframe, *backfill, page_limit, throttle)
+        coverage = _range_coverage(candles, backfill[0])
+    candles += await _fetch_candles_since_async(exchange, symbol, timeframe, int(stored[-1, 0]), throttle)
+    return candles, coverage
+
+def _fetch_candle_range(exchange, symbol, timeframe, start, end, page_limit):
+    """
+    start(ms)부터 end(ms) 전까지의 캔들을 앞에서부터 페이지 단위로 가져옵니다.
+    상장 전 구간은 빈 페이지가 돌아오므로 한 페이지 길이만큼 건너뛰어 계속 요청합니다.
+    """
+    timeframe_ms = exchange.parse_timeframe(timeframe) * 1000
+    candles = []
+    since = start
+    while since < end:
+        batch = exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=page_limit) or []
+        in_range = [candle for candle in batch if since <= candle[0] < end]
+        if in_range:
+            candles.extend(in_range)
+            since = in_range[-1][0] + timeframe_ms
+        elif batch:
+            break
+        else:
+            since += page_limit * timeframe_ms
+    return candles
+
+async def _fetch_candle_range_async(exchange, symbol, timeframe, start, end, page_limit, throttle=None):
+    """_fetch_candle_range의 비동기 버전입니다. throttle이 있으면 페이지 요청마다 예산을 기다립니다."""
+    timeframe_ms = exchange.parse_timeframe(timeframe) * 1000
+    candles = []
+    since = start
+    while since < end:
+        if throttle:
+            await throttle.wait()
+        batch = await exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=page_limit) or []
+        in_range = [candle for candle in batch if since <= candle[0] < end]
+        if in_range:
+            candles.extend(in_range)
+            since = in_range[-1][0] + timeframe_ms
+        elif batch:
+            break
+        else:
+            since += page_limit * timeframe_ms
+    return candles
+
+def _fetch_candles_since(exchange, symbol, timeframe, since):
+    """since 시점(포함) 이후의 캔들을 현재 진행 중인 캔들까지 페이지 단위로 가져옵니다."""
+    timeframe_ms = exchange.parse_timeframe(timeframe) * 1000
+    current_open = exchange.milliseconds() // timeframe_ms * timeframe_ms
+    candles = []
+    while True:
+        batch = exchange.fetch_ohlcv(symbol, timeframe, since=since)
+        if not batch:
+            break
+        candles.extend(batch)
+        newest = batch[-1][0]
+        if newest >= current_open or newest <= since:
+            break
+        since = newest
+    return candles
+
+async def _fetch_candles_since_async(exchange, symbol, timeframe, since, throttle=None):
+    """_fetch_candles_since의 비동기 버전입니다. throttle이 있으면 페이지 요청마다 예산을 기다립니다."""
+    timeframe_ms = exchange.parse_timeframe(timeframe) * 1000
+    current_open = exchange.milliseconds() // timeframe_ms * timeframe_ms
+    candles = []
+    while True:
+        if throttle:
+            await throttle.wait()
+        batch = await exchange.fetch_ohlcv(symbol, timeframe, since=since)
+        if not batch:
+            break
+        candles.extend(batch)
+        newest = batch[-1][0]
+        if newest >= current_open or newest <= since:
+            break
+        since = newest
+    return candles
+
+def iter_candle_pages(exchange_name, symbol, timeframe, since, until=None):
+    """
+    since(ms)부터 until(ms, 기본값: 현재) 전까지의 캔들을 거래소 페이지 단위로 반환하는 제너레이터입니다.
+    요청 수를 줄이도록 거래소가 허용하는 최대 페이지 크기(PAGE_LIMITS)로 요청합니다.
+    """
+    exchange = get_exchange(exchange_name)
+    until = until or exchange.milliseconds()
+    page_limit = PAGE_LIMITS.get(exchange_name)
+    while since < until:
+        if page_limit:
+            batch = exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=page_limit)
+        else:
+            batch = exchange.fetch_ohlcv(symbol, timeframe, since=since)
+        batch = [candle for candle in batch or [] if candle[0] < until]
+        if not batch:
+            break
+        yield batch
+        newest = batch[-1][0]
+        if newest <= since:
+            break
+        since = newest + 1
+
+def download_candles(exchange_name, symbol, timeframe, since, until=None, segment_size=100_000):
+    """
+    since(ms)부터 until(ms, 기본값: 현재)까지의 캔들을 페이지 단위로 받아 로컬 저장소에 기록합니다.
+    오프라인 재현 백테스트용 아카이브를 만들 때 사용하며, 저장된 총 캔들 수를 반환합니다.
+    받은 페이지는 segment_size개마다 배열로 모아 두었다가, 끝에서 저장소와 한 번만 병합해 기록합니다.
+    """
+    segments = []
+    pending = []
+    for batch in iter_candle_pages(exchange_name, symbol, timeframe, since, until):
+        pending.extend(batch)
+        if len(pending) >= segment_size:
+            # 파이썬 리스트보다 메모리를 적게 쓰도록 구간 단위로 배열로 변환
+            segments.append(np.asarray(pending, dtype=np.float64))
+            pending = []
+    if pending:
+        segments.append(np.asarray(pending, dtype=np.float64))
+    if segments:
+        stored = ohlcv_store.sync_candles(exchange_name, symbol, timeframe, np.concatenate(segments))
+    else:
+        stored = ohlcv_store.load_candles(exchange_name, symbol, timeframe)
+    return 0 if stored is None else len(stored)
+
+def load_candle_range(exchange_name, symbol, timeframe, since, until=None, use_store=ohlcv_store.STORE_ENABLED):
+    """
+    [since, until) 구간(ms)의 캔들을 (N, 6) 배열로 반환합니다.
+    로컬 저장소가 켜져 있으면 저장소에 없는 앞/뒤 구간만 내려받아 기록한 뒤 저장소에서 읽습니다.
+    """
+    if not use_store:
+        pages = iter_candle_pages(exchange_name, symbol, timeframe, since, until)
+        return np.array([candle for page in pages for candle in page], dtype=np.float64).reshape(-1, 6)
+
+    stored = ohlcv_store.load_candles(exchange_name, symbol, timeframe)
+    if not ohlcv_store.STORE_OFFLINE:
+        if stored is None or len(stored) == 0 or stored[0, 0] > since:
+            fetch_from = since
+        else:
+            fetch_from = int(stored[-1, 0])
+        if until is None or fetch_from < until:
+            download_candles(exchange_name, symbol, timeframe, fetch_from, until)
+            stored = ohlcv_store.load_candles(exchange_name, symbol, timeframe)
+    if stored is None:
+        return np.empty((0, 6))
+    first = np.searchsorted(stored[:, 0], since, side='left')
+    last = len(stored) if until is None else np.searchsorted(stored[:, 0], until, side='left')
+    return np.array(stored[first:last])
+
+def _stored_candles_to_dataframe(exchange_name, symbol, timeframe, stored, new_candles, limit, coverage=None):
+    """새 캔들과 수집 범위를 저장소에 병합하고 최근 limit개 캔들을 DataFrame으로 반환합니다."""
+    if new_candles or coverage:
+        candles = ohlcv_store.sync_candles(exchange_name, symbol, timeframe, new_candles, coverage)
+    else:
+        candles = stored
+    if candles is None:
+        return None
+    return ohlcv_to_dataframe(candles[-limit:])
+
+def ohlcv_to_dataframe(ohlcv):
+    """ccxt OHLCV 리스트를 timestamp 컬럼을 가진 DataFrame으로 변환합니다."""
+    if ohlcv is None or len(ohlcv) == 0:
+        return None
+
+    df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    df['timestamp'] = pd.to_datetime(df['timestamp'].astype('int64'), unit='ms')
+    return df
+
+async def fetch_ohlcv_batch_async(
+    exchange_name,
+    symbols,
+    timeframe='1d',
+    limit=2000,
+    max_concurrency=MAX_CONCURRENCY,
+    requests_per_second=None,
+    use_store=ohlcv_store.STORE_ENABLED
+):
+    """
+    여러 심볼의 OHLCV를 하나의 비동기 클라이언트로 동시에 가져옵니다.
+    동시 요청 수는 max_concurrency로, 초당 요청 수는 거래소별 예산으로 제한됩니다.
+    초당 요청 예산은 같은 프로세스에서 동시에 실행되는 다른 작업들과 공유합니다.
+    로컬 저장소가 켜져 있으면 get_ohlcv와 같이 새 캔들만 받아 저장소에 병합합니다.
+    """
+    exchange = getattr(ccxt_async, exchange_name)({'enableRateLimit': True})
+    rps = requests_per_second or REQUESTS_PER_SECOND.get(exchange_name)
+    # 분산 청크 태스크에서는 나눠 받은 예산만 사용
+    throttle = shared_throttle(exchange_name, rps * rate_share()) if rps else None
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch_one(symbol):
+        stored = ohlcv_store.load_candles(exchange_name, symbol, timeframe) if use_store else None
+        if use_store and ohlcv_store.STORE_OFFLINE:
+            return symbol, _stored_candles_to_dataframe(exchange_name, symbol, timeframe, stored, [], limit)
+
+        coverage = None
+        async with semaphore:
+            try:
+                if use_store:
+                    ohlcv, coverage = await _fetch_missing_candles_async(
+                        exchange, exchange_name, symbol, timeframe, stored, limit, throttle
+                    )
+                else:
+                    if throttle:
+                        await throttle.wait()
+                    ohlcv = await exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+            except Exception as e:
+                if stored is None:
+                    print(f"Error fetching OHLCV for {symbol}: {e}")
+                    return symbol, None
+                print(f"Error syncing OHLCV for {symbol}, using stored candles: {e}")
+                ohlcv = []
+
+        if not use_store:
+            return symbol, ohlcv_to_dataframe(ohlcv)
+        try:
+            return symbol, _stored_candles_to_dataframe(exchange_name, symbol, timeframe, stored, ohlcv, limit, coverage)
+        except Exception as e:
+            print(f"Error storing OHLCV for {symbol}: {e}")
+            return symbol, ohlcv_to_dataframe(ohlcv)
+
+    try:
+        results = await asyncio.gather(*(fetch_one(symbol) for symbol in symbols))
+    finally:
+        await exchange.close()
+
+    return {symbol: df for symbol, df in results if df is not None}
+
+def fetch_ohlcv_batch(exchange_name, symbols, timeframe='1d', limit=2000, **kwargs):
+    """fetch_ohlcv_batch_async의 동기 래퍼. {심볼: DataFrame} 딕셔너리를 반환합니다."""
+    coro = fetch_ohlcv_batch_async(exchange_name, symbols, timeframe, limit, **kwargs)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    # 이미 이벤트 루프가 실행 중인 경우 (예: FastAPI 핸들러) 별도 스레드에서 실행
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+def dataframe_to_candles(df):
+    """OHLCV DataFrame을 [timestamp(ms), open, high, low, close, volume] 배열로 변환합니다."""
+    timestamps = df['timestamp'].to_numpy().astype('datetime64[ms]').astype('int64')
+    values = df[['open', 'high', 'low', 'close', 'volume']].to_numpy(dtype=float)
+    return [[int(ts), *row] for ts, row in zip(timestamps, values)]
+
+def update_streaming_indicators(exchange_name, timeframe, frames, specs):
+    """
+    심볼별로 저장된 스트리밍 지표 상태를 새로 들어온 캔들만큼만 전진시키고 저장합니다.
+    specs는 {컬럼명: (종류, 기간)} 형태이며, {심볼: {컬럼명: 최신 값}}을 반환합니다.
+    로컬 저장소를 사용하지 않으면 빈 딕셔너리를 반환합니다. (호출 측에서 직접 계산)
+    """
+    latest = {}
+    if not ohlcv_store.STORE_ENABLED:
+        return latest
+    spec_params = tuple(sorted((name, kind, length) for name, (kind, length) in specs.items()))
+    state_key = hashlib.sha1(json.dumps(spec_params).encode()).hexdigest()[:12]
+    for symbol, df in frames.items():
+        if df is None or len(df) == 0:
+            continue
+        try:
+            # 같은 캔들 데이터로 이미 갱신한 적이 있으면 상태 파일을 읽지 않고 캐시된 값을 사용
+            key = candle_key(exchange_name, symbol, timeframe, df, 'streaming', spec_params)
+            cached = INDICATOR_CACHE.get(key)
+            if cached is not None:
+                latest[symbol] = dict(cached)
+                continue
+
+            # 상태 파일은 지표 구성별로 따로 두고, 읽고 갱신해 저장하는 동안 잠가 동시 실행 간 갱신 유실을 막습니다.
+            with ohlcv_store.state_lock(exchange_name, symbol, timeframe, state_key):
+                saved = ohlcv_store.load_indicator_state(exchange_name, symbol, timeframe, state_key)
+                indicator_set = IndicatorSet.from_dict(saved, specs) if saved else None
+                if indicator_set is None:
+                    indicator_set = IndicatorSet(specs)
+                # 상태가 마지막으로 적용한 캔들부터만 변환하여 적용 (이어지지 않으면 전체 재계산)
+                timestamps = df['timestamp'].to_numpy().astype('datetime64[ms]').astype('int64')
+                start = 0
+                last = indicator_set.last_timestamp
+                if last is not None:
+                    idx = int(np.searchsorted(timestamps, last))
+                    if idx < len(timestamps) and timestamps[idx] == last:
+                        start = idx
+                latest[symbol] = indicator_set.sync(dataframe_to_candles(df.iloc[start:]))
+                ohlcv_store.save_indicator_state(exchange_name, symbol, timeframe, indicator_set.to_dict(), state_key)
+            INDICATOR_CACHE.put(key, dict(latest[symbol]))
+        except Exception as e:
+            print(f"Error updating streaming indicators for {symbol}: {e}")
+    return latest
+
+def streaming_indicator_provider(exchange_name, timeframe, frames, specs):
+    """
+    FilterChain.evaluate_panel의 panel_providers로 넘길 함수를 반환합니다.
+    지표 조건에 도달한 부분 패널의 심볼에 대해서만 update_streaming_indicators를 실행하므로,
+    값싼 조건에서 탈락한 심볼은 상태 파일을 읽고 쓰지 않습니다.
+    로컬 저장소를 사용하지 않으면 빈 딕셔너리를 반환해 패널에서 직접 계산하도록 둡니다.
+    """
+    def provide(panel):
+        latest = update_streaming_indicators(
+            exchange_name, timeframe, {symbol: frames[symbol] for symbol in panel.symbols}, specs
+        )
+        if not latest:
+            return {}
+        return {
+            name: np.array([(latest.get(symbol) or {}).get(name, np.nan) for symbol in panel.symbols], dtype=np.float64)
+            for name in specs
+        }
+    return provide
+
+def calculate_indicators(df, cci_period=20, rsi_period=14, cache_key=None):
+    """
+    데이터프레임에 기술적 분석 지표를 추가합니다. (컬럼명은 pandas_ta와 동일)
+    cache_key로 (거래소, 심볼, 타임프레임)을 넘기면 같은 캔들에 대한 반복 계산을 캐시에서 가져옵니다.
+    """
     if df is None:
         return None
     
-    df.ta.cci(length=cci_period, append=True)
-    df.ta.rsi(length=rsi_period, append=True)
+    high = df['high'].to_numpy(dtype=float)
+    low = df['low'].to_numpy(dtype=float)
+    close = df['close'].to_numpy(dtype=float)
+    columns = {
+        f'CCI_{cci_period}_0.015': ('cci', (cci_period,), lambda: indicators.cci(high, low, close, cci_period)),
+        f'RSI_{rsi_period}': ('rsi', (rsi_period,), lambda: indicators.rsi(close, rsi_period)),
+    }
+    for column, (indicator, params, compute) in columns.items():
+        if cache_key is None or len(df) == 0:
+            df[column] = compute()
+        else:
+            key = candle_key(*cache_key, df, indicator, params)
+            df[column] = INDICATOR_CACHE.get_or_compute(key, compute).copy()
     # 추후 다른 지표들도 이곳에 추가할 수 있습니다.
     return df
@@ -0,0 +1,164 @@
+import threading
+
+import ccxt
+import numpy as np
+
+from utils import market_data, ohlcv_store
+from utils.config_loader import CONFIG
+
+# 기준 타임프레임 캔들을 리샘플링해 상위 타임프레임 캔들을 만드는 멀티 타임프레임 빌더
+# 상위 타임프레임을 각각 받지 않고 기준 타임프레임만 받아 같은 캔들에서 파생하므로
+# API 호출 수가 줄고 타임프레임 간 캔들이 항상 서로 일치합니다.
+# 버킷은 UTC 기준으로 정렬하므로 분/시간/일 단위 타임프레임만 지원합니다. (주/월 제외)
+
+MTF_CONFIG = CONFIG.get("multi_timeframe", {})
+# 기준 타임프레임 하나가 담당할 수 있는 최대 배율 (예: 24이면 1h 캔들로 1d까지 생성)
+# 배율이 클수록 호출 수는 줄지만 첫 수집 시 받아야 할 기준 캔들이 많아집니다.
+MAX_RESAMPLE_RATIO = MTF_CONFIG.get("max_resample_ratio", 24)
+
+_builders = {}
+_builders_lock = threading.Lock()
+
+
+def timeframe_to_ms(timeframe):
+    """'15m', '4h', '1d' 등의 타임프레임을 밀리초로 변환합니다."""
+    if timeframe[-1] not in ('m', 'h', 'd'):
+        raise ValueError(f"리샘플링을 지원하지 않는 타임프레임입니다: {timeframe}")
+    return ccxt.Exchange.parse_timeframe(timeframe) * 1000
+
+
+def plan_base_timeframes(timeframes, max_ratio=MAX_RESAMPLE_RATIO):
+    """
+    요청한 타임프레임들을 {기준 타임프레임: [파생 타임프레임, ...]}으로 묶습니다.
+    짧은 타임프레임부터 기준으로 삼고, 기준의 정수배이면서 배율이 max_ratio 이하인 타임프레임을 함께 담당합니다.
+
+    첫 수집(저장소와 메모리가 비어 있을 때)에는 기준마다 bars × (가장 긴 파생 타임프레임 / 기준) 개의
+    기준 캔들을 받아야 합니다. 예를 들어 1d~1m, bars=200이면 1m 기준(~15m)은 3000개, 1h 기준(~1d)은
+    4800개로, 바이비트의 페이지 크기(1000)로 각각 3회, 5회 요청합니다. 이후 실행은 마지막 캔들 이후분만 받습니다.
+    """
+    plan = {}
+    for timeframe in sorted(set(timeframes), key=timeframe_to_ms):
+        target_ms = timeframe_to_ms(timeframe)
+        for base, targets in plan.items():
+            base_ms = timeframe_to_ms(base)
+            if target_ms % base_ms == 0 and target_ms // base_ms <= max_ratio:
+                targets.append(timeframe)
+                break
+        else:
+            plan[timeframe] = [timeframe]
+    return plan
+
+
+def resample_candles(candles, timeframe):
+    """
+    [timestamp, open, high, low, close, volume] 배열을 timeframe 버킷으로 집계합니다.
+    시가는 첫 캔들, 고가/저가는 최대/최소, 종가는 마지막 캔들, 거래량은 합계이며 진행 중인 마지막 버킷도 포함합니다.
+    """
+    candles = np.asarray(candles, dtype=np.float64).reshape(-1, ohlcv_store.OHLCV_COLUMNS)
+    if len(candles) == 0:
+        return candles.copy()
+    timeframe_ms = timeframe_to_ms(timeframe)
+    buckets = candles[:, 0].astype(np.int64) // timeframe_ms * timeframe_ms
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(candles)] - 1
+    return np.column_stack([
+        buckets[starts],
+        candles[starts, 1],
+        np.maximum.reduceat(candles[:, 2], starts),
+        np.minimum.reduceat(candles[:, 3], starts),
+        candles[ends, 4],
+        np.add.reduceat(candles[:, 5], starts),
+    ])
+
+
+class MultiTimeframeCandles:
+    """
+    한 기준 타임프레임의 캔들과 그로부터 파생한 상위 타임프레임 캔들을 보관합니다.
+    새 기준 캔들이 들어오면 영향을 받는 버킷(보통 마지막 버킷)부터만 다시 집계합니다.
+    """
+
+    def __init__(self, base_timeframe, timeframes, bars=200):
+        self.base_timeframe = base_timeframe
+        self.timeframes = list(timeframes)
+        self.bars = bars
+        self.base_ms = timeframe_to_ms(base_timeframe)
+        self.max_ratio = max(timeframe_to_ms(tf) for tf in self.timeframes) // self.base_ms
+        self.base = np.empty((0, ohlcv_store.OHLCV_COLUMNS))
+        self.covered_since = None  # 거래소에서 빠짐없이 받아 둔 구간의 시작 시각(ms)
+        self.candles = {tf: np.empty((0, ohlcv_store.OHLCV_COLUMNS)) for tf in self.timeframes}
+
+    @property
+    def last_timestamp(self):
+        return ohlcv_store.last_timestamp(self.base)
+
+    def required_since(self, now_ms):
+        """모든 타임프레임에서 bars개 캔들을 채우는 데 필요한 첫 기준 캔들 시각(ms)."""
+        span_ms = self.bars * self.max_ratio * self.base_ms
+        return (now_ms - span_ms) // (self.max_ratio * self.base_ms) * (self.max_ratio * self.base_ms)
+
+    def update(self, new_candles):
+        """새 기준 캔들을 병합하고 파생 타임프레임 캔들을 갱신합니다."""
+        new_candles = np.asarray(new_candles, dtype=np.float64).reshape(-1, ohlcv_store.OHLCV_COLUMNS)
+        if len(new_candles) == 0:
+            return
+        first_new = int(new_candles[:, 0].min())
+        self.base = ohlcv_store.merge_candles(self.base, new_candles)[-self.bars * self.max_ratio:]
+
+        for timeframe in self.timeframes:
+            timeframe_ms = timeframe_to_ms(timeframe)
+            # 새 캔들이 속한 버킷 이전의 집계 결과는 그대로 두고 이후만 다시 집계합니다.
+            bucket_start = first_new // timeframe_ms * timeframe_ms
+            kept = self.candles[timeframe]
+            kept = kept[kept[:, 0] < bucket_start]
+            rebuilt = resample_candles(self.base[self.base[:, 0] >= bucket_start], timeframe)
+            self.candles[timeframe] = np.concatenate([kept, rebuilt])[-self.bars:]
+
+
+def _get_builder(exchange_name, symbol, base_timeframe, timeframes, bars):
+    key = (exchange_name, symbol, base_timeframe)
+    with _builders_lock:
+        builder = _builders.get(key)
+        if builder is None or builder.timeframes != list(timeframes) or builder.bars != bars:
+            builder = MultiTimeframeCandles(base_timeframe, timeframes, bars)
+            _builders[key] = builder
+        return builder
+
+
+def build_multi_timeframe(exchange_name, symbol, timeframes, bars=200, use_store=ohlcv_store.STORE_ENABLED):
+    """
+    타임프레임별 최근 bars개 캔들을 {타임프레임: DataFrame}으로 반환합니다.
+    기준 타임프레임만 거래소에서 받아(로컬 저장소가 켜져 있으면 마지막 캔들 이후분만) 리샘플링합니다.
+    """
+    frames = {}
+    for base_timeframe, targets in plan_base_timeframes(timeframes).items():
+        builder = _get_builder(exchange_name, symbol, base_timeframe, targets, bars)
+        now_ms = market_data.get_exchange(exchange_name).milliseconds()
+        required_since = builder.required_since(now_ms)
+
+        if builder.last_timestamp is None and use_store:
+            stored = ohlcv_store.load_candles(exchange_name, symbol, base_timeframe)
+            if stored is not None and len(stored):
+                window = stored[np.searchsorted(stored[:, 0], required_since):]
+                if len(window):
+                    builder.update(window)
+                    # 저장소에 빠진 캔들이 있으면 마지막 빈 구간 이후만 받아 둔 구간으로 인정합니다.
+                    gaps = np.flatnonzero(np.diff(window[:, 0]) != builder.base_ms)
+                    builder.covered_since = int(window[gaps[-1] + 1, 0] if len(gaps) else window[0, 0])
+
+        # 필요한 구간을 아직 받은 적이 없으면 처음부터, 아니면 마지막(진행 중) 캔들부터 받습니다.
+        if builder.covered_since is None or builder.covered_since > required_since:
+            since = required_since
+        else:
+            since = builder.last_timestamp or required_since
+        if not (use_store and ohlcv_store.STORE_OFFLINE):
+            new_candles = [candle for page in market_data.iter_candle_pages(exchange_name, symbol, base_timeframe, since)
+                           for candle in page]
+            builder.covered_since = min(since, builder.covered_since or since)
+            if new_candles:
+                if use_store:
+                    ohlcv_store.sync_candles(exchange_name, symbol, base_timeframe, new_candles)
+                builder.update(new_candles)
+
+        for timeframe in targets:
+            frames[timeframe] = market_data.ohlcv_to_dataframe(builder.candles[timeframe])
+    return frames
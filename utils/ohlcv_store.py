@@ -0,0 +1,237 @@
+import json
+import os
+import re
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 스레드 잠금만 사용
+    fcntl = None
+
+from utils.config_loader import CONFIG
+
+# (거래소, 심볼, 타임프레임)별 캔들을 .npy 파일로 저장하는 로컬 OHLCV 저장소
+# 각 파일은 [timestamp(ms), open, high, low, close, volume] 형태의 (N, 6) float64 배열입니다.
+STORE_CONFIG = CONFIG.get("ohlcv_store", {})
+STORE_ENABLED = STORE_CONFIG.get("enabled", True)
+STORE_OFFLINE = STORE_CONFIG.get("offline", False)  # True이면 네트워크 없이 저장된 캔들만 사용
+STORE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    STORE_CONFIG.get("path", os.path.join("data", "ohlcv"))
+)
+
+OHLCV_COLUMNS = 6
+
+_file_locks = {}
+_file_locks_guard = threading.Lock()
+
+
+@contextmanager
+def file_lock(path):
+    """
+    path 단위 배타 잠금. 같은 프로세스의 스레드는 threading.Lock으로, 다른 프로세스(Celery prefork 워커,
+    ProcessPoolExecutor 자식)는 옆의 path.lock 파일에 대한 fcntl 잠금으로 서로 배제합니다.
+    파일을 읽고 병합해 다시 쓰는 동안 잡아 동시 작성자 간 갱신 유실을 막습니다. (재진입 불가)
+    """
+    with _file_locks_guard:
+        lock = _file_locks.setdefault(path, threading.Lock())
+    with lock:
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.lock", 'a') as handle:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def atomic_write(path, write):
+    """
+    write(f)로 같은 디렉터리의 고유한 임시 파일(mkstemp)에 쓴 뒤 path로 교체합니다.
+    임시 파일 이름이 프로세스마다 달라 여러 프로세스가 동시에 써도 서로의 임시 파일을 덮어쓰지 않습니다.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_array(path, mmap=True, label=''):
+    """path의 .npy 배열을 반환합니다. 파일이 없거나 읽을 수 없으면 None을 반환합니다."""
+    if not os.path.exists(path):
+        return None
+    try:
+        return np.load(path, mmap_mode='r' if mmap else None)
+    except (OSError, ValueError) as e:
+        print(f"Error loading stored array {label or path}: {e}")
+        return None
+
+
+def save_array(path, array):
+    """float64 배열을 path에 원자적으로 저장합니다."""
+    atomic_write(path, lambda f: np.save(f, np.ascontiguousarray(array, dtype=np.float64)))
+
+
+def _merge_into(path, new, columns, label):
+    stored = load_array(path, mmap=False, label=label)
+    merged = merge_candles(stored, new, columns=columns)
+    if len(new):
+        save_array(path, merged)
+    return merged
+
+
+def sync_array(path, new, columns=OHLCV_COLUMNS, label=''):
+    """
+    path의 배열에 new 행을 타임스탬프 기준으로 병합해 저장하고, 병합된 배열을 반환합니다.
+    읽기 → 병합 → 교체 전체를 file_lock 아래에서 수행하므로 동시에 동기화하는 작성자의 행을 잃지 않습니다.
+    """
+    new = np.asarray(new, dtype=np.float64).reshape(-1, columns)
+    with file_lock(path):
+        return _merge_into(path, new, columns, label)
+
+
+def _candle_path(exchange_name, symbol, timeframe):
+    """저장소 내 캔들 파일 경로를 반환합니다. (예: data/ohlcv/upbit/1d/BTC_KRW.npy)"""
+    safe_symbol = re.sub(r'[^A-Za-z0-9_.-]', '_', symbol)
+    return os.path.join(STORE_DIR, exchange_name, timeframe, f"{safe_symbol}.npy")
+
+
+def load_candles(exchange_name, symbol, timeframe, mmap=True):
+    """저장된 캔들 배열을 반환합니다. 저장된 데이터가 없으면 None을 반환합니다."""
+    return load_array(_candle_path(exchange_name, symbol, timeframe), mmap, label=f"candles for {symbol}")
+
+
+def last_timestamp(candles):
+    """캔들 배열의 마지막 타임스탬프(ms)를 반환합니다."""
+    if candles is None or len(candles) == 0:
+        return None
+    return int(candles[-1, 0])
+
+
+def merge_candles(stored, new, columns=OHLCV_COLUMNS):
+    """
+    저장된 캔들과 새로 받은 캔들을 타임스탬프 기준으로 병합합니다.
+    같은 타임스탬프는 새 캔들로 덮어씁니다. (마지막 미완성 캔들 갱신)
+    첫 열이 타임스탬프인 다른 시계열(예: 미결제약정)도 columns를 지정해 병합할 수 있습니다.
+    """
+    new = np.asarray(new, dtype=np.float64).reshape(-1, columns)
+    if stored is None or len(stored) == 0:
+        merged = new
+    elif len(new) == 0:
+        return np.asarray(stored)
+    else:
+        merged = np.concatenate([np.asarray(stored), new])
+
+    # 역순으로 unique를 취해 중복 타임스탬프 중 가장 나중에 들어온 행을 남깁니다.
+    reversed_rows = merged[::-1]
+    _, first_idx = np.unique(reversed_rows[:, 0], return_index=True)
+    return reversed_rows[first_idx]
+
+
+def save_candles(exchange_name, symbol, timeframe, candles):
+    """캔들 배열을 원자적으로(임시 파일 후 교체) 저장합니다."""
+    save_array(_candle_path(exchange_name, symbol, timeframe), candles)
+
+
+def _coverage_path(exchange_name, symbol, timeframe):
+    """캔들 파일 옆에 저장되는 수집 범위 파일 경로 (예: BTC_KRW.coverage.json)."""
+    return _candle_path(exchange_name, symbol, timeframe)[:-len('.npy')] + '.coverage.json'
+
+
+def load_coverage(exchange_name, symbol, timeframe):
+    """
+    저장된 캔들의 수집 범위를 반환합니다. 기록이 없으면 빈 dict를 반환합니다.
+    covered_since: 이 시각(ms)부터 마지막 저장 캔들까지는 거래소의 캔들을 빠짐없이 받아 두었음
+    complete: 거래소가 가진 첫 캔들(상장 시점)부터 저장되어 있어 더 과거 구간을 받을 필요가 없음
+    """
+    path = _coverage_path(exchange_name, symbol, timeframe)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error loading candle coverage for {symbol}: {e}")
+        return {}
+
+
+def sync_candles(exchange_name, symbol, timeframe, new, coverage=None):
+    """
+    새 캔들을 저장된 캔들에 병합하여 저장하고, 병합된 배열을 반환합니다. (파일 잠금 아래에서 수행)
+    coverage({'covered_since': ms} 또는 {'complete': True})를 주면 같은 잠금 안에서 수집 범위 기록에 합칩니다.
+    """
+    path = _candle_path(exchange_name, symbol, timeframe)
+    new = np.asarray(new, dtype=np.float64).reshape(-1, OHLCV_COLUMNS)
+    with file_lock(path):
+        merged = _merge_into(path, new, OHLCV_COLUMNS, f"candles for {symbol}")
+        if coverage:
+            saved = load_coverage(exchange_name, symbol, timeframe)
+            if coverage.get('complete'):
+                saved['complete'] = True
+            if coverage.get('covered_since') is not None:
+                saved['covered_since'] = min(coverage['covered_since'], saved.get('covered_since', coverage['covered_since']))
+            atomic_write(_coverage_path(exchange_name, symbol, timeframe),
+                         lambda f: f.write(json.dumps(saved).encode('utf-8')))
+    return merged
+
+
+def iter_candles(exchange_name, symbol, timeframe, start=None, end=None, chunk_size=100_000):
+    """
+    저장된 캔들 중 [start, end) 구간(ms)을 chunk_size개씩 나누어 반환하는 제너레이터입니다.
+    파일은 메모리 맵으로 열고 청크만 복사하므로, 긴 히스토리도 메모리 사용량이 청크 크기로 유지됩니다.
+    """
+    candles = load_candles(exchange_name, symbol, timeframe, mmap=True)
+    if candles is None or len(candles) == 0:
+        return
+    timestamps = candles[:, 0]
+    first = 0 if start is None else int(np.searchsorted(timestamps, start, side='left'))
+    last = len(candles) if end is None else int(np.searchsorted(timestamps, end, side='left'))
+    for offset in range(first, last, chunk_size):
+        yield np.array(candles[offset:min(offset + chunk_size, last)])
+
+
+def _state_path(exchange_name, symbol, timeframe, state_key=None):
+    """
+    캔들 파일 옆에 저장되는 스트리밍 지표 상태 파일 경로 (예: BTC_KRW.state.json).
+    state_key를 주면 지표 구성마다 다른 파일을 씁니다. (예: BTC_KRW.3f2a9c1e7b4d.state.json)
+    """
+    base = _candle_path(exchange_name, symbol, timeframe)[:-len('.npy')]
+    return f"{base}.{state_key}.state.json" if state_key else f"{base}.state.json"
+
+
+def state_lock(exchange_name, symbol, timeframe, state_key=None):
+    """상태 파일별 잠금. 상태를 읽고 갱신해 다시 저장하는 동안 잡아 동시 실행 간 갱신 유실을 막습니다."""
+    return file_lock(_state_path(exchange_name, symbol, timeframe, state_key))
+
+
+def load_indicator_state(exchange_name, symbol, timeframe, state_key=None):
+    """저장된 스트리밍 지표 상태(dict)를 반환합니다. 없거나 손상되었으면 None을 반환합니다."""
+    path = _state_path(exchange_name, symbol, timeframe, state_key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error loading indicator state for {symbol}: {e}")
+        return None
+
+
+def save_indicator_state(exchange_name, symbol, timeframe, state, state_key=None):
+    """스트리밍 지표 상태(dict)를 원자적으로 저장합니다."""
+    path = _state_path(exchange_name, symbol, timeframe, state_key)
+    atomic_write(path, lambda f: f.write(json.dumps(state).encode('utf-8')))
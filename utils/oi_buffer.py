@@ -0,0 +1,76 @@
+import numpy as np
+
+# 심볼별 미결제약정(OI)/가격 샘플을 고정 크기 링 버퍼로 보관합니다.
+# 상시 모니터는 매 주기 최신 샘플 하나만 받아 추가하고, 4시간/24시간 변화율은
+# 버퍼 안에서 바로 계산하므로 주기당 작업량이 심볼 수에만 비례합니다.
+
+SAMPLE_COLUMNS = 3  # timestamp(ms), oi_usd, price
+
+
+class OpenInterestBuffer:
+    """
+    시간순 (timestamp, oi_usd, price) 샘플을 최대 capacity개 보관하는 링 버퍼입니다.
+    마지막 샘플과 같은 타임스탬프는 덮어쓰고(진행 중인 구간 갱신), 더 과거의 샘플은 무시합니다.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._samples = np.full((capacity, SAMPLE_COLUMNS), np.nan)
+        self._head = 0  # 다음에 쓸 위치
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def last_timestamp(self):
+        if self.count == 0:
+            return None
+        return int(self._samples[(self._head - 1) % self.capacity, 0])
+
+    def append(self, timestamp, oi_usd, price=np.nan):
+        """샘플 하나를 추가합니다. 추가(또는 덮어쓰기)했으면 True를 반환합니다."""
+        last = self.last_timestamp
+        if last is not None and timestamp < last:
+            return False
+        if last is not None and timestamp == last:
+            index = (self._head - 1) % self.capacity
+        else:
+            index = self._head
+            self._head = (self._head + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+        self._samples[index] = (timestamp, oi_usd, price)
+        return True
+
+    def extend(self, samples):
+        for timestamp, oi_usd, price in samples:
+            self.append(timestamp, oi_usd, price)
+
+    def samples(self):
+        """보관 중인 샘플을 시간순 (n, 3) 배열로 반환합니다."""
+        if self.count < self.capacity:
+            return self._samples[:self.count].copy()
+        return np.roll(self._samples, -self._head, axis=0)
+
+    def latest(self):
+        if self.count == 0:
+            return None
+        return self._samples[(self._head - 1) % self.capacity].copy()
+
+    def value_at(self, timestamp, column=1):
+        """timestamp 시점(또는 그 이전 가장 가까운 샘플)의 값을 반환합니다. 버퍼보다 과거면 None."""
+        samples = self.samples()
+        position = np.searchsorted(samples[:, 0], timestamp, side='right') - 1
+        if position < 0:
+            return None
+        return float(samples[position, column])
+
+    def change(self, window_ms, column=1):
+        """최신 샘플 대비 window_ms 전 값의 변화율(%)을 반환합니다. 기간을 채우지 못하면 None."""
+        latest = self.latest()
+        if latest is None:
+            return None
+        past = self.value_at(latest[0] - window_ms, column)
+        if past is None or np.isnan(past):
+            return None
+        return (latest[column] - past) / past * 100 if past else 0.0
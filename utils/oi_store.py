@@ -0,0 +1,82 @@
+import os
+import re
+
+import numpy as np
+
+from utils import ohlcv_store
+from utils.config_loader import CONFIG
+
+# (거래소, 심볼, 타임프레임)별 미결제약정(OI) 히스토리를 .npy 파일로 보관하는 로컬 아카이브
+# 각 파일은 [timestamp(ms), open_interest_amount, open_interest_value(USD)] 형태의 (N, 3) float64 배열이며
+# 타임스탬프 순으로 정렬되어 있어 구간 조회는 이진 탐색(searchsorted)으로 처리합니다.
+# 거래소 API는 최근 구간만 제공하므로, 동기화 때마다 마지막 샘플 이후분만 받아 뒤에 이어 붙입니다.
+STORE_CONFIG = CONFIG.get("oi_store", {})
+STORE_ENABLED = STORE_CONFIG.get("enabled", True)
+STORE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    STORE_CONFIG.get("path", os.path.join("data", "oi"))
+)
+
+OI_COLUMNS = 3
+AMOUNT_COLUMN = 1
+VALUE_COLUMN = 2
+
+
+def _archive_path(exchange_name, symbol, timeframe):
+    """아카이브 파일 경로를 반환합니다. (예: data/oi/binanceusdm/1h/BTC_USDT_USDT.npy)"""
+    safe_symbol = re.sub(r'[^A-Za-z0-9_.-]', '_', symbol)
+    return os.path.join(STORE_DIR, exchange_name, timeframe, f"{safe_symbol}.npy")
+
+
+def load_open_interest(exchange_name, symbol, timeframe, mmap=True):
+    """저장된 OI 배열을 반환합니다. 저장된 데이터가 없으면 None을 반환합니다."""
+    return ohlcv_store.load_array(_archive_path(exchange_name, symbol, timeframe), mmap,
+                                  label=f"open interest for {symbol}")
+
+
+def history_to_rows(history):
+    """ccxt fetch_open_interest_history 결과(dict 목록)를 (N, 3) 배열로 변환합니다."""
+    rows = [
+        (entry['timestamp'],
+         entry.get('openInterestAmount') if entry.get('openInterestAmount') is not None else np.nan,
+         entry.get('openInterestValue') if entry.get('openInterestValue') is not None else np.nan)
+        for entry in history
+    ]
+    return np.array(rows, dtype=np.float64).reshape(-1, OI_COLUMNS)
+
+
+def sync_open_interest(exchange_name, symbol, timeframe, history):
+    """
+    새로 받은 OI 히스토리를 아카이브에 병합하여 저장하고, 병합된 배열을 반환합니다.
+    캔들 저장소와 같은 잠금/원자적 교체(ohlcv_store.sync_array)를 사용해 여러 워커 프로세스가 동시에 써도 안전합니다.
+    """
+    return ohlcv_store.sync_array(_archive_path(exchange_name, symbol, timeframe), history_to_rows(history),
+                                  columns=OI_COLUMNS, label=f"open interest for {symbol}")
+
+
+def load_range(exchange_name, symbol, timeframe, start=None, end=None):
+    """아카이브에서 [start, end) 구간(ms)의 샘플만 복사해 반환합니다."""
+    samples = load_open_interest(exchange_name, symbol, timeframe)
+    if samples is None:
+        return np.empty((0, OI_COLUMNS))
+    timestamps = samples[:, 0]
+    first = 0 if start is None else int(np.searchsorted(timestamps, start, side='left'))
+    last = len(samples) if end is None else int(np.searchsorted(timestamps, end, side='left'))
+    return np.array(samples[first:last])
+
+
+def change(samples, window_ms, column=VALUE_COLUMN):
+    """
+    마지막 샘플 대비 window_ms 전(또는 그 이전 가장 가까운) 샘플의 변화율(%)을 반환합니다.
+    아카이브가 기간을 채우지 못하면 None을 반환합니다.
+    """
+    if samples is None or len(samples) == 0:
+        return None
+    timestamps = samples[:, 0]
+    position = int(np.searchsorted(timestamps, timestamps[-1] - window_ms, side='right')) - 1
+    if position < 0:
+        return None
+    past, latest = float(samples[position, column]), float(samples[-1, column])
+    if np.isnan(past) or np.isnan(latest):
+        return None
+    return (latest - past) / past * 100 if past else 0.0
@@ -0,0 +1,138 @@
+import numpy as np
+
+from utils import indicators
+
+OHLCV_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class PricePanel:
+    """
+    여러 심볼의 일봉을 (심볼 × 일) 2차원 배열로 정렬한 패널입니다.
+
+    각 행은 해당 심볼의 캔들을 최신 캔들이 마지막 열에 오도록 오른쪽 정렬하고,
+    히스토리가 짧은 심볼의 앞부분은 NaN으로 채웁니다. 따라서 마지막 열은 각 심볼의
+    최신 캔들(df.iloc[-1]), 마지막 N열은 df.tail(N)과 같습니다.
+    latest_values에는 스트리밍 상태 등으로 미리 구한 {지표 컬럼명: 심볼별 최신 값 배열}을 담습니다.
+    """
+
+    def __init__(self, symbols, timestamps, open, high, low, close, volume, lengths, latest_values=None):
+        self.symbols = list(symbols)
+        self.timestamps = timestamps  # int64 ms, 패딩 구간은 -1
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.lengths = lengths
+        self.latest_values = latest_values or {}
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def take(self, rows):
+        """지정한 행(심볼)만 남긴 패널을 반환합니다."""
+        return PricePanel(
+            [self.symbols[i] for i in rows],
+            self.timestamps[rows],
+            self.open[rows], self.high[rows], self.low[rows], self.close[rows], self.volume[rows],
+            self.lengths[rows],
+            {name: values[rows] for name, values in self.latest_values.items()}
+        )
+
+
+def build_panel(frames, latest_values=None):
+    """
+    {심볼: OHLCV DataFrame} 딕셔너리로부터 PricePanel을 만듭니다.
+    latest_values({심볼: {지표 컬럼명: 값}})가 주어지면 패널 행 순서의 배열로 정렬해 둡니다.
+    """
+    symbols = [symbol for symbol, df in frames.items() if df is not None and len(df)]
+    lengths = np.array([len(frames[symbol]) for symbol in symbols], dtype=np.int64)
+    width = int(lengths.max()) if len(lengths) else 0
+
+    timestamps = np.full((len(symbols), width), -1, dtype=np.int64)
+    fields = {name: np.full((len(symbols), width), np.nan) for name in OHLCV_FIELDS}
+    for row, symbol in enumerate(symbols):
+        df = frames[symbol]
+        n = lengths[row]
+        timestamps[row, width - n:] = df['timestamp'].to_numpy().astype('datetime64[ms]').astype(np.int64)
+        for name in OHLCV_FIELDS:
+            fields[name][row, width - n:] = df[name].to_numpy(dtype=np.float64)
+
+    aligned = {}
+    for symbol_values in (latest_values or {}).values():
+        for name in symbol_values:
+            aligned.setdefault(name, np.array([
+                (latest_values.get(symbol) or {}).get(name, np.nan) for symbol in symbols
+            ], dtype=np.float64))
+
+    return PricePanel(symbols, timestamps, lengths=lengths, latest_values=aligned, **fields)
+
+
+# --- 패널 단위 지표 (모든 심볼을 한 번에 계산) ---
+
+def latest_close(panel):
+    return panel.close[:, -1]
+
+
+def daily_volume(panel):
+    """최신 캔들의 거래대금 (종가 × 거래량)."""
+    return panel.close[:, -1] * panel.volume[:, -1]
+
+
+def ath_drawdown(panel):
+    """ATH(전체 기간 최고가) 대비 최신 종가의 하락률 (0.0 ~ 1.0)."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return 1 - panel.close[:, -1] / np.nanmax(panel.high, axis=1)
+
+
+def recent_volatility(panel, lookback=30):
+    """최근 lookback일 (고가 - 저가) / 최신 종가 (%). 종가가 0 이하이면 0."""
+    close = panel.close[:, -1]
+    recent_high = np.nanmax(panel.high[:, -lookback:], axis=1)
+    recent_low = np.nanmin(panel.low[:, -lookback:], axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(close > 0, (recent_high - recent_low) / close * 100, 0.0)
+
+
+def latest_cci(panel, period=20, constant=0.015):
+    """최신 캔들의 CCI (pandas_ta와 같은 평균 절대 편차 기반). 데이터가 부족하면 NaN."""
+    if f'CCI_{period}_{constant}' in panel.latest_values:
+        return panel.latest_values[f'CCI_{period}_{constant}']
+    typical_price = (panel.high[:, -period:] + panel.low[:, -period:] + panel.close[:, -period:]) / 3
+    mean = typical_price.mean(axis=1)
+    mad = np.abs(typical_price - mean[:, None]).mean(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (typical_price[:, -1] - mean) / (constant * mad)
+
+
+def latest_rsi(panel, period=14):
+    """최신 캔들의 RSI (pandas_ta와 같은 Wilder RMA 기반)."""
+    if f'RSI_{period}' in panel.latest_values:
+        return panel.latest_values[f'RSI_{period}']
+    return indicators.rsi(panel.close, period)[:, -1]
+
+
+def volume_increase(panel, compare_period, increase_period):
+    """최근 increase_period일 평균 거래량의 직전 compare_period일 평균 대비 증가율 (%)."""
+    recent = panel.volume[:, -increase_period:].mean(axis=1)
+    compare = panel.volume[:, -(compare_period + increase_period):-increase_period].mean(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(compare > 0, (recent - compare) / compare * 100, np.nan)
+
+
+def max_volume_spike(panel, lookback=30, window=30):
+    """
+    최근 lookback일 중 거래량 / window일 평균 거래량이 가장 큰 날의 배수와 타임스탬프(ms)를 반환합니다.
+    """
+    if len(panel) == 0 or panel.volume.shape[1] == 0:
+        return np.full(len(panel), np.nan), np.full(len(panel), -1, dtype=np.int64)
+
+    volume_sma = indicators.sma(panel.volume, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        spike = panel.volume[:, -lookback:] / volume_sma[:, -lookback:]
+    spike = np.where(np.isnan(spike), -np.inf, spike)
+    idx = np.argmax(spike, axis=1)
+    rows = np.arange(len(panel))
+    ratio = spike[rows, idx]
+    timestamps = panel.timestamps[:, -lookback:][rows, idx]
+    return np.where(np.isinf(ratio) & (ratio < 0), np.nan, ratio), timestamps
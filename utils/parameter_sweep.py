@@ -0,0 +1,106 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from utils import backtest, indicators
+
+# 단타 전략 파라미터 그리드 탐색
+# 종가 배열은 공유 메모리에 한 번만 올리고, 워커 프로세스는 초기화 시 이를 연결해 사용합니다.
+# 작업은 (EMA 단기, EMA 장기, RSI 기간) 단위로 묶어 지표는 묶음당 한 번만 계산합니다.
+
+SWEEP_PARAMETERS = ('fast_period', 'slow_period', 'rsi_period', 'rsi_threshold',
+                    'take_profit', 'stop_loss', 'position_size_usd')
+RESULT_COLUMNS = ('final_balance', 'total_pnl', 'total_trades', 'winning_trades', 'win_rate',
+                  'avg_profit', 'avg_loss')
+# 한 작업에 담는 최대 조합 수 (프로세스 간 부하 분산용)
+TASK_CHUNK_SIZE = 256
+
+_worker_close = None
+_worker_shm = None
+
+
+def _attach_shared_close(name, length):
+    """워커 초기화: 공유 메모리의 종가 배열을 복사 없이 연결합니다."""
+    global _worker_close, _worker_shm
+    # 워커는 부모의 resource tracker를 공유하므로 등록을 해제하지 않습니다.
+    # 세그먼트의 close()/unlink()는 생성한 부모 프로세스만 담당합니다.
+    _worker_shm = shared_memory.SharedMemory(name=name)
+    _worker_close = np.ndarray((length,), dtype=np.float64, buffer=_worker_shm.buf)
+
+
+def _run_task(task):
+    """(fast, slow, rsi_period, [(rsi_threshold, take_profit, stop_loss, position_size_usd), ...]) 묶음을 실행합니다."""
+    fast_period, slow_period, rsi_period, combinations = task
+    return _run_group(_worker_close, fast_period, slow_period, rsi_period, combinations)
+
+
+def _run_group(close, fast_period, slow_period, rsi_period, combinations, initial_balance=10000):
+    fast_ema = indicators.ema(close, fast_period)
+    slow_ema = indicators.ema(close, slow_period)
+    rsi = indicators.rsi(close, rsi_period)
+    start_index = max(slow_period, rsi_period)
+
+    rows = []
+    for rsi_threshold, take_profit, stop_loss, position_size_usd in combinations:
+        _, summary = backtest.run_backtest(
+            close, fast_ema, slow_ema, rsi,
+            rsi_threshold=rsi_threshold, take_profit=take_profit, stop_loss=stop_loss,
+            position_size_usd=position_size_usd, initial_balance=initial_balance, start_index=start_index
+        )
+        params = (fast_period, slow_period, rsi_period, rsi_threshold, take_profit, stop_loss, position_size_usd)
+        rows.append(params + tuple(summary[column] for column in RESULT_COLUMNS))
+    return rows
+
+
+def build_tasks(grid, chunk_size=TASK_CHUNK_SIZE):
+    """
+    {파라미터: 값 목록} 그리드를 작업 목록으로 펼칩니다.
+    단기 EMA 기간이 장기 EMA 기간 이상인 조합은 제외합니다.
+    """
+    missing = [name for name in SWEEP_PARAMETERS if name not in grid]
+    if missing:
+        raise ValueError(f"그리드에 필요한 파라미터가 없습니다: {', '.join(missing)}")
+
+    inner = list(itertools.product(grid['rsi_threshold'], grid['take_profit'], grid['stop_loss'],
+                                   grid['position_size_usd']))
+    tasks = []
+    for fast_period, slow_period, rsi_period in itertools.product(grid['fast_period'], grid['slow_period'],
+                                                                  grid['rsi_period']):
+        if fast_period >= slow_period:
+            continue
+        for start in range(0, len(inner), chunk_size):
+            tasks.append((fast_period, slow_period, rsi_period, inner[start:start + chunk_size]))
+    return tasks
+
+
+def sweep_parameters(close, grid, max_workers=None, sort_by='total_pnl'):
+    """
+    그리드의 모든 파라미터 조합으로 백테스트를 실행하고 sort_by 기준 내림차순으로 정렬한 결과 표를 반환합니다.
+    max_workers가 1이면 현재 프로세스에서 순차 실행합니다.
+    """
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    tasks = build_tasks(grid)
+    max_workers = max_workers or os.cpu_count() or 1
+
+    rows = []
+    if max_workers == 1 or len(tasks) <= 1:
+        for fast_period, slow_period, rsi_period, combinations in tasks:
+            rows.extend(_run_group(close, fast_period, slow_period, rsi_period, combinations))
+    else:
+        shm = shared_memory.SharedMemory(create=True, size=max(close.nbytes, 1))
+        try:
+            np.ndarray(close.shape, dtype=np.float64, buffer=shm.buf)[:] = close
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_attach_shared_close,
+                                     initargs=(shm.name, len(close))) as executor:
+                for task_rows in executor.map(_run_task, tasks):
+                    rows.extend(task_rows)
+        finally:
+            shm.close()
+            shm.unlink()
+
+    results = pd.DataFrame(rows, columns=list(SWEEP_PARAMETERS + RESULT_COLUMNS))
+    return results.sort_values(sort_by, ascending=False, kind='stable').reset_index(drop=True)
@@ -0,0 +1,171 @@
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils import backtest, indicators
+
+# 여러 심볼에 같은 단타 전략을 적용하고 하나의 자본을 공유하는 포트폴리오 백테스트
+# 1) 심볼별 진입 후보와 각 후보의 청산 지점은 서로 독립이므로 프로세스 풀에서 병렬로 계산하고,
+# 2) 자본 배분은 모든 심볼의 후보를 시간순으로 합친 뒤 거래 단위로 시뮬레이션합니다.
+
+DEFAULT_STRATEGY = {
+    'fast_period': 5,
+    'slow_period': 20,
+    'rsi_period': 14,
+    'rsi_threshold': 50.0,
+    'take_profit': 0.01,
+    'stop_loss': 0.005,
+}
+
+TRADE_COLUMNS = ('symbol', 'entry_time', 'exit_time', 'entry_price', 'exit_price',
+                 'profit_loss_ratio', 'profit_loss_usd', 'exit_reason')
+
+
+def candidate_trades(timestamps, close, strategy=None):
+    """
+    한 심볼의 모든 진입 후보와 각 후보의 청산 결과를 계산합니다.
+    {필드: 배열}을 반환하며, 데이터 끝까지 청산되지 않는 후보는 exit_time이 -1입니다.
+    """
+    strategy = {**DEFAULT_STRATEGY, **(strategy or {})}
+    close = np.asarray(close, dtype=np.float64)
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    entries, next_death = backtest.entry_signals(
+        close,
+        indicators.ema(close, strategy['fast_period']),
+        indicators.ema(close, strategy['slow_period']),
+        indicators.rsi(close, strategy['rsi_period']),
+        strategy['rsi_threshold'],
+        start_index=max(strategy['slow_period'], strategy['rsi_period'])
+    )
+
+    exit_index = np.full(len(entries), -1, dtype=np.int64)
+    exit_reason = np.full(len(entries), -1, dtype=np.int8)
+    for k, entry in enumerate(entries):
+        exit_ = backtest.find_exit(close, entry, next_death, strategy['take_profit'], strategy['stop_loss'])
+        if exit_ is not None:
+            exit_index[k], exit_reason[k] = exit_
+
+    closed = exit_index >= 0
+    exit_price = np.full(len(entries), np.nan)
+    exit_price[closed] = backtest.exit_prices(
+        close, entries[closed], exit_index[closed], exit_reason[closed],
+        strategy['take_profit'], strategy['stop_loss']
+    )
+    return {
+        'entry_time': timestamps[entries],
+        'exit_time': np.where(closed, timestamps[np.maximum(exit_index, 0)], -1),
+        'entry_price': close[entries],
+        'exit_price': exit_price,
+        'exit_reason': exit_reason,
+    }
+
+
+def _candidate_trades_task(args):
+    symbol, timestamps, close, strategy = args
+    return symbol, candidate_trades(timestamps, close, strategy)
+
+
+def simulate_portfolio(candidates, initial_balance=10000, position_size_usd=1000):
+    """
+    심볼별 후보 거래({심볼: candidate_trades 결과})를 공유 자본으로 시뮬레이션합니다.
+    - 같은 심볼은 한 번에 하나의 포지션만 보유하며, 청산 캔들 이후의 후보부터 다시 진입할 수 있습니다.
+    - 진입 시점의 가용 현금(잔고 - 보유 포지션 금액)이 position_size_usd 미만이면 후보를 건너뜁니다.
+    - 같은 시각에는 청산을 먼저 처리한 뒤 진입합니다.
+    (체결된 거래 목록, 심볼별 건너뛴 후보 수, 최대 동시 보유 수, 실현 잔고 곡선) 튜플을 반환합니다.
+    """
+    events = []
+    for order, (symbol, trades) in enumerate(candidates.items()):
+        for k in range(len(trades['entry_time'])):
+            events.append((int(trades['entry_time'][k]), order, symbol, k))
+    events.sort()
+
+    balance = initial_balance
+    open_positions = []  # (exit_time, 순서, 심볼, 후보 인덱스) 힙
+    busy_until = {}  # 심볼 -> 보유 중인 포지션의 청산 시각 (미청산이면 무한대)
+    executed, skipped = [], {symbol: 0 for symbol in candidates}
+    equity = [initial_balance]
+    max_open = 0
+
+    def close_until(timestamp):
+        nonlocal balance
+        while open_positions and open_positions[0][0] <= timestamp:
+            _, _, symbol, k = heapq.heappop(open_positions)
+            trades = candidates[symbol]
+            entry_price, exit_price = trades['entry_price'][k], trades['exit_price'][k]
+            profit_loss_ratio = (exit_price - entry_price) / entry_price
+            profit_loss_usd = position_size_usd * profit_loss_ratio
+            balance += profit_loss_usd
+            equity.append(balance)
+            executed.append((symbol, int(trades['entry_time'][k]), int(trades['exit_time'][k]), entry_price,
+                             exit_price, profit_loss_ratio, profit_loss_usd, int(trades['exit_reason'][k])))
+
+    for entry_time, order, symbol, k in events:
+        close_until(entry_time)
+        if busy_until.get(symbol, -1) >= entry_time:
+            continue  # 이미 포지션 보유 중 (단일 심볼 백테스트와 동일하게 후보를 무시)
+        if balance - len(open_positions) * position_size_usd < position_size_usd:
+            skipped[symbol] += 1
+            continue
+
+        # 데이터 끝까지 청산되지 않는 포지션은 자본만 묶어 두고 손익은 집계하지 않습니다.
+        exit_time = int(candidates[symbol]['exit_time'][k])
+        busy_until[symbol] = exit_time if exit_time >= 0 else np.inf
+        heapq.heappush(open_positions, (busy_until[symbol], order, symbol, k))
+        max_open = max(max_open, len(open_positions))
+
+    close_until(np.iinfo(np.int64).max)
+    return executed, skipped, max_open, np.array(equity)
+
+
+def run_portfolio_backtest(frames, initial_balance=10000, position_size_usd=1000, strategy=None, max_workers=None):
+    """
+    {심볼: OHLCV DataFrame}에 전략을 적용한 포트폴리오 백테스트를 실행합니다.
+    (거래 DataFrame, 심볼별 지표 DataFrame, 전체 요약 dict)를 반환합니다.
+    """
+    tasks = [
+        (symbol, df['timestamp'].to_numpy().astype('datetime64[ms]').astype(np.int64),
+         df['close'].to_numpy(dtype=np.float64), strategy)
+        for symbol, df in frames.items() if df is not None and len(df)
+    ]
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1 or len(tasks) <= 1:
+        results = [_candidate_trades_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_candidate_trades_task, tasks,
+                                        chunksize=max(1, len(tasks) // (max_workers * 4))))
+    candidates = dict(results)
+
+    executed, skipped, max_open, equity = simulate_portfolio(candidates, initial_balance, position_size_usd)
+
+    trades = pd.DataFrame(executed, columns=list(TRADE_COLUMNS))
+    trades['entry_time'] = pd.to_datetime(trades['entry_time'], unit='ms')
+    trades['exit_time'] = pd.to_datetime(trades['exit_time'], unit='ms')
+    trades = trades.sort_values(['exit_time', 'entry_time'], kind='stable').reset_index(drop=True)
+    trades['exit_reason'] = [backtest.EXIT_REASONS[code] for code in trades['exit_reason']]
+
+    per_symbol = (
+        trades.assign(winning_trades=trades['profit_loss_usd'] > 0)
+        .groupby('symbol')
+        .agg(total_trades=('profit_loss_usd', 'size'), winning_trades=('winning_trades', 'sum'),
+             total_pnl=('profit_loss_usd', 'sum'))
+        .reindex(list(candidates), fill_value=0)
+        .rename_axis('symbol')
+        .reset_index()
+    )
+    per_symbol['win_rate'] = (per_symbol['winning_trades'] / per_symbol['total_trades'].where(lambda n: n > 0) * 100).fillna(0.0)
+    per_symbol['skipped_signals'] = per_symbol['symbol'].map(skipped)
+    per_symbol = per_symbol.sort_values('total_pnl', ascending=False, kind='stable').reset_index(drop=True)
+
+    summary = backtest.summarize_trades(np.array([trade[6] for trade in executed]), initial_balance)
+    peak = np.maximum.accumulate(equity)
+    summary.update({
+        'symbols': len(candidates),
+        'max_open_positions': max_open,
+        'skipped_signals': sum(skipped.values()),
+        'max_drawdown': float(np.max((peak - equity) / peak) * 100) if len(equity) else 0.0,
+    })
+    return trades, per_symbol, summary
@@ -0,0 +1,161 @@
+import asyncio
+import threading
+import time
+from collections import deque
+
+import ccxt.async_support as ccxt
+
+# 거래소 요청 가중치(weight) 기반 비동기 스케줄러
+# 최근 1분간 사용한 가중치를 직접 집계하고, 거래소가 응답 헤더로 알려주는 사용량(바이낸스
+# x-mbx-used-weight-1m)이 더 크면 그 값을 따릅니다. 429/418 응답을 받으면 예산을 줄이고
+# 대기했다가, 이후 요청이 성공할 때마다 예산을 조금씩 원래대로 회복합니다. (AIMD)
+
+WINDOW_SECONDS = 60.0
+USED_WEIGHT_HEADERS = ('x-mbx-used-weight-1m', 'X-MBX-USED-WEIGHT-1M')
+
+# 이 프로세스가 사용할 거래소 요청 예산의 비율 (0 < share <= 1)
+# 거래소 한도는 IP 단위이므로, 같은 IP에서 여러 Celery 청크 태스크가 동시에 돌 때는
+# 각 청크가 예산을 나눠 쓰도록 청크 태스크가 시작 시 설정합니다. (prefork 워커는 프로세스당 태스크 하나)
+_rate_share = 1.0
+
+
+def set_rate_share(share):
+    global _rate_share
+    _rate_share = min(1.0, max(share, 0.01))
+
+
+def rate_share():
+    return _rate_share
+
+
+class RequestThrottle:
+    """
+    초당 요청 수를 제한하는 스로틀러입니다. 요청마다 다음 빈 시각을 잠금 아래에서 예약하므로
+    서로 다른 스레드의 이벤트 루프(동시에 실행되는 작업들)가 하나의 예산을 함께 쓸 수 있습니다.
+    """
+
+    def __init__(self, requests_per_second, clock=time.monotonic, sleep=asyncio.sleep):
+        self.interval = 1.0 / requests_per_second
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def reserve(self):
+        """다음 요청 시각을 예약하고, 그때까지 기다려야 하는 시간(초)을 반환합니다."""
+        with self._lock:
+            now = self._clock()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+            return slot - now
+
+    async def wait(self):
+        delay = self.reserve()
+        if delay > 0:
+            await self._sleep(delay)
+
+
+# 거래소별로 프로세스 안의 모든 작업이 공유하는 스로틀러
+_throttles = {}
+_throttles_lock = threading.Lock()
+
+
+def shared_throttle(exchange_name, requests_per_second):
+    """(거래소, 초당 요청 수)별로 하나의 RequestThrottle을 만들어 재사용합니다."""
+    key = (exchange_name, requests_per_second)
+    with _throttles_lock:
+        throttle = _throttles.get(key)
+        if throttle is None:
+            throttle = _throttles[key] = RequestThrottle(requests_per_second)
+        return throttle
+
+
+class WeightedRateLimiter:
+    """
+    분당 가중치 예산과 동시 실행 수를 함께 제한하는 스케줄러입니다.
+    safety_ratio만큼만 예산으로 사용해 다른 클라이언트의 사용량에 여유를 둡니다.
+    """
+
+    def __init__(self, max_weight_per_minute, max_concurrency=10, safety_ratio=0.8,
+                 max_retries=3, base_backoff=1.0, clock=time.monotonic, sleep=asyncio.sleep):
+        self.max_weight = max_weight_per_minute * safety_ratio
+        self.budget = self.max_weight
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self._clock = clock
+        self._sleep = sleep
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._lock = asyncio.Lock()
+        self._spent = deque()  # (시각, 가중치)
+        self._reported = (0.0, 0)  # (시각, 거래소가 알려준 사용 가중치)
+        self._blocked_until = 0.0
+        self.throttled = 0
+
+    def used_weight(self):
+        """최근 1분간 사용한 가중치 (자체 집계와 거래소 보고 값 중 큰 값)."""
+        now = self._clock()
+        while self._spent and now - self._spent[0][0] >= WINDOW_SECONDS:
+            self._spent.popleft()
+        counted = sum(weight for _, weight in self._spent)
+        reported_at, reported = self._reported
+        return max(counted, reported if now - reported_at < WINDOW_SECONDS else 0)
+
+    async def _acquire(self, weight):
+        async with self._lock:
+            while True:
+                now = self._clock()
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    used = self.used_weight()
+                    if used + weight <= self.budget or used == 0:
+                        self._spent.append((now, weight))
+                        return
+                    # 가장 오래된 요청(또는 거래소 보고 값)이 1분 창에서 빠질 때까지 대기
+                    oldest = self._spent[0][0] if self._spent else self._reported[0]
+                    wait = WINDOW_SECONDS - (now - oldest)
+                await self._sleep(max(wait, 0.01))
+
+    def observe(self, exchange):
+        """응답 헤더의 사용 가중치를 반영합니다."""
+        headers = getattr(exchange, 'last_response_headers', None) or {}
+        for name in USED_WEIGHT_HEADERS:
+            if name in headers:
+                try:
+                    self._reported = (self._clock(), int(headers[name]))
+                except (TypeError, ValueError):
+                    pass
+                return
+
+    def _on_success(self):
+        # 제한에 걸린 뒤 줄였던 예산을 요청이 성공할 때마다 조금씩 회복
+        self.budget = min(self.max_weight, self.budget + self.max_weight * 0.01)
+
+    def _on_throttled(self, attempt, exchange):
+        self.throttled += 1
+        self.budget = max(self.max_weight * 0.1, self.budget * 0.5)
+        headers = getattr(exchange, 'last_response_headers', None) or {}
+        try:
+            retry_after = float(headers.get('Retry-After') or headers.get('retry-after') or 0)
+        except (TypeError, ValueError):
+            retry_after = 0
+        delay = max(retry_after, self.base_backoff * (2 ** attempt))
+        self._blocked_until = max(self._blocked_until, self._clock() + delay)
+
+    async def run(self, exchange, method, *args, weight=1, **kwargs):
+        """
+        exchange.method(*args, **kwargs)를 가중치 예산과 동시 실행 한도 안에서 호출합니다.
+        레이트리밋 오류(429/418)는 지수 백오프 후 최대 max_retries번 재시도합니다.
+        """
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self._acquire(weight)
+                try:
+                    result = await getattr(exchange, method)(*args, **kwargs)
+                except (ccxt.RateLimitExceeded, ccxt.DDoSProtection):
+                    self._on_throttled(attempt, exchange)
+                    if attempt == self.max_retries:
+                        raise
+                    continue
+                self.observe(exchange)
+                self._on_success()
+                return result
@@ -0,0 +1,122 @@
+import queue
+import threading
+from concurrent.futures import Future
+
+from sqlalchemy.orm import sessionmaker
+
+from utils.config_loader import CONFIG
+
+# 스크리너 결과를 DB마다 하나뿐인 쓰기 스레드에서 모아 저장하는 단일 작성자 큐
+# SQLite는 한 번에 한 트랜잭션만 쓸 수 있으므로, 여러 스레드가 각자 커밋하면 잠금을 기다리며 줄을 섭니다.
+# 쓰기 스레드는 앞의 커밋을 하는 동안 쌓인 결과를 한 트랜잭션으로 묶어 저장합니다. (그룹 커밋)
+# 대기 중인 결과가 없으면 바로 저장하므로 한가할 때 지연이 늘지 않습니다.
+
+DATABASE_CONFIG = CONFIG.get("database", {})
+BATCH_WRITES = DATABASE_CONFIG.get("batch_writes", True)
+MAX_BATCH_SIZE = DATABASE_CONFIG.get("max_batch_size", 100)  # 한 트랜잭션에 묶을 최대 결과 수
+WRITE_TIMEOUT = DATABASE_CONFIG.get("write_timeout", 60)  # 저장 완료 대기 시간 (초)
+
+_STOP = object()
+
+
+class ResultWriter:
+    """ORM 객체를 큐로 받아 전용 스레드에서 묶음 단위로 커밋합니다."""
+
+    def __init__(self, bind, max_batch_size=MAX_BATCH_SIZE):
+        # 커밋 후에도 호출한 쪽에서 id 등을 읽을 수 있도록 expire_on_commit=False
+        self._session_factory = sessionmaker(bind=bind, autoflush=False, expire_on_commit=False)
+        self.max_batch_size = max_batch_size
+        self._queue = queue.Queue()
+        self.batches = 0
+        self.written = 0
+        self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, obj):
+        """obj 저장을 예약하고, 커밋되면 obj를 결과로 갖는 Future를 반환합니다."""
+        future = Future()
+        self._queue.put((obj, future))
+        return future
+
+    def write(self, obj, timeout=WRITE_TIMEOUT):
+        """obj가 커밋될 때까지 기다린 뒤 반환합니다. 저장에 실패하면 해당 예외를 다시 발생시킵니다."""
+        return self.submit(obj).result(timeout=timeout)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            stop = False
+            # 앞선 커밋 동안 쌓인 요청을 한 번에 가져옴
+            while len(batch) < self.max_batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+            if stop:
+                return
+
+    def _commit(self, batch):
+        session = self._session_factory()
+        try:
+            session.add_all([obj for obj, _ in batch])
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _flush(self, batch):
+        try:
+            self._commit(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            # 한 결과의 오류가 같은 묶음의 다른 결과까지 실패시키지 않도록 하나씩 다시 저장
+            for item in batch:
+                self._flush([item])
+            return
+        self.batches += 1
+        self.written += len(batch)
+        for obj, future in batch:
+            future.set_result(obj)
+
+    def close(self, timeout=None):
+        """남은 요청을 모두 저장한 뒤 쓰기 스레드를 종료합니다."""
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(bind):
+    """엔진(bind)별로 하나의 ResultWriter를 만들어 재사용합니다."""
+    with _writers_lock:
+        writer = _writers.get(bind)
+        if writer is None:
+            writer = _writers[bind] = ResultWriter(bind)
+        return writer
+
+
+def save_result(db, obj):
+    """
+    스크리너 결과를 저장하고 id가 채워진 obj를 반환합니다.
+    BATCH_WRITES가 켜져 있으면 db 세션과 같은 엔진의 쓰기 큐를 거쳐 묶음 커밋됩니다.
+    """
+    if BATCH_WRITES:
+        return get_writer(db.get_bind()).write(obj)
+    db.add(obj)
+    db.commit()
+    db.refresh(obj)
+    return obj
@@ -0,0 +1,283 @@
+import math
+from collections import deque
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from utils import indicators
+
+# 캔들 한 개가 추가될 때마다 O(1)로 갱신되는 지표 상태
+# 각 상태는 직전 캔들 적용 전의 스냅샷을 함께 보관하여, 진행 중이던 마지막 캔들이
+# 다음 동기화에서 갱신(같은 타임스탬프 재수신)되어도 다시 적용할 수 있습니다.
+# 계산식은 utils.indicators(=pandas_ta 기본값)와 동일합니다.
+
+
+class _StreamingState:
+    kind = None
+
+    def __init__(self, length):
+        self.length = length
+        self.last_timestamp = None
+        self._previous = None
+
+    def update(self, timestamp, high, low, close):
+        """캔들 하나를 적용합니다. 마지막 캔들과 같은 타임스탬프면 그 캔들을 덮어씁니다."""
+        if self.last_timestamp is not None and timestamp < self.last_timestamp:
+            raise ValueError(f"과거 캔들({timestamp})은 적용할 수 없습니다. 마지막 캔들: {self.last_timestamp}")
+        if timestamp == self.last_timestamp:
+            self._restore(self._previous)
+        else:
+            self._previous = self._snapshot()
+        self._apply(high, low, close)
+        self.last_timestamp = timestamp
+
+    def update_many(self, timestamps, high, low, close):
+        """
+        이어지는 캔들 여러 개를 한 번에 적용하고 캔들별 지표 값 배열을 반환합니다.
+        첫 캔들이 마지막 캔들과 같은 타임스탬프면 update와 같이 그 캔들을 덮어씁니다.
+        """
+        n = len(close)
+        values = np.full(n, np.nan)
+        if n == 0:
+            return values
+        if self.last_timestamp is not None and timestamps[0] <= self.last_timestamp:
+            self.update(int(timestamps[0]), float(high[0]), float(low[0]), float(close[0]))
+            values[0] = self.value
+            values[1:] = self.update_many(timestamps[1:], high[1:], low[1:], close[1:])
+            return values
+
+        if n > 1:
+            values[:-1] = self._apply_many(high[:-1], low[:-1], close[:-1])
+        self.update(int(timestamps[-1]), float(high[-1]), float(low[-1]), float(close[-1]))
+        values[-1] = self.value
+        return values
+
+    def _apply_many(self, high, low, close):
+        """캔들을 차례로 적용하며 값을 기록합니다. 벡터화가 가능한 지표는 재정의합니다."""
+        values = np.empty(len(close))
+        for i in range(len(close)):
+            self._apply(float(high[i]), float(low[i]), float(close[i]))
+            values[i] = self.value
+        return values
+
+    def to_dict(self):
+        return {
+            'kind': self.kind,
+            'length': self.length,
+            'last_timestamp': self.last_timestamp,
+            'state': self._snapshot(),
+            'previous': self._previous,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls(data['length'])
+        state.last_timestamp = data['last_timestamp']
+        state._restore(data['state'])
+        state._previous = data['previous']
+        return state
+
+
+class EmaState(_StreamingState):
+    """첫 length개 종가의 SMA를 시드로 하는 EMA (pandas_ta ema)."""
+    kind = 'ema'
+
+    def __init__(self, length):
+        super().__init__(length)
+        self.count = 0
+        self.seed_sum = 0.0
+        self.ema = math.nan
+
+    @property
+    def value(self):
+        return self.ema
+
+    def _apply(self, high, low, close):
+        self.count += 1
+        if self.count < self.length:
+            self.seed_sum += close
+        elif self.count == self.length:
+            self.ema = (self.seed_sum + close) / self.length
+        else:
+            alpha = 2.0 / (self.length + 1)
+            self.ema = alpha * close + (1 - alpha) * self.ema
+
+    def _apply_many(self, high, low, close):
+        close = np.asarray(close, dtype=np.float64)
+        values = np.full(len(close), np.nan)
+        # 시드(SMA) 구간은 캔들 단위로 처리하고, 이후 구간은 지수 가중 누적으로 한 번에 계산합니다.
+        seeded = 0
+        while seeded < len(close) and self.count < self.length:
+            self._apply(None, None, float(close[seeded]))
+            values[seeded] = self.ema
+            seeded += 1
+        rest = close[seeded:]
+        if len(rest):
+            alpha = 2.0 / (self.length + 1)
+            values[seeded:] = indicators.decay_scan(alpha * rest, 1 - alpha, initial=self.ema)
+            self.ema = float(values[-1])
+            self.count += len(rest)
+        return values
+
+    def _snapshot(self):
+        return [self.count, self.seed_sum, self.ema]
+
+    def _restore(self, snapshot):
+        self.count, self.seed_sum, self.ema = snapshot
+
+
+class RsiState(_StreamingState):
+    """Wilder RMA(adjust=True EWM) 기반 RSI (pandas_ta rsi)."""
+    kind = 'rsi'
+
+    def __init__(self, length):
+        super().__init__(length)
+        self.prev_close = None
+        self.count = 0
+        self.gain = 0.0
+        self.loss = 0.0
+
+    @property
+    def value(self):
+        if self.count < self.length or self.gain + self.loss == 0:
+            return math.nan
+        return 100 * self.gain / (self.gain + self.loss)
+
+    def _apply(self, high, low, close):
+        if self.prev_close is not None:
+            delta = close - self.prev_close
+            decay = 1 - 1.0 / self.length
+            self.gain = self.gain * decay + max(delta, 0.0)
+            self.loss = self.loss * decay + max(-delta, 0.0)
+            self.count += 1
+        self.prev_close = close
+
+    def _apply_many(self, high, low, close):
+        close = np.asarray(close, dtype=np.float64)
+        values = np.full(len(close), np.nan)
+        if len(close) == 0:
+            return values
+        start = 0
+        if self.prev_close is None:
+            self._apply(None, None, float(close[0]))
+            start = 1
+        if len(close) > start:
+            delta = np.diff(close[start - 1:] if start else np.concatenate([[self.prev_close], close]))
+            decay = 1 - 1.0 / self.length
+            gain = indicators.decay_scan(np.maximum(delta, 0.0), decay, initial=self.gain)
+            loss = indicators.decay_scan(np.maximum(-delta, 0.0), decay, initial=self.loss)
+            count = self.count + np.arange(1, len(delta) + 1)
+            total = gain + loss
+            with np.errstate(invalid='ignore', divide='ignore'):
+                values[start:] = np.where((count >= self.length) & (total != 0), 100 * gain / total, np.nan)
+            self.gain, self.loss = float(gain[-1]), float(loss[-1])
+            self.count = int(count[-1])
+            self.prev_close = float(close[-1])
+        return values
+
+    def _snapshot(self):
+        return [self.prev_close, self.count, self.gain, self.loss]
+
+    def _restore(self, snapshot):
+        self.prev_close, self.count, self.gain, self.loss = snapshot
+
+
+class CciState(_StreamingState):
+    """최근 length개 대표가격(HLC3)만 보관하는 CCI (pandas_ta cci)."""
+    kind = 'cci'
+
+    def __init__(self, length, c=0.015):
+        super().__init__(length)
+        self.c = c
+        self.window = deque(maxlen=length)
+
+    @property
+    def value(self):
+        if len(self.window) < self.length:
+            return math.nan
+        mean = sum(self.window) / self.length
+        mad = sum(abs(tp - mean) for tp in self.window) / self.length
+        if mad == 0:
+            return math.nan
+        return (self.window[-1] - mean) / (self.c * mad)
+
+    def _apply(self, high, low, close):
+        self.window.append((high + low + close) / 3)
+
+    def _apply_many(self, high, low, close):
+        typical = (np.asarray(high, dtype=np.float64) + np.asarray(low, dtype=np.float64)
+                   + np.asarray(close, dtype=np.float64)) / 3
+        values = np.full(len(typical), np.nan)
+        # 보관 중인 창 뒤에 새 대표가격을 이어 붙여, 창이 가득 찬 위치의 CCI를 한 번에 계산합니다.
+        history = np.concatenate([np.asarray(self.window, dtype=np.float64), typical])
+        count = min(len(typical), len(history) - self.length + 1)
+        if count > 0:
+            windows = sliding_window_view(history, self.length)[-count:]
+            mean = windows.mean(axis=1)
+            mad = np.abs(windows - mean[:, None]).mean(axis=1)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                values[-count:] = np.where(mad == 0, np.nan, (windows[:, -1] - mean) / (self.c * mad))
+        self.window.extend(typical[-self.length:].tolist())
+        return values
+
+    def _snapshot(self):
+        return list(self.window)
+
+    def _restore(self, snapshot):
+        self.window = deque(snapshot, maxlen=self.length)
+
+
+STATE_TYPES = {cls.kind: cls for cls in (EmaState, RsiState, CciState)}
+
+
+class IndicatorSet:
+    """
+    한 (거래소, 심볼, 타임프레임)의 지표 상태 묶음입니다.
+    specs는 {컬럼명: (종류, 기간)} 형태이며 (예: {'RSI_14': ('rsi', 14)}), 컬럼명은 pandas_ta와 같습니다.
+    """
+
+    def __init__(self, specs, states=None):
+        self.specs = dict(specs)
+        self.states = states or {name: STATE_TYPES[kind](length) for name, (kind, length) in self.specs.items()}
+
+    @property
+    def last_timestamp(self):
+        timestamps = [state.last_timestamp for state in self.states.values()]
+        return None if not timestamps or None in timestamps else min(timestamps)
+
+    @property
+    def values(self):
+        return {name: state.value for name, state in self.states.items()}
+
+    def sync(self, candles):
+        """
+        [timestamp, open, high, low, close, volume] 캔들 중 아직 적용하지 않은 것(마지막 캔들 재수신 포함)만 적용합니다.
+        상태가 캔들과 이어지지 않으면(저장소 초기화 등) 처음부터 다시 계산합니다.
+        """
+        candles = np.asarray(candles, dtype=np.float64).reshape(-1, 6)
+        last = self.last_timestamp
+        if len(candles) == 0:
+            return self.values
+        if last is not None and not (candles[0, 0] <= last <= candles[-1, 0]):
+            self.states = IndicatorSet(self.specs).states
+
+        # 상태마다 아직 적용하지 않은 구간을 update_many로 한 번에 적용 (벡터화된 _apply_many 사용)
+        for state in self.states.values():
+            pending = candles if state.last_timestamp is None else candles[candles[:, 0] >= state.last_timestamp]
+            state.update_many(pending[:, 0], pending[:, 2], pending[:, 3], pending[:, 4])
+        return self.values
+
+    def to_dict(self):
+        return {
+            'specs': {name: list(spec) for name, spec in self.specs.items()},
+            'states': {name: state.to_dict() for name, state in self.states.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data, specs=None):
+        """저장된 상태를 복원합니다. specs가 저장 시점과 다르면 None을 반환합니다."""
+        saved_specs = {name: tuple(spec) for name, spec in data['specs'].items()}
+        if specs is not None and saved_specs != dict(specs):
+            return None
+        states = {name: STATE_TYPES[state['kind']].from_dict(state) for name, state in data['states'].items()}
+        return cls(saved_specs, states)
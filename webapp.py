@@ -1,5 +1,5 @@
 import logging
-from fastapi import FastAPI, Request, Depends
+from fastapi import FastAPI, Request, Depends, HTTPException, Query
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
@@ -9,13 +9,14 @@ from sqlalchemy.orm import Session
 
 import os
 import re
-import json
 import logging
 from datetime import datetime # datetime 임포트
 
 from screener.daily_screener import daily_screener
 from screener.altcoin_screener import altcoin_screener
-from utils.database import init_db, ScreenerResult, get_db
+from utils.config_loader import CONFIG
+from utils.database import init_db, get_db, SessionLocal, query_screener_results, query_hit_stats, SUMMARY_FIELDS
+from utils.jobs import JobManager, COMPLETED, FAILED, RESULT_CACHE_ENABLED, result_cache_key
 
 # 로깅 설정
 logging.basicConfig(
@@ -30,11 +31,20 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI()
 
+# 스크리너 실행 작업 관리자 (이벤트 루프를 막지 않도록 백그라운드 스레드에서 실행)
+job_manager = JobManager()
+# True이면 작업 스레드는 Celery 워커들에 청크 단위로 분산된 스캔의 완료만 기다립니다.
+CELERY_ENABLED = CONFIG.get("celery", {}).get("enabled", False)
+
 # 데이터베이스 초기화
 @app.on_event("startup")
 def on_startup():
     init_db()
 
+@app.on_event("shutdown")
+def on_shutdown():
+    job_manager.shutdown(wait=False)
+
 # Pydantic 모델 정의
 class DailyScreenerParams(BaseModel):
     min_daily_volume_krw: Optional[float] = 500_000_000
@@ -56,17 +66,34 @@ class AltcoinScreenerParams(BaseModel):
     cci_period: Optional[int] = 20
 
 class ScreenerResultResponse(BaseModel):
-    id: int
-    screener_name: str
-    timestamp: datetime
-    output_text: str
-    chart_paths: List[str]
-    table_headers: List[str]
-    table_rows: List[List[str]]
+    # fields 파라미터로 일부 필드만 요청할 수 있으므로 모든 필드는 선택 항목입니다.
+    id: Optional[int] = None
+    screener_name: Optional[str] = None
+    timestamp: Optional[datetime] = None
+    output_text: Optional[str] = None
+    chart_paths: Optional[List[str]] = None
+    table_headers: Optional[List[str]] = None
+    table_rows: Optional[List[List[str]]] = None
 
     class Config:
         orm_mode = True
 
+class ScreenerResultPage(BaseModel):
+    items: List[ScreenerResultResponse]
+    next_cursor: Optional[str] = None
+
+class SymbolHitStats(BaseModel):
+    symbol: str
+    hits: int
+    first_seen: datetime
+    last_seen: datetime
+    avg_downtrend: Optional[float] = None
+    avg_volatility: Optional[float] = None
+    avg_cci: Optional[float] = None
+    avg_max_volume_spike: Optional[float] = None
+    avg_oi_change_24h: Optional[float] = None
+    avg_funding_rate: Optional[float] = None
+
 # 정적 파일 및 템플릿 설정
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 templates = Jinja2Templates(directory=os.path.join(BASE_DIR, "templates"))
@@ -108,61 +135,145 @@ def parse_screener_output(output: str):
             
     return table_data
 
+SCREENERS = {
+    'daily': (daily_screener, DailyScreenerParams, "데일리"),
+    'altcoin': (altcoin_screener, AltcoinScreenerParams, "알트코인"),
+}
+
+# 스크리너 결과를 바꾸는 기준 캔들. 같은 캔들 구간의 동일한 요청은 하나의 작업 결과를 공유합니다.
+RESULT_CACHE_TIMEFRAMES = {
+    'daily': '1d',
+    'altcoin': '1d',
+}
+
+def execute_screener(screener_name: str, params: dict):
+    """
+    백그라운드 작업으로 스크리너를 실행하고 결과를 반환합니다.
+    요청 스레드의 세션은 응답과 함께 닫히므로 작업마다 별도의 DB 세션을 사용합니다.
+    Celery가 켜져 있으면 스캔을 워커들에 분산하고 병합된 결과를 기다립니다.
+    """
+    if CELERY_ENABLED:
+        from screener.tasks import run_distributed_scan
+        screener_result = run_distributed_scan(screener_name, params)
+        logger.info(f"스크리너 {screener_name} 분산 실행 완료.")
+        return {
+            "output": screener_result["output"],
+            "charts": screener_result["charts"],
+            "table": screener_result["table_data"],
+        }
+
+    screener_func = SCREENERS[screener_name][0]
+    db = SessionLocal()
+    try:
+        screener_result = screener_func(db, **params)
+        logger.info(f"스크리너 {screener_name} 실행 완료.")
+        return {
+            "output": screener_result["output"],
+            "charts": screener_result["charts"],
+            "table": screener_result["table_data"],
+        }
+    except Exception:
+        logger.exception(f"스크리너 {screener_name} 실행 중 알 수 없는 오류 발생")
+        raise
+    finally:
+        db.close()
+
 # 스크리너 실행 API 엔드포인트
-@app.post("/run-screener/{screener_name}")
+@app.post("/run-screener/{screener_name}", status_code=202)
 async def run_screener(
     screener_name: str,
     daily_params: Optional[DailyScreenerParams] = None,
-    altcoin_params: Optional[AltcoinScreenerParams] = None,
-    db: Session = Depends(get_db)
+    altcoin_params: Optional[AltcoinScreenerParams] = None
 ):
     """
-    웹 요청을 받아 해당 스크리너를 별도의 프로세스에서 실행하고 결과를 반환합니다.
+    스크리너 실행을 백그라운드 작업으로 제출하고 작업 ID를 즉시 반환합니다.
+    진행 상황은 /jobs/{job_id}, 결과는 /jobs/{job_id}/result에서 조회합니다.
+    마지막 일봉 마감 이후 같은 파라미터로 실행 중이거나 완료된 작업이 있으면 그 작업 ID를 반환합니다. (cached: true)
     """
-    result = {"output": "", "charts": [], "table": {"headers": [], "rows": []}}
+    if screener_name not in SCREENERS:
+        logger.warning(f"알 수 없는 스크리너 이름 요청: {screener_name}")
+        raise HTTPException(status_code=404, detail=f"알 수 없는 스크리너 이름: {screener_name}")
 
-    try:
-        if screener_name == 'daily':
-            logger.info(f"데일리 스크리너 실행 요청: {daily_params.dict() if daily_params else '기본값'}")
-            if not daily_params: # 기본값 사용
-                daily_params = DailyScreenerParams()
-            screener_result = daily_screener(db, **daily_params.dict())
-        elif screener_name == 'altcoin':
-            logger.info(f"알트코인 스크리너 실행 요청: {altcoin_params.dict() if altcoin_params else '기본값'}")
-            if not altcoin_params: # 기본값 사용
-                altcoin_params = AltcoinScreenerParams()
-            screener_result = altcoin_screener(db, **altcoin_params.dict())
-        else:
-            logger.warning(f"알 수 없는 스크리너 이름 요청: {screener_name}")
-            return {"output": f"알 수 없는 스크리너 이름: {screener_name}", "charts": [], "table": {"headers": [], "rows": []}}
-
-        result["output"] = screener_result["output"]
-        result["charts"] = screener_result["charts"]
-        result["table"] = screener_result["table_data"]
-        logger.info(f"스크리너 {screener_name} 실행 완료.")
+    _, params_model, label = SCREENERS[screener_name]
+    params = daily_params if screener_name == 'daily' else altcoin_params
+    logger.info(f"{label} 스크리너 실행 요청: {params.dict() if params else '기본값'}")
+    if not params: # 기본값 사용
+        params = params_model()
 
-    except Exception as e:
-        logger.exception(f"스크리너 {screener_name} 실행 중 알 수 없는 오류 발생")
-        result["output"] = f"스크리너 실행 중 알 수 없는 오류 발생: {e}"
+    if RESULT_CACHE_ENABLED:
+        cache_key = result_cache_key(screener_name, params.dict(), RESULT_CACHE_TIMEFRAMES[screener_name])
+        job, created = job_manager.submit_once(
+            cache_key, screener_name, execute_screener, screener_name, params.dict(), params=params.dict()
+        )
+        if not created:
+            logger.info(f"{label} 스크리너: 같은 캔들 구간의 동일 요청 작업 재사용 ({job.id}, {job.status})")
+    else:
+        job = job_manager.submit(screener_name, execute_screener, screener_name, params.dict(), params=params.dict())
+        created = True
+    return {"job_id": job.id, "status": job.status, "cached": not created}
 
-    return result
+def _get_job_or_404(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"작업을 찾을 수 없습니다: {job_id}")
+    return job
+
+# 스크리너 작업 상태 조회 API 엔드포인트
+@app.get("/jobs")
+async def list_jobs():
+    return [job.to_dict() for job in job_manager.list()]
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    return _get_job_or_404(job_id).to_dict()
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """완료된 작업의 결과를 반환합니다. 아직 실행 중이면 409, 실패했으면 500을 반환합니다."""
+    job = _get_job_or_404(job_id)
+    if job.status == FAILED:
+        raise HTTPException(status_code=500, detail=f"스크리너 실행 중 알 수 없는 오류 발생: {job.error}")
+    if job.status != COMPLETED:
+        raise HTTPException(status_code=409, detail=f"작업이 아직 완료되지 않았습니다 (상태: {job.status})")
+    return job.result
 
 # 과거 스크리너 결과 조회 API 엔드포인트
-@app.get("/results", response_model=List[ScreenerResultResponse])
-async def get_screener_results(db: Session = Depends(get_db)):
-    results = db.query(ScreenerResult).order_by(ScreenerResult.timestamp.desc()).all()
-    # JSON 문자열로 저장된 필드를 파싱하여 반환
-    parsed_results = []
-    for res in results:
-        parsed_res = {
-            "id": res.id,
-            "screener_name": res.screener_name,
-            "timestamp": res.timestamp,
-            "output_text": res.output_text,
-            "chart_paths": json.loads(res.chart_paths) if res.chart_paths else [],
-            "table_headers": json.loads(res.table_headers) if res.table_headers else [],
-            "table_rows": json.loads(res.table_rows) if res.table_rows else []
-        }
-        parsed_results.append(parsed_res)
-    return parsed_results
+@app.get("/results", response_model=ScreenerResultPage, response_model_exclude_unset=True)
+async def get_screener_results(
+    screener_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    fields: Optional[str] = Query(None, description="쉼표로 구분한 반환 필드 (summary: id, screener_name, timestamp)"),
+    db: Session = Depends(get_db)
+):
+    """
+    스크리너 결과를 최신순으로 페이지 단위 조회합니다.
+    다음 페이지는 응답의 next_cursor를 cursor로 넘겨 조회하며, fields로 필요한 필드만 받을 수 있습니다.
+    """
+    if fields == "summary":
+        selected = SUMMARY_FIELDS
+    else:
+        selected = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    try:
+        items, next_cursor = query_screener_results(
+            db, screener_name=screener_name, since=since, until=until,
+            cursor=cursor, limit=limit, fields=selected
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
 
+# 심볼별 발견 통계 API 엔드포인트
+@app.get("/hits/stats", response_model=List[SymbolHitStats])
+async def get_hit_stats(
+    symbol: Optional[str] = None,
+    screener_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db)
+):
+    """기간 내 심볼별 발견 횟수와 지표 평균을 발견 횟수 순으로 반환합니다. (예: 이번 달 IMX/KRW 발견 횟수)"""
+    return query_hit_stats(db, symbol=symbol, screener_name=screener_name, since=since, until=until, limit=limit)